@@ -0,0 +1,49 @@
+import os
+import time
+from typing import Optional
+
+
+class AdmissionController:
+    """
+    Per-worker cap on concurrent voice sessions.
+
+    Each worker process (see serve.py) admits at most `max_sessions`; beyond
+    that new websockets are refused with close code 1013 (try again later)
+    instead of degrading every call already on this worker. snapshot() is what
+    GET /capacity reports: this worker's load only, since workers share no
+    state. max_sessions=None admits everything (single-process default).
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None):
+        self.max_sessions = max_sessions
+        self.active = 0
+        self.stats = {"admitted": 0, "rejected": 0}
+        self.started_at = time.monotonic()
+
+    @property
+    def accepting(self) -> bool:
+        return self.max_sessions is None or self.active < self.max_sessions
+
+    def try_admit(self) -> bool:
+        if not self.accepting:
+            self.stats["rejected"] += 1
+            return False
+        self.active += 1
+        self.stats["admitted"] += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "worker_pid": os.getpid(),
+            "active_sessions": self.active,
+            "max_sessions": self.max_sessions,
+            "accepting": self.accepting,
+            "admitted": self.stats["admitted"],
+            "rejected": self.stats["rejected"],
+            # CPU time of this worker; sampled twice it gives utilization (benchmarks/load_test.py)
+            "cpu_seconds": time.process_time(),
+            "uptime_seconds": time.monotonic() - self.started_at
+        }
@@ -0,0 +1,85 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from .frame import AudioFrame, analyze_frames
+from .vad import VADEvent, VoiceActivityDetector
+
+
+def process_batch(jobs: list) -> list:
+    """
+    Runs on a DSP thread: analysis for every chunk in the batch (vectorized
+    across sessions), then each session's VAD in submission order.
+    """
+    frames = analyze_frames([data for data, _ in jobs])
+    return [
+        (frame, vad.process(frame) if vad is not None else [])
+        for frame, (_, vad) in zip(frames, jobs)
+    ]
+
+
+class DSPExecutor:
+    """
+    Moves per-frame audio math (analysis + VAD) off the event loop.
+
+    Frames submitted by all sessions are collected into batches: everything
+    submitted during one loop iteration, plus whatever arrives while the DSP
+    threads are busy, goes out as a single job, so handoff cost is paid per
+    batch rather than per frame and same-length frames share one NumPy pass.
+    Results come back to each caller's future on the loop.
+
+    A session awaits each frame before submitting the next, so its VAD state is
+    never touched by two threads at once and event order is preserved.
+    """
+
+    def __init__(self, threads: int = 1, max_batch: int = 256):
+        self.threads = threads
+        self.max_batch = max_batch
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="dsp")
+        self.pending = []
+        self.in_flight = 0
+        self.flush_scheduled = False
+        self.stats = {"frames": 0, "batches": 0, "largest_batch": 0}
+
+    async def process(self, data: bytes, vad: Optional[VoiceActivityDetector] = None) -> Tuple[AudioFrame, List[VADEvent]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((data, vad, future))
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            # Runs after every task already woken this iteration has had a chance to submit
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        self.flush_scheduled = False
+        loop = asyncio.get_running_loop()
+        # Keep at most one batch per thread in flight; the rest accumulates into the next batch
+        while self.pending and self.in_flight < self.threads:
+            batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+            self.in_flight += 1
+            self.stats["frames"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+            work = loop.run_in_executor(self.pool, process_batch, [(data, vad) for data, vad, _ in batch])
+            work.add_done_callback(lambda done, batch=batch: self._deliver(batch, done))
+
+    def _deliver(self, batch: list, done: asyncio.Future):
+        self.in_flight -= 1
+        cancelled = done.cancelled()
+        error = None if cancelled else done.exception()
+        results = [None] * len(batch) if cancelled or error else done.result()
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue  # caller went away (session ended)
+            if cancelled:
+                future.cancel()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        if self.pending:
+            self._flush()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
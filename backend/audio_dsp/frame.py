@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+import numpy as np
+
+# Inbound mic audio is 16-bit little-endian mono PCM
+PCM_DTYPE = np.dtype("<i2")
+
+
+@dataclass(frozen=True)
+class FrameStats:
+    """
+    Per-frame signal statistics, computed once per inbound chunk.
+    """
+    rms: float = 0.0
+    peak: int = 0
+    zero_crossing_rate: float = 0.0  # crossings per sample
+    dc_offset: float = 0.0
+
+
+@dataclass(frozen=True)
+class AudioFrame:
+    """
+    A chunk of raw PCM from the client together with its analysis.
+    `samples` is a read-only view over `data` (no copy).
+    """
+    data: bytes
+    samples: np.ndarray
+    stats: FrameStats
+
+    def __len__(self):
+        return len(self.data)
+
+
+EMPTY_STATS = FrameStats()
+
+
+def pcm_view(data: bytes) -> np.ndarray:
+    """
+    Zero-copy int16 view over a PCM buffer. A trailing odd byte is ignored.
+    """
+    return np.frombuffer(data, dtype=PCM_DTYPE, count=len(data) // 2)
+
+
+def compute_stats(samples: np.ndarray) -> FrameStats:
+    count = samples.size
+    if count == 0:
+        return EMPTY_STATS
+
+    # One float conversion; int16 squares would overflow
+    as_float = samples.astype(np.float64)
+    rms = float(np.sqrt(np.dot(as_float, as_float) / count))
+    dc_offset = float(as_float.mean())
+
+    # abs(int16) overflows at -32768, so compare the extremes separately
+    peak = max(int(samples.max()), -int(samples.min()))
+
+    negative = samples < 0
+    crossings = int(np.count_nonzero(negative[1:] != negative[:-1]))
+
+    return FrameStats(
+        rms=rms,
+        peak=peak,
+        zero_crossing_rate=crossings / count,
+        dc_offset=dc_offset,
+    )
+
+
+def analyze_frame(data: bytes) -> AudioFrame:
+    """
+    Decode and analyze a PCM chunk exactly once.
+    """
+    samples = pcm_view(data)
+    return AudioFrame(data=data, samples=samples, stats=compute_stats(samples))
+
+
+def compute_stats_batch(matrix: np.ndarray) -> list:
+    """
+    compute_stats for equal-length frames stacked as rows, in one vectorized pass.
+    """
+    count = matrix.shape[1]
+    as_float = matrix.astype(np.float64)
+    rms = np.sqrt(np.einsum("ij,ij->i", as_float, as_float) / count)
+    dc_offset = as_float.mean(axis=1)
+    peak = np.maximum(matrix.max(axis=1).astype(np.int32), -matrix.min(axis=1).astype(np.int32))
+    negative = matrix < 0
+    crossings = np.count_nonzero(negative[:, 1:] != negative[:, :-1], axis=1)
+    return [
+        FrameStats(rms=float(r), peak=int(p), zero_crossing_rate=int(c) / count, dc_offset=float(d))
+        for r, p, c, d in zip(rms, peak, crossings, dc_offset)
+    ]
+
+
+def analyze_frames(chunks: list) -> list:
+    """
+    analyze_frame over many chunks (e.g. one per session); chunks of the same
+    length share a single vectorized stats pass.
+    """
+    frames = [None] * len(chunks)
+    by_length = {}
+    for i, data in enumerate(chunks):
+        by_length.setdefault(len(data) // 2, []).append(i)
+
+    for count, indices in by_length.items():
+        if count == 0 or len(indices) == 1:
+            for i in indices:
+                frames[i] = analyze_frame(chunks[i])
+            continue
+        views = [pcm_view(chunks[i]) for i in indices]
+        for i, samples, stats in zip(indices, views, compute_stats_batch(np.stack(views))):
+            frames[i] = AudioFrame(data=chunks[i], samples=samples, stats=stats)
+    return frames
@@ -0,0 +1,115 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rates a client may negotiate for /ws audio in either direction
+SUPPORTED_RATES = (8000, 11025, 16000, 22050, 24000, 32000, 44100, 48000)
+
+
+def design_polyphase(up: int, down: int, half_width: int = 24, rolloff: float = 0.9,
+                     beta: float = 7.0) -> np.ndarray:
+    """
+    Kaiser-windowed sinc lowpass for resampling by up/down, as a polyphase bank.
+
+    The prototype spans 2 * half_width zero crossings of the narrower of the two
+    Nyquist bands, with the cutoff at rolloff of it. With the defaults the
+    passband is flat to 80% of that Nyquist and everything above it is at least
+    70 dB down, so nothing audible aliases or images. Returns shape (up, taps):
+    row p holds the taps for output samples at phase p, time-reversed so a dot
+    product with the input window applies it.
+    """
+    ratio = max(up, down)
+    taps = max(2, 2 * half_width * ratio // up)
+    n = taps * up
+    cutoff = rolloff / ratio
+    t = np.arange(n) - (n - 1) / 2
+    h = cutoff * np.sinc(cutoff * t) * np.kaiser(n, beta)
+    # Unity gain at DC per phase: the upsampled signal is zero-stuffed
+    h *= up / h.sum()
+    return np.ascontiguousarray(h.reshape(taps, up).T[:, ::-1], dtype=np.float32)
+
+
+class StreamingResampler:
+    """
+    Polyphase resampler for a continuous 16-bit mono stream, fed block by block.
+
+    Keeps the last taps-1 input samples and the fractional output position
+    between blocks, so splitting a stream into arbitrary blocks gives the same
+    output as resampling it in one piece. One instance per stream (per session
+    and direction); not thread-safe. Each block is a handful of matrix-vector
+    products over strided views: for every output phase, the windows it needs
+    form an arithmetic progression in the input.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, half_width: int = 24):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        g = math.gcd(in_rate, out_rate)
+        self.up, self.down = out_rate // g, in_rate // g
+        self.bank = design_polyphase(self.up, self.down, half_width)
+        self.taps = self.bank.shape[1]
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        # Upsampled-grid index of the next output sample, relative to history[0]
+        self.position = (self.taps - 1) * self.up
+        # Odd trailing byte of the last block (stream chunks may split a sample)
+        self.carry = b""
+
+    @property
+    def delay_ms(self) -> float:
+        """
+        Group delay the filter adds.
+        """
+        return (self.taps * self.up - 1) / 2 / (self.up * self.in_rate) * 1000
+
+    def process_samples(self, x: np.ndarray) -> np.ndarray:
+        if self.up == self.down:
+            return x.astype(np.float32, copy=False)
+        buffer = np.concatenate((self.history, x.astype(np.float32, copy=False)))
+        end = len(buffer) * self.up
+        count = max(0, -(-(end - self.position) // self.down))
+        out = np.empty(count, dtype=np.float32)
+        windows = sliding_window_view(buffer, self.taps) if count else None
+        for q in range(min(self.up, count)):
+            # Outputs q, q + up, ... share a phase and step down input samples apart
+            u = self.position + q * self.down
+            first, phase = divmod(u, self.up)
+            n = len(out[q::self.up])
+            start = first - self.taps + 1
+            out[q::self.up] = windows[start:start + (n - 1) * self.down + 1:self.down] @ self.bank[phase]
+        consumed = len(buffer) - (self.taps - 1)
+        self.position += count * self.down - consumed * self.up
+        self.history = buffer[consumed:].copy()
+        return out
+
+    def process(self, pcm: bytes) -> bytes:
+        """
+        Resample a block of 16-bit little-endian PCM.
+        """
+        if self.up == self.down:
+            return pcm
+        if self.carry:
+            pcm = self.carry + pcm
+        usable = len(pcm) - len(pcm) % 2
+        self.carry = pcm[usable:]
+        x = np.frombuffer(pcm, dtype="<i2", count=usable // 2)
+        y = self.process_samples(x)
+        return np.clip(np.rint(y), -32768, 32767).astype("<i2").tobytes()
+
+    def reset(self):
+        self.history[:] = 0
+        self.position = (self.taps - 1) * self.up
+        self.carry = b""
+
+
+def negotiate_rate(requested, default: int = None):
+    """
+    First supported rate from a client's preference (an int or a list), else default.
+    """
+    if isinstance(requested, (int, float)):
+        requested = [requested]
+    if not isinstance(requested, list):
+        return default
+    for rate in requested:
+        if isinstance(rate, (int, float)) and int(rate) in SUPPORTED_RATES:
+            return int(rate)
+    return default
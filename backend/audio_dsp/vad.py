@@ -0,0 +1,188 @@
+import math
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import List
+import numpy as np
+
+from .frame import AudioFrame
+
+
+class VADEvent(Enum):
+    SPEECH_START = "speech_start"
+    # Speech has stayed loud for sustain_ms: long enough to interrupt the agent for
+    SPEECH_SUSTAINED = "speech_sustained"
+    SPEECH_END = "speech_end"
+
+
+class VoiceActivityDetector(ABC):
+    """
+    Streaming, per-session voice activity detector.
+    Fed every inbound frame in order; returns state transitions as they happen.
+    """
+
+    @abstractmethod
+    def process(self, frame: AudioFrame) -> List[VADEvent]:
+        """
+        Consume one frame and return any SPEECH_START / SPEECH_SUSTAINED / SPEECH_END
+        transitions it caused.
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def in_speech(self) -> bool:
+        """
+        True while the detector considers the user to be speaking.
+        """
+        pass
+
+    @abstractmethod
+    def reset(self):
+        """
+        Forget all state (noise floor, pending samples, speech state).
+        """
+        pass
+
+
+class EnergySpectralVAD(VoiceActivityDetector):
+    """
+    Energy + band spectral-flux VAD with an onset/hangover state machine.
+
+    Audio is cut into fixed hops; energy and log band energies are computed for
+    all hops of a frame at once with NumPy, then a small per-hop state machine runs:
+      - a hop is active when its energy clears both an adaptive noise floor (+snr_db)
+        and an absolute minimum, and (for onsets) the smoothed spectral flux shows
+        the non-stationary spectrum typical of speech rather than a steady hum;
+      - onset_ms of consecutive active hops emits SPEECH_START;
+      - sustain_ms of consecutive loud hops (counted from the onset) emits
+        SPEECH_SUSTAINED, once per utterance. Engines barge in on it rather than
+        on SPEECH_START, so a cough or a burst of speaker echo doesn't cut the
+        agent off;
+      - hangover_ms of inactive hops emits SPEECH_END.
+    Pure CPU and deterministic: the same input always gives the same events.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        hop_ms: int = 20,
+        onset_ms: int = 60,
+        sustain_ms: int = 200,
+        hangover_ms: int = 600,
+        snr_db: float = 12.0,
+        min_energy_db: float = 54.0,
+        flux_threshold_db: float = 1.5,
+        n_bands: int = 12,
+    ):
+        self.sample_rate = sample_rate
+        self.hop_ms = hop_ms
+        self.hop = sample_rate * hop_ms // 1000
+        self.onset_hops = max(1, math.ceil(onset_ms / hop_ms))
+        self.sustain_hops = max(self.onset_hops, math.ceil(sustain_ms / hop_ms))
+        self.hangover_hops = max(1, math.ceil(hangover_ms / hop_ms))
+        self.snr_db = snr_db
+        self.min_energy_db = min_energy_db
+        self.flux_threshold_db = flux_threshold_db
+        self.flux_decay = math.exp(-hop_ms / 100.0)  # ~100ms smoothing
+        self.floor_rise_db = 0.05 * hop_ms / 20.0  # ~2.5 dB/s upward drift
+
+        self._window = np.hanning(self.hop).astype(np.float32)
+
+        # Log-spaced bands over the speech range, as a (bins x bands) summing matrix
+        freqs = np.fft.rfftfreq(self.hop, 1.0 / sample_rate)
+        edges = np.geomspace(250.0, min(4000.0, sample_rate / 2), n_bands + 1)
+        band_of_bin = np.digitize(freqs, edges) - 1
+        self._bands = np.zeros((freqs.size, n_bands), dtype=np.float32)
+        valid = (band_of_bin >= 0) & (band_of_bin < n_bands)
+        self._bands[np.nonzero(valid)[0], band_of_bin[valid]] = 1.0
+
+        self.reset()
+
+    @property
+    def in_speech(self) -> bool:
+        return self._in_speech
+
+    def reset(self):
+        self._pending = np.empty(0, dtype=np.int16)
+        self._prev_bands = None
+        self._noise_floor_db = None
+        self._flux_ema = 0.0
+        self._in_speech = False
+        self._sustained = False
+        self._active_run = 0
+        self._inactive_run = 0
+        self.hops_processed = 0
+
+    def _features(self, samples: np.ndarray):
+        n_hops = samples.size // self.hop
+        hops = samples[:n_hops * self.hop].reshape(n_hops, self.hop).astype(np.float32)
+
+        energy_db = 10.0 * np.log10(np.mean(hops * hops, axis=1) + 1.0)
+
+        power = np.abs(np.fft.rfft(hops * self._window, axis=1)) ** 2
+        bands_db = 10.0 * np.log10(power @ self._bands + 1.0)
+
+        previous = np.empty_like(bands_db)
+        previous[0] = bands_db[0] if self._prev_bands is None else self._prev_bands
+        previous[1:] = bands_db[:-1]
+        flux = np.maximum(bands_db - previous, 0.0).mean(axis=1)
+        self._prev_bands = bands_db[-1]
+
+        return energy_db, flux
+
+    def process(self, frame: AudioFrame) -> List[VADEvent]:
+        samples = frame.samples
+        if self._pending.size:
+            samples = np.concatenate((self._pending, samples))
+
+        usable = samples.size - samples.size % self.hop
+        self._pending = samples[usable:].copy()
+        if usable == 0:
+            return []
+
+        energy_db, flux = self._features(samples[:usable])
+
+        events = []
+        for energy, hop_flux in zip(energy_db.tolist(), flux.tolist()):
+            self.hops_processed += 1
+            if self._noise_floor_db is None:
+                self._noise_floor_db = min(energy, self.min_energy_db - self.snr_db)
+            self._flux_ema = self._flux_ema * self.flux_decay + hop_flux * (1.0 - self.flux_decay)
+
+            loud = energy > max(self._noise_floor_db + self.snr_db, self.min_energy_db)
+
+            if self._in_speech:
+                if loud:
+                    self._inactive_run = 0
+                    self._active_run += 1
+                    if not self._sustained and self._active_run >= self.sustain_hops:
+                        self._sustained = True
+                        events.append(VADEvent.SPEECH_SUSTAINED)
+                else:
+                    self._inactive_run += 1
+                    self._active_run = 0
+                    if self._inactive_run >= self.hangover_hops:
+                        self._in_speech = False
+                        self._sustained = False
+                        events.append(VADEvent.SPEECH_END)
+                continue
+
+            # Track the noise floor only outside speech: drop fast, rise slowly
+            if energy < self._noise_floor_db:
+                self._noise_floor_db = energy
+            else:
+                self._noise_floor_db += self.floor_rise_db
+
+            if loud and self._flux_ema > self.flux_threshold_db:
+                self._active_run += 1
+                if self._active_run >= self.onset_hops:
+                    self._in_speech = True
+                    self._inactive_run = 0
+                    events.append(VADEvent.SPEECH_START)
+                    if self._active_run >= self.sustain_hops:
+                        self._sustained = True
+                        events.append(VADEvent.SPEECH_SUSTAINED)
+            else:
+                self._active_run = 0
+
+        return events
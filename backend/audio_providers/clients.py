@@ -0,0 +1,135 @@
+"""
+Process-wide HTTP clients shared by every session's providers.
+
+Each client owns a bounded keep-alive connection pool, so sessions reuse warm
+(already TLS-handshaken) connections instead of opening their own per session.
+Clients are created lazily on first use and closed once at shutdown via
+close_shared_clients() (FastAPI lifespan in main.py). Providers never close
+shared clients themselves.
+
+HTTP/2 (httpx[http2]) is used where the provider offers it. Over HTTP/1.1, a
+response closed before its body was read to the end (the OpenAI SDK stops
+at "data: [DONE]", just before the end of the chunked body) would cost the
+connection, so closing first drains what is left, within a small budget.
+"""
+import os
+import asyncio
+import httpx
+from openai import AsyncOpenAI
+from elevenlabs.client import AsyncElevenLabs
+
+try:
+    import h2  # noqa: F401 - httpx only negotiates HTTP/2 when h2 is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Most a closed response is drained by to keep its connection: enough for the tail of a
+# finished stream, not for the rest of an abandoned one
+DRAIN_MAX_BYTES = 64 * 1024
+DRAIN_TIMEOUT_S = 0.05
+
+_http_clients = {}
+_openai_clients = {}
+_elevenlabs_clients = {}
+
+
+def http_limits() -> httpx.Limits:
+    # Per shared client (i.e. per upstream service), across all sessions
+    return httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "64")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "32")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "60"))
+    )
+
+
+class _DrainingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream):
+        self.stream = stream
+        self.iterator = None
+
+    async def __aiter__(self):
+        self.iterator = self.stream.__aiter__()
+        async for chunk in self.iterator:
+            yield chunk
+
+    async def _drain(self):
+        drained = 0
+        async for chunk in self.iterator:
+            drained += len(chunk)
+            if drained > DRAIN_MAX_BYTES:
+                return
+
+    async def aclose(self):
+        if self.iterator is not None:
+            try:
+                await asyncio.wait_for(self._drain(), DRAIN_TIMEOUT_S)
+            except (asyncio.TimeoutError, httpx.HTTPError):
+                pass
+        await self.stream.aclose()
+
+
+class DrainingTransport(httpx.AsyncBaseTransport):
+    """
+    Drains a response's remaining body on close, so the HTTP/1.1 connection
+    returns to the pool instead of being closed (see module docstring).
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        response.stream = _DrainingStream(response.stream)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def get_http_client(name: str, timeout: httpx.Timeout = None) -> httpx.AsyncClient:
+    """
+    Shared httpx client for one upstream service ("kokoro", "openai", "elevenlabs").
+    The timeout only applies when the client is first created.
+    """
+    client = _http_clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=timeout or httpx.Timeout(30.0, connect=5.0),
+            transport=DrainingTransport(httpx.AsyncHTTPTransport(limits=http_limits(), http2=HTTP2_AVAILABLE))
+        )
+        _http_clients[name] = client
+    return client
+
+
+def get_openai_client(base_url: str, api_key: str) -> AsyncOpenAI:
+    key = (base_url, api_key)
+    client = _openai_clients.get(key)
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=get_http_client("openai", httpx.Timeout(600.0, connect=5.0))
+        )
+        _openai_clients[key] = client
+    return client
+
+
+def get_elevenlabs_client(api_key: str) -> AsyncElevenLabs:
+    client = _elevenlabs_clients.get(api_key)
+    if client is None:
+        client = AsyncElevenLabs(
+            api_key=api_key,
+            httpx_client=get_http_client("elevenlabs", httpx.Timeout(240.0, connect=5.0))
+        )
+        _elevenlabs_clients[api_key] = client
+    return client
+
+
+async def close_shared_clients():
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    _openai_clients.clear()
+    _elevenlabs_clients.clear()
+    for client in clients:
+        await client.aclose()
@@ -1,10 +1,40 @@
 from abc import ABC, abstractmethod
 from typing import AsyncGenerator
 
+
+class ErrorReply(str):
+    """
+    Text a provider yields in place of a reply when the request fails: spoken
+    to the user, but never recorded as the assistant's turn.
+    """
+
+
 class LLMProvider(ABC):
     @abstractmethod
-    async def generate_response(self, text_input: str) -> AsyncGenerator[str, None]:
+    async def generate_response(self, text_input: str, record_history: bool = True) -> AsyncGenerator[str, None]:
         """
         Process text input and yield text response chunks.
+        record_history=True adds the user message to conversation state first;
+        record_history=False leaves it untouched (speculative runs). The reply is
+        recorded by the caller (record_reply), which knows how much of it was delivered.
+        """
+        pass
+
+    def record_user(self, user_text: str):
+        """
+        Add the user's message to conversation state (for responses generated
+        with record_history=False that were later accepted).
+        """
+        pass
+
+    def record_reply(self, assistant_text: str):
+        """
+        Add the assistant's reply to conversation state, as far as it was delivered.
+        """
+        pass
+
+    async def close(self):
+        """
+        Release per-session resources. Shared clients are left open.
         """
         pass
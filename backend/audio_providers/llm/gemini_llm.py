@@ -1,11 +1,22 @@
 import os
+import hashlib
 from openai import AsyncOpenAI
 from typing import AsyncGenerator
-import traceback
-from .base import LLMProvider
+from .base import LLMProvider, ErrorReply
+from audio_providers.clients import get_openai_client
+from .history import ConversationHistory
+from telemetry.logs import get_logger
+
+logger = get_logger("llm")
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a voice conversation between a user and an assistant. "
+    "Merge the new messages into the existing summary. Keep names, facts, preferences, open "
+    "questions and commitments; drop small talk. Reply with the summary only, under 200 words."
+)
 
 class GeminiLLMProvider(LLMProvider):
-    def __init__(self, api_key: str, system_prompt: str, model_name: str = None):
+    def __init__(self, api_key: str, system_prompt: str, model_name: str = None, client: AsyncOpenAI = None):
         # Use custom OpenAI-compatible API
         self.base_url = os.getenv("LLM_BASE_URL", "https://api.letsdisagree.com/v1")
         self.api_key = os.getenv("LLM_API_KEY", api_key)
@@ -13,45 +24,103 @@ class GeminiLLMProvider(LLMProvider):
         if model_name is None:
             model_name = os.getenv("LLM_MODEL", "ag/gemini-3-flash")
 
-        print(f"Initializing LLM with model: {model_name} at {self.base_url}")
+        logger.info("Initializing LLM with model: %s at %s", model_name, self.base_url)
 
-        self.client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
-        )
+        # Shared across sessions so requests reuse pooled connections; an explicit client is owned here
+        self.owns_client = client is not None
+        self.client = client or get_openai_client(self.base_url, self.api_key)
         self.model_name = model_name
         self.system_prompt = system_prompt
-        self.conversation_history = [
-            {"role": "system", "content": self.system_prompt}
-        ]
+        # Recent turns verbatim within a token budget, older ones folded into a rolling summary
+        max_tokens = int(os.getenv("LLM_HISTORY_TOKENS", "4000"))
+        summarize = os.getenv("LLM_HISTORY_SUMMARY", "true").lower() == "true"
+        self.summary_model = os.getenv("LLM_SUMMARY_MODEL") or model_name
+        self.history = ConversationHistory(
+            system_prompt,
+            max_tokens=max_tokens if max_tokens > 0 else None,
+            summarizer=self.summarize if summarize else None
+        )
+        # Provider-side prefix caching of the system prompt (the history keeps it byte-identical
+        # as the first message either way): off | key (OpenAI prompt_cache_key) |
+        # cache_control (Anthropic-style breakpoint on the system message)
+        self.prompt_cache = os.getenv("LLM_PROMPT_CACHE", "off").lower()
+        self.request_options = {}
+        if self.prompt_cache == "key":
+            prompt_digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+            self.request_options["prompt_cache_key"] = f"donna-{prompt_digest}"
+        elif self.prompt_cache == "cache_control":
+            self.history.system_message = {
+                "role": "system",
+                "content": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+            }
+        if self.prompt_cache != "off":
+            # Final chunk carries usage, including cached prompt tokens where the provider reports them
+            self.request_options["stream_options"] = {"include_usage": True}
 
-    async def generate_response(self, text_input: str) -> AsyncGenerator[str, None]:
-        print(f"[LLM] Sending request: '{text_input}'")
+    async def generate_response(self, text_input: str, record_history: bool = True) -> AsyncGenerator[str, None]:
+        logger.debug("Sending request: '%s'", text_input)
 
-        # Add user message to history
-        self.conversation_history.append({"role": "user", "content": text_input})
+        if record_history:
+            # Add user message to history
+            self.history.append("user", text_input)
+            messages = self.history.messages()
+        else:
+            messages = self.history.messages(extra={"role": "user", "content": text_input})
 
         try:
             stream = await self.client.chat.completions.create(
                 model=self.model_name,
-                messages=self.conversation_history,
-                stream=True
+                messages=messages,
+                stream=True,
+                **self.request_options
             )
 
-            print("[LLM] Stream started")
+            logger.debug("Stream started")
             full_response = ""
 
             async for chunk in stream:
+                if chunk.usage:
+                    self.log_prompt_cache(chunk.usage)
                 if chunk.choices and chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
                     full_response += content
                     yield content
 
-            # Add assistant response to history
-            self.conversation_history.append({"role": "assistant", "content": full_response})
-            print("[LLM] Stream finished")
+            logger.debug("Stream finished (%d chars)", len(full_response))
 
         except Exception as e:
-            print(f"[LLM] Error: {e}")
-            traceback.print_exc()
-            yield f" I'm sorry, I encountered an error: {str(e)}"
+            logger.exception("Error: %s", e)
+            yield ErrorReply(f" I'm sorry, I encountered an error: {str(e)}")
+
+    def log_prompt_cache(self, usage):
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details else None
+        if cached is not None:
+            logger.debug("Prompt cache: %d/%d prompt tokens cached", cached, usage.prompt_tokens)
+
+    async def summarize(self, summary: str, messages: list) -> str:
+        """
+        Fold evicted messages into the rolling summary (runs in the background).
+        """
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        response = await self.client.chat.completions.create(
+            model=self.summary_model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Existing summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"}
+            ],
+            max_tokens=400
+        )
+        logger.info("History summarized (%d messages folded in)", len(messages))
+        return (response.choices[0].message.content or summary).strip()
+
+    async def close(self):
+        self.history.cancel()
+        if self.owns_client:
+            await self.client.close()
+
+    def record_user(self, user_text: str):
+        self.history.append("user", user_text)
+
+    def record_reply(self, assistant_text: str):
+        self.history.append("assistant", assistant_text)
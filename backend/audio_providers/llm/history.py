@@ -0,0 +1,116 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from telemetry.logs import get_logger
+
+logger = get_logger("llm")
+
+# (previous_summary, evicted_messages) -> new summary
+Summarizer = Callable[[str, List[dict]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English); only used for
+    budgeting, so it needs to be monotonic and fast, not exact.
+    """
+    return len(text) // 4 + 1
+
+
+class ConversationHistory:
+    """
+    Token-budgeted chat history: system prompt + rolling summary + recent turns.
+
+    Recent messages are kept verbatim while they fit in `max_tokens`. When they
+    overflow, the oldest ones are evicted down to `low_water` of the budget (so
+    compaction runs every few turns, not every turn) and folded into the summary
+    by `summarizer` in a background task, off the response path. Until that task
+    finishes, requests go out with the previous summary. Without a summarizer,
+    evicted turns are simply dropped (plain sliding window); max_tokens=None
+    disables the budget altogether.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        max_tokens: Optional[int] = 4000,
+        low_water: float = 0.6,
+        min_recent_messages: int = 4,
+        summarizer: Optional[Summarizer] = None
+    ):
+        self.system_prompt = system_prompt
+        # Built once: the leading message is the cacheable prefix of every request
+        # and must serialize to the same bytes each time (see GeminiLLMProvider)
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.max_tokens = max_tokens
+        self.low_water = low_water
+        self.min_recent_messages = min_recent_messages
+        self.summarizer = summarizer
+        self.recent: List[dict] = []
+        self.recent_tokens = 0
+        self.summary = ""
+        self.pending: List[dict] = []
+        self.summary_task: Optional[asyncio.Task] = None
+        self.stats = {"evicted_messages": 0, "summaries": 0, "summary_failures": 0}
+
+    def messages(self, extra: Optional[dict] = None) -> List[dict]:
+        """
+        The message list for the next request (optionally with one unrecorded
+        message appended, e.g. a speculative user turn).
+        """
+        messages = [self.system_message]
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{self.summary}"
+            })
+        messages.extend(self.recent)
+        if extra:
+            messages.append(extra)
+        return messages
+
+    def prompt_tokens(self) -> int:
+        return estimate_tokens(self.system_prompt) + estimate_tokens(self.summary) + self.recent_tokens
+
+    def append(self, role: str, content: str):
+        self.recent.append({"role": role, "content": content})
+        self.recent_tokens += estimate_tokens(content)
+        if self.max_tokens and self.recent_tokens > self.max_tokens:
+            self._compact()
+
+    def _compact(self):
+        target = self.max_tokens * self.low_water
+        evicted = []
+        while self.recent_tokens > target and len(self.recent) > self.min_recent_messages:
+            message = self.recent.pop(0)
+            self.recent_tokens -= estimate_tokens(message["content"])
+            evicted.append(message)
+        # Don't leave an assistant reply at the head of the window without its question
+        while self.recent and self.recent[0]["role"] == "assistant" and len(self.recent) > self.min_recent_messages:
+            message = self.recent.pop(0)
+            self.recent_tokens -= estimate_tokens(message["content"])
+            evicted.append(message)
+
+        if not evicted:
+            return
+        self.stats["evicted_messages"] += len(evicted)
+        if self.summarizer is None:
+            return
+        self.pending.extend(evicted)
+        if self.summary_task is None or self.summary_task.done():
+            self.summary_task = asyncio.create_task(self._summarize())
+
+    async def _summarize(self):
+        # Loops so turns evicted while a summary was in flight are folded in next
+        while self.pending:
+            batch, self.pending = self.pending, []
+            try:
+                self.summary = await self.summarizer(self.summary, batch)
+                self.stats["summaries"] += 1
+            except Exception as e:
+                self.stats["summary_failures"] += 1
+                logger.warning("[History] Summarization failed, dropping %d messages: %s", len(batch), e)
+
+    def cancel(self):
+        if self.summary_task:
+            self.summary_task.cancel()
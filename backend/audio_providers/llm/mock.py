@@ -0,0 +1,36 @@
+import asyncio
+from typing import AsyncGenerator
+from .base import LLMProvider
+from .history import ConversationHistory
+from audio_providers.replay_trace import load_trace, response_tokens
+
+
+class MockLLMProvider(LLMProvider):
+    """
+    Offline stand-in for GeminiLLMProvider: streams the trace's responses in
+    order (cycling) with their recorded time to first token and inter-token
+    gaps. History is kept like the real provider so speculative runs and
+    record_user()/record_reply() behave the same.
+    """
+
+    def __init__(self, system_prompt: str, trace: dict = None):
+        self.trace = trace or load_trace()["llm"]
+        self.history = ConversationHistory(system_prompt, max_tokens=None)
+        self.response_index = 0
+
+    async def generate_response(self, text_input: str, record_history: bool = True) -> AsyncGenerator[str, None]:
+        responses = self.trace["responses"]
+        response = responses[self.response_index % len(responses)]
+        self.response_index += 1
+        if record_history:
+            self.history.append("user", text_input)
+
+        for delay_ms, token in response_tokens(response):
+            await asyncio.sleep(delay_ms / 1000)
+            yield token
+
+    def record_user(self, user_text: str):
+        self.history.append("user", user_text)
+
+    def record_reply(self, assistant_text: str):
+        self.history.append("assistant", assistant_text)
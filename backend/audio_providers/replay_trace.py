@@ -0,0 +1,94 @@
+"""
+Timing traces replayed by the mock providers (stt/mock.py, llm/mock.py, tts/mock.py).
+
+A trace is a JSON object with one section per provider; any section missing
+from a trace file falls back to DEFAULT_TRACE:
+
+    {
+      "stt": {
+        "connect_ms": 80,           # websocket handshake
+        "speech_rms": 500,          # input RMS counted as speech
+        "endpointing_ms": 300,      # silence before the final transcript is decided
+        "final_ms": 120,            # ...and until it is delivered
+        "utterance_end_ms": 1000,   # silence before the UtteranceEnd signal
+        "idle_timeout_ms": 10000,   # stream closed after this long without audio or keepalive (0 = never)
+        "utterances": [             # replayed in order, cycling
+          {"interim": [[ms_after_speech_start, "partial text"], ...], "final": "Full text."}
+        ]
+      },
+      "llm": {
+        "responses": [              # replayed in order, cycling
+          {"ttft_ms": 380, "token_ms": 28, "text": "Reply text."},
+          {"tokens": [[delay_ms, "Reply"], [delay_ms, " text."]]}   # recorded per-token gaps
+        ]
+      },
+      "tts": {
+        "first_byte_ms": 190,       # request to first audio
+        "chunk_ms": 100,            # audio per chunk
+        "realtime_factor": 0.25,    # synthesis wall time per second of audio after the first chunk
+        "chars_per_s": 14           # speaking rate, sets audio length per sentence
+      }
+    }
+
+The default trace is shaped after typical provider timings (Deepgram nova-2
+streaming, a hosted flash-class LLM, ElevenLabs turbo PCM streaming).
+"""
+import re
+import json
+import copy
+from typing import List, Optional, Tuple
+
+DEFAULT_TRACE = {
+    "stt": {
+        "connect_ms": 80,
+        "speech_rms": 500,
+        "endpointing_ms": 300,
+        "final_ms": 120,
+        "utterance_end_ms": 1000,
+        "idle_timeout_ms": 10000,
+        "utterances": [
+            {"interim": [[260, "what's"], [520, "what's the weather"], [900, "what's the weather like tomorrow"]],
+             "final": "What's the weather like tomorrow?"},
+            {"interim": [[240, "can you"], [560, "can you remind me"], [950, "can you remind me to call mom"]],
+             "final": "Can you remind me to call mom?"},
+            {"interim": [[280, "thanks"], [600, "thanks that's all"]],
+             "final": "Thanks, that's all."},
+        ]
+    },
+    "llm": {
+        "responses": [
+            {"ttft_ms": 380, "token_ms": 28,
+             "text": "Tomorrow looks mild and mostly sunny. Expect a high around eighteen."},
+            {"ttft_ms": 350, "token_ms": 26,
+             "text": "Sure. I'll remind you to call her at six."},
+            {"ttft_ms": 320, "token_ms": 25,
+             "text": "You're welcome. Talk soon!"},
+        ]
+    },
+    "tts": {
+        "first_byte_ms": 190,
+        "chunk_ms": 100,
+        "realtime_factor": 0.25,
+        "chars_per_s": 14
+    }
+}
+
+
+def load_trace(path: Optional[str] = None) -> dict:
+    trace = copy.deepcopy(DEFAULT_TRACE)
+    if path:
+        with open(path) as f:
+            trace.update(json.load(f))
+    return trace
+
+
+def response_tokens(response: dict) -> List[Tuple[float, str]]:
+    """
+    (delay_ms, token) pairs for one LLM response: the recorded gaps when the
+    trace has them, else ttft_ms then token_ms per word-sized token.
+    """
+    if "tokens" in response:
+        return [(float(delay), token) for delay, token in response["tokens"]]
+    tokens = re.findall(r"\S+\s*", response.get("text", ""))
+    ttft, per_token = float(response.get("ttft_ms", 0)), float(response.get("token_ms", 0))
+    return [(ttft if i == 0 else per_token, token) for i, token in enumerate(tokens)]
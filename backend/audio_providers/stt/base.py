@@ -16,6 +16,18 @@ class STTProvider(ABC):
         """
         pass
 
+    async def send_keepalive(self):
+        """
+        Keep the connection open while no audio is being sent.
+        """
+        pass
+
+    async def finalize(self):
+        """
+        Ask for final transcripts of the audio sent so far without waiting for endpointing.
+        """
+        pass
+
     @abstractmethod
     async def listen(self) -> AsyncGenerator[dict, None]:
         """
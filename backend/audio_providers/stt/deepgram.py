@@ -6,6 +6,9 @@ from deepgram import (
     LiveOptions,
 )
 from .base import STTProvider
+from telemetry.logs import get_logger
+
+logger = get_logger("stt")
 
 class DeepgramSTTProvider(STTProvider):
     def __init__(self, api_key: str):
@@ -35,15 +38,15 @@ class DeepgramSTTProvider(STTProvider):
             pass
             
         async def on_utterance_end(self_dg, utterance_end, **kwargs):
-            print("[DeepgramProvider] Event: UtteranceEnd")
+            logger.debug("Event: UtteranceEnd")
             await self.queue.put({"type": "signal", "value": "utterance_end"})
 
         async def on_speech_started(self_dg, speech_started, **kwargs):
-             print("[DeepgramProvider] Event: SpeechStarted")
+             logger.debug("Event: SpeechStarted")
              await self.queue.put({"type": "signal", "value": "speech_started"})
 
         async def on_error(self_dg, error, **kwargs):
-            print(f"Deepgram Error: {error}")
+            logger.error("Deepgram error: %s", error)
 
         # Register handlers
         self.connection.on(LiveTranscriptionEvents.Transcript, on_message)
@@ -65,23 +68,39 @@ class DeepgramSTTProvider(STTProvider):
         )
         
         if await self.connection.start(options) is False:
-             print("Deepgram: Failed to start connection")
+             logger.error("Deepgram: Failed to start connection")
              raise Exception("Deepgram connection failed")
         
         self.running = True
-        print("Deepgram Connected")
+        logger.info("Deepgram connected")
 
     async def send_audio(self, audio_chunk: bytes):
         if self.connection and self.running:
             await self.connection.send(audio_chunk)
 
+    async def is_connected(self) -> bool:
+        if not (self.connection and self.running):
+            return False
+        try:
+            return await self.connection.is_connected()
+        except Exception:
+            return False
+
     async def send_keepalive(self):
         """Send a keepalive message to prevent Deepgram timeout."""
         if self.connection and self.running:
             try:
                 await self.connection.keep_alive()
             except Exception as e:
-                print(f"[Deepgram] Keepalive failed: {e}")
+                logger.warning("Keepalive failed: %s", e)
+
+    async def finalize(self):
+        """Flush Deepgram's buffered audio into a final transcript (sent when upstream audio pauses)."""
+        if self.connection and self.running:
+            try:
+                await self.connection.finalize()
+            except Exception as e:
+                logger.warning("Finalize failed: %s", e)
 
     async def listen(self):
         while self.running:
@@ -92,11 +111,11 @@ class DeepgramSTTProvider(STTProvider):
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"Error yielding transcript: {e}")
+                logger.error("Error yielding transcript: %s", e)
                 break
 
     async def close(self):
         self.running = False
         if self.connection:
             await self.connection.finish()
-        print("Deepgram Closed")
+        logger.info("Deepgram closed")
@@ -0,0 +1,134 @@
+import time
+import asyncio
+import numpy as np
+from .base import STTProvider
+from audio_providers.replay_trace import load_trace
+
+
+def chunk_rms(audio_chunk: bytes) -> float:
+    samples = np.frombuffer(audio_chunk[:len(audio_chunk) - len(audio_chunk) % 2], dtype="<i2").astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+
+class MockSTTProvider(STTProvider):
+    """
+    Offline stand-in for DeepgramSTTProvider that replays a timing trace
+    (audio_providers/replay_trace.py) against the audio it is sent.
+
+    Speech is detected by RMS. At each speech onset it emits speech_started and
+    replays the next utterance's interim transcripts at their recorded offsets;
+    after endpointing_ms of silence the final transcript follows (final_ms
+    later), then utterance_end once utterance_end_ms of silence have been sent.
+    Speech resuming before the final continues the same utterance; finalize()
+    decides the endpoint at once. Like Deepgram, the stream is closed after
+    idle_timeout_ms without audio or a keepalive.
+    """
+
+    def __init__(self, trace: dict = None):
+        self.trace = trace or load_trace()["stt"]
+        self.queue = asyncio.Queue()
+        self.running = False
+        self.utterance_index = 0
+        self.in_utterance = False
+        self.interim_task = None
+        self.endpoint_task = None
+        self.tasks = set()
+        self.watchdog_task = None
+        self.last_activity = time.monotonic()
+        self.stats = {"bytes_received": 0, "keepalives": 0, "finalizes": 0, "idle_closed": False}
+
+    async def connect(self):
+        await asyncio.sleep(self.trace.get("connect_ms", 0) / 1000)
+        self.running = True
+        self.last_activity = time.monotonic()
+        if self.trace.get("idle_timeout_ms"):
+            self.watchdog_task = asyncio.create_task(self._watchdog(self.trace["idle_timeout_ms"] / 1000))
+
+    async def is_connected(self) -> bool:
+        return self.running
+
+    async def send_keepalive(self):
+        self.last_activity = time.monotonic()
+        self.stats["keepalives"] += 1
+
+    async def finalize(self):
+        self.stats["finalizes"] += 1
+        if self.in_utterance:
+            self._start_endpoint(wait_ms=0)
+
+    async def send_audio(self, audio_chunk: bytes):
+        if not self.running:
+            return
+        self.last_activity = time.monotonic()
+        self.stats["bytes_received"] += len(audio_chunk)
+        if chunk_rms(audio_chunk) >= self.trace["speech_rms"]:
+            if self.endpoint_task:
+                self.endpoint_task.cancel()
+                self.endpoint_task = None
+            if not self.in_utterance:
+                self.in_utterance = True
+                utterances = self.trace["utterances"]
+                utterance = utterances[self.utterance_index % len(utterances)]
+                self.queue.put_nowait({"type": "signal", "value": "speech_started"})
+                self.interim_task = asyncio.create_task(self._replay_interims(utterance))
+        elif self.in_utterance and not self.endpoint_task:
+            self._start_endpoint(self.trace["endpointing_ms"])
+
+    def _start_endpoint(self, wait_ms: float):
+        if self.endpoint_task:
+            self.endpoint_task.cancel()
+        self.endpoint_task = asyncio.create_task(self._endpoint(wait_ms))
+        self.tasks.add(self.endpoint_task)
+        self.endpoint_task.add_done_callback(self.tasks.discard)
+
+    async def _replay_interims(self, utterance: dict):
+        elapsed_ms = 0.0
+        for at_ms, text in utterance.get("interim", []):
+            await asyncio.sleep(max(0.0, at_ms - elapsed_ms) / 1000)
+            elapsed_ms = at_ms
+            self.queue.put_nowait({"type": "text", "value": text, "is_final": False})
+
+    async def _endpoint(self, wait_ms: float):
+        trace = self.trace
+        await asyncio.sleep(wait_ms / 1000)
+        # Endpoint decided: no more interims for this utterance
+        if self.interim_task:
+            self.interim_task.cancel()
+        utterances = trace["utterances"]
+        utterance = utterances[self.utterance_index % len(utterances)]
+        self.utterance_index += 1
+        self.in_utterance = False
+        # Detached from here on: new speech starts the next utterance instead of cancelling this final
+        self.endpoint_task = None
+        await asyncio.sleep(trace["final_ms"] / 1000)
+        self.queue.put_nowait({"type": "text", "value": utterance["final"], "is_final": True})
+        received = self.stats["bytes_received"]
+        remaining_ms = trace["utterance_end_ms"] - trace["endpointing_ms"] - trace["final_ms"]
+        await asyncio.sleep(max(0.0, remaining_ms) / 1000)
+        # UtteranceEnd is derived from the audio timeline, so it needs audio to keep arriving
+        if not self.in_utterance and self.stats["bytes_received"] > received:
+            self.queue.put_nowait({"type": "signal", "value": "utterance_end"})
+
+    async def _watchdog(self, timeout_s: float):
+        while self.running:
+            await asyncio.sleep(timeout_s / 4)
+            if time.monotonic() - self.last_activity > timeout_s:
+                # Closed for inactivity: nothing more is transcribed
+                self.stats["idle_closed"] = True
+                self.running = False
+
+    async def listen(self):
+        while self.running:
+            try:
+                yield await self.queue.get()
+            except asyncio.CancelledError:
+                break
+
+    async def close(self):
+        self.running = False
+        if self.interim_task:
+            self.interim_task.cancel()
+        if self.watchdog_task:
+            self.watchdog_task.cancel()
+        for task in list(self.tasks):
+            task.cancel()
@@ -8,3 +8,16 @@ class TTSProvider(ABC):
         Process text chunk and yield audio bytes.
         """
         pass
+
+    def voice_identity(self) -> tuple:
+        """
+        (provider, voice, model): together with the text, identifies the audio
+        this provider produces. Used as the phrase cache key.
+        """
+        return (type(self).__name__, "", "")
+
+    async def close(self):
+        """
+        Release per-session resources. Shared clients are left open.
+        """
+        pass
@@ -0,0 +1,236 @@
+import os
+import time
+import asyncio
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import AsyncGenerator, Optional
+from .base import TTSProvider
+from telemetry.logs import get_logger
+from telemetry.metrics import REGISTRY, Counter
+
+logger = get_logger("tts")
+
+STREAM_CHUNK_BYTES = 8192
+
+TTS_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "donna_tts_cache_lookups",
+    "Phrase audio cache lookups by result (memory_hit, disk_hit, miss)",
+    ("result",)
+))
+TTS_CACHE_BYTES_SAVED = REGISTRY.register(Counter(
+    "donna_tts_cache_bytes_saved",
+    "TTS audio bytes served from the phrase cache instead of synthesized"
+))
+TTS_CACHE_LATENCY_SAVED = REGISTRY.register(Counter(
+    "donna_tts_cache_latency_saved_seconds",
+    "Synthesis first-byte latency avoided by phrase cache hits"
+))
+
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class PhraseAudioCache:
+    """
+    Content-addressed PCM cache shared by all sessions.
+
+    Keys are sha256(provider, voice, model, normalized text). Entries live in an
+    in-memory LRU bounded by a byte budget; with a directory configured, they are
+    also written to disk (own byte budget, oldest evicted) and read back, off the
+    event loop, when they have fallen out of memory. Each file is named
+    "<key>-<first byte ms>.pcm", so a disk hit after a restart still knows how
+    much synthesis time it saved.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entry_bytes: int = 512 * 1024,
+                 disk_dir: str = None, max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()  # key -> pcm, least recently used first
+        self.memory_bytes = 0
+        self.disk = OrderedDict()  # key -> (size, synthesis first byte in ms), oldest first
+        self.disk_bytes = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "bytes_saved": 0, "latency_saved_s": 0.0}
+        # Synthesis first-byte latency per key, so a hit knows how much time it saved
+        self._first_byte = {}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(disk_dir):
+                key, _, first_byte_ms = name[:-4].partition("-")
+                if name.endswith(".pcm") and first_byte_ms.isdigit():
+                    path = os.path.join(disk_dir, name)
+                    entries.append((os.path.getmtime(path), key, os.path.getsize(path), int(first_byte_ms)))
+            for _, key, size, first_byte_ms in sorted(entries):
+                self.disk[key] = (size, first_byte_ms)
+                self.disk_bytes += size
+
+    @staticmethod
+    def make_key(identity: tuple, text: str) -> str:
+        raw = "\x1f".join([*identity, normalize_phrase(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def _disk_path(self, key: str, first_byte_ms: int) -> str:
+        return os.path.join(self.disk_dir, f"{key}-{first_byte_ms}.pcm")
+
+    def get_memory(self, key: str):
+        pcm = self.memory.get(key)
+        if pcm is not None:
+            self.memory.move_to_end(key)
+        return pcm
+
+    def put(self, key: str, pcm: bytes, first_byte_s: float):
+        if not pcm or len(pcm) > self.max_entry_bytes or len(pcm) > self.max_bytes:
+            return
+        self._first_byte[key] = first_byte_s
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key))
+        self.memory[key] = pcm
+        self.memory_bytes += len(pcm)
+        while self.memory_bytes > self.max_bytes:
+            old_key, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+            if old_key not in self.disk:
+                self._first_byte.pop(old_key, None)
+
+    def _write_disk(self, path: str, pcm: bytes):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(pcm)
+        os.replace(tmp, path)
+
+    async def put_disk(self, key: str, pcm: bytes):
+        if not self.disk_dir or key in self.disk or not pcm or len(pcm) > self.max_entry_bytes:
+            return
+        first_byte_ms = round(self._first_byte.get(key, 0.0) * 1000)
+        try:
+            await asyncio.to_thread(self._write_disk, self._disk_path(key, first_byte_ms), pcm)
+        except OSError as e:
+            logger.warning("[TTS Cache] Disk write failed: %s", e)
+            return
+        self.disk[key] = (len(pcm), first_byte_ms)
+        self.disk_bytes += len(pcm)
+        while self.disk_bytes > self.max_disk_bytes and self.disk:
+            old_key, (size, old_first_byte_ms) = self.disk.popitem(last=False)
+            self.disk_bytes -= size
+            if old_key not in self.memory:
+                self._first_byte.pop(old_key, None)
+            try:
+                os.remove(self._disk_path(old_key, old_first_byte_ms))
+            except OSError:
+                pass
+
+    def first_byte_latency(self, key: str) -> float:
+        if key in self._first_byte:
+            return self._first_byte[key]
+        if key in self.disk:
+            return self.disk[key][1] / 1000
+        return 0.0
+
+    def record_hit(self, key: str, size: int, from_disk: bool = False):
+        latency_saved = self.first_byte_latency(key)
+        self.stats["hits"] += 1
+        if from_disk:
+            self.stats["disk_hits"] += 1
+        self.stats["bytes_saved"] += size
+        self.stats["latency_saved_s"] += latency_saved
+        TTS_CACHE_LOOKUPS.inc("disk_hit" if from_disk else "memory_hit")
+        TTS_CACHE_BYTES_SAVED.inc(amount=size)
+        TTS_CACHE_LATENCY_SAVED.inc(amount=latency_saved)
+
+    def record_miss(self):
+        self.stats["misses"] += 1
+        TTS_CACHE_LOOKUPS.inc("miss")
+
+    @staticmethod
+    def _read_disk(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    async def get_disk(self, key: str) -> Optional[bytes]:
+        """
+        The cached PCM for key from the disk tier, or None. Read in a worker
+        thread: entries are small (max_entry_bytes) but the disk may not be fast.
+        """
+        if not self.disk_dir or key not in self.disk:
+            return None
+        size, first_byte_ms = self.disk[key]
+        try:
+            pcm = await asyncio.to_thread(self._read_disk, self._disk_path(key, first_byte_ms))
+        except OSError:
+            pcm = None
+        if not pcm:
+            # Gone or unreadable (or evicted meanwhile): forget it
+            if self.disk.pop(key, None) is not None:
+                self.disk_bytes -= size
+            return None
+        return pcm
+
+
+class CachedTTSProvider(TTSProvider):
+    """
+    Serves repeated phrases from a PhraseAudioCache and fills it on misses.
+    Wraps any TTSProvider.
+    """
+
+    def __init__(self, inner: TTSProvider, cache: PhraseAudioCache):
+        self.inner = inner
+        self.cache = cache
+
+    def voice_identity(self) -> tuple:
+        return self.inner.voice_identity()
+
+    async def close(self):
+        await self.inner.close()
+
+    async def stream_audio(self, text_chunk: str) -> AsyncGenerator[bytes, None]:
+        key = self.cache.make_key(self.inner.voice_identity(), text_chunk)
+
+        pcm = self.cache.get_memory(key)
+        if pcm is not None:
+            self.cache.record_hit(key, len(pcm))
+            logger.debug("[TTS Cache] Hit: '%.40s' (%d bytes)", text_chunk, len(pcm))
+            for i in range(0, len(pcm), STREAM_CHUNK_BYTES):
+                yield pcm[i:i + STREAM_CHUNK_BYTES]
+            return
+
+        pcm = await self.cache.get_disk(key)
+        if pcm is not None:
+            self.cache.record_hit(key, len(pcm), from_disk=True)
+            self.cache.put(key, pcm, self.cache.first_byte_latency(key))
+            logger.debug("[TTS Cache] Disk hit: '%.40s' (%d bytes)", text_chunk, len(pcm))
+            for i in range(0, len(pcm), STREAM_CHUNK_BYTES):
+                yield pcm[i:i + STREAM_CHUNK_BYTES]
+            return
+
+        self.cache.record_miss()
+        start = time.monotonic()
+        first_byte_s = None
+        collected = bytearray()
+        cacheable = True
+        async for chunk in self.inner.stream_audio(text_chunk):
+            if chunk:
+                if first_byte_s is None:
+                    first_byte_s = time.monotonic() - start
+                if cacheable:
+                    collected.extend(chunk)
+                    cacheable = len(collected) <= self.cache.max_entry_bytes
+            else:
+                # Providers yield b"" when synthesis failed: never cache partial audio
+                cacheable = False
+            yield chunk
+
+        # Only reached when the stream ran to completion (not on cancellation)
+        if collected and cacheable:
+            pcm = bytes(collected)
+            self.cache.put(key, pcm, first_byte_s or 0.0)
+            await self.cache.put_disk(key, pcm)
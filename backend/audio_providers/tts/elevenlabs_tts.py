@@ -1,40 +1,50 @@
 from typing import AsyncGenerator
 from elevenlabs.client import AsyncElevenLabs
 from .base import TTSProvider
+from audio_providers.clients import get_elevenlabs_client
+from telemetry.logs import get_logger
+
+logger = get_logger("tts")
 
 class ElevenLabsTTSProvider(TTSProvider):
-    def __init__(self, api_key: str, voice_id: str = "JBFqnCBsd6RMkjVDRZzb"): # Default to George
-        self.client = AsyncElevenLabs(api_key=api_key)
+    def __init__(self, api_key: str, voice_id: str = "JBFqnCBsd6RMkjVDRZzb", # Default to George
+                 client: AsyncElevenLabs = None):
+        # Shared across sessions (one pooled connection set per API key) unless passed explicitly
+        self.client = client or get_elevenlabs_client(api_key)
         self.voice_id = voice_id
+        self.model_id = "eleven_turbo_v2_5"
+
+    def voice_identity(self) -> tuple:
+        return ("elevenlabs", self.voice_id, f"{self.model_id}/pcm_24000")
 
     async def stream_audio(self, text_chunk: str) -> AsyncGenerator[bytes, None]:
         """
         Streams audio for a given text chunk (ideally a sentence).
         """
-        print(f"[ElevenLabs] Requesting TTS for: '{text_chunk[:20]}...'")
+        logger.debug("[ElevenLabs] Requesting TTS for: '%.20s...'", text_chunk)
 
         try:
             audio_stream = self.client.text_to_speech.convert(
                 text=text_chunk,
                 voice_id=self.voice_id,
-                model_id="eleven_turbo_v2_5",
+                model_id=self.model_id,
                 output_format="pcm_24000"
             )
 
             chunk_count = 0
             total_bytes = 0
-            print("[ElevenLabs] Stream started")
+            logger.debug("[ElevenLabs] Stream started")
             
             async for chunk in audio_stream:
                 if chunk:
                     chunk_count += 1
                     total_bytes += len(chunk)
                     if chunk_count == 1:
-                        print(f"[ElevenLabs] First chunk received ({len(chunk)} bytes)")
+                        logger.debug("[ElevenLabs] First chunk received (%d bytes)", len(chunk))
                     yield chunk
             
-            print(f"[ElevenLabs] Stream finished. Total: {total_bytes} bytes, {chunk_count} chunks")
+            logger.debug("[ElevenLabs] Stream finished. Total: %d bytes, %d chunks", total_bytes, chunk_count)
 
         except Exception as e:
-            print(f"[ElevenLabs Error] {e}")
+            logger.error("[ElevenLabs] %s", e)
             yield b"" # Yield empty bytes to avoid crashing loop?
\ No newline at end of file
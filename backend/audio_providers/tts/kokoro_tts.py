@@ -1,49 +1,123 @@
+import time
 import httpx
 from typing import AsyncGenerator
 from .base import TTSProvider
+from audio_providers.clients import get_http_client, HTTP2_AVAILABLE  # noqa: F401 - re-exported for benchmarks
+from telemetry.logs import get_logger
+
+logger = get_logger("tts")
 
 
 class KokoroTTSProvider(TTSProvider):
-    def __init__(self, base_url: str = "https://kokoro.jmwalker.dev", voice: str = "bf_emma"):
+    def __init__(self, base_url: str = "https://kokoro.jmwalker.dev", voice: str = "bf_emma", streaming: bool = True,
+                 client: httpx.AsyncClient = None):
         self.base_url = base_url.rstrip("/")
         self.voice = voice
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.streaming = streaming
+        # Warm keep-alive connections shared by all sessions (audio_providers/clients.py);
+        # an explicitly passed client is owned by this provider and closed with it
+        self.owns_client = client is not None
+        self.client = client or get_http_client("kokoro")
+        # (first_byte_s, total_s, bytes) of the most recent sentence
+        self.last_timing = None
+
+    def voice_identity(self) -> tuple:
+        return ("kokoro", self.voice, "kokoro")
+
+    def _request_body(self, text_chunk: str, stream: bool) -> dict:
+        return {
+            "model": "kokoro",
+            "input": text_chunk,
+            "voice": self.voice,
+            "response_format": "pcm",
+            "stream": stream
+        }
 
     async def stream_audio(self, text_chunk: str) -> AsyncGenerator[bytes, None]:
         """
-        Gets audio for a given text chunk using Kokoro TTS (non-streaming).
+        Gets audio for a given text chunk using Kokoro TTS.
         Output is PCM 24kHz 16-bit mono.
         """
-        print(f"[Kokoro] Requesting TTS for: '{text_chunk[:50]}...' (non-streaming)")
+        if self.streaming:
+            async for chunk in self._stream_audio_chunked(text_chunk):
+                yield chunk
+        else:
+            async for chunk in self._stream_audio_whole(text_chunk):
+                yield chunk
+
+    async def _stream_audio_chunked(self, text_chunk: str) -> AsyncGenerator[bytes, None]:
+        """
+        Streaming request: yields PCM as the server produces it.
+        """
+        logger.debug("[Kokoro] Requesting TTS for: '%.50s...' (streaming)", text_chunk)
+        start = time.monotonic()
+        first_byte_at = None
+        total_bytes = 0
+        carry = b""  # chunk boundaries may split a 16-bit sample
+
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}/v1/audio/speech",
+                json=self._request_body(text_chunk, stream=True)
+            ) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    logger.error("[Kokoro] Status %d: %r", response.status_code, body[:200])
+                    yield b""
+                    return
+
+                async for data in response.aiter_bytes():
+                    if not data:
+                        continue
+                    if first_byte_at is None:
+                        first_byte_at = time.monotonic()
+                        logger.debug("[Kokoro] First audio after %.0f ms", (first_byte_at - start) * 1000)
+                    data = carry + data
+                    usable = len(data) - len(data) % 2
+                    carry = data[usable:]
+                    if usable:
+                        total_bytes += usable
+                        yield data[:usable]
+
+            total = time.monotonic() - start
+            self.last_timing = ((first_byte_at or time.monotonic()) - start, total, total_bytes)
+            logger.debug("[Kokoro] Received %d bytes for sentence in %.0f ms", total_bytes, total * 1000)
+
+        except Exception as e:
+            logger.error("[Kokoro] %s", e)
+            yield b""
+
+    async def _stream_audio_whole(self, text_chunk: str) -> AsyncGenerator[bytes, None]:
+        """
+        Non-streaming request: the whole sentence arrives as one blob.
+        """
+        logger.debug("[Kokoro] Requesting TTS for: '%.50s...' (non-streaming)", text_chunk)
+        start = time.monotonic()
 
         try:
-            # Non-streaming request - get full audio at once
             response = await self.client.post(
                 f"{self.base_url}/v1/audio/speech",
-                json={
-                    "model": "kokoro",
-                    "input": text_chunk,
-                    "voice": self.voice,
-                    "response_format": "pcm"
-                    # No "stream": True
-                },
-                headers={"Content-Type": "application/json"}
+                json=self._request_body(text_chunk, stream=False)
             )
 
             if response.status_code != 200:
-                print(f"[Kokoro Error] Status {response.status_code}: {response.text}")
+                logger.error("[Kokoro] Status %d: %.200s", response.status_code, response.text)
                 yield b""
                 return
 
             audio_data = response.content
-            print(f"[Kokoro] Received {len(audio_data)} bytes for sentence")
+            total = time.monotonic() - start
+            self.last_timing = (total, total, len(audio_data))
+            logger.debug("[Kokoro] Received %d bytes for sentence in %.0f ms", len(audio_data), total * 1000)
 
             # Yield the full audio as one chunk
             yield audio_data
 
         except Exception as e:
-            print(f"[Kokoro Error] {e}")
+            logger.error("[Kokoro] %s", e)
             yield b""
 
     async def close(self):
-        await self.client.aclose()
+        if self.owns_client:
+            await self.client.aclose()
@@ -0,0 +1,41 @@
+import asyncio
+import numpy as np
+from typing import AsyncGenerator
+from .base import TTSProvider
+from audio_providers.replay_trace import load_trace
+
+SAMPLE_RATE = 24000
+
+
+class MockTTSProvider(TTSProvider):
+    """
+    Offline stand-in for the streaming TTS providers: 24kHz 16-bit mono PCM
+    (a quiet tone) whose length follows the text at the trace's speaking rate,
+    first chunk after first_byte_ms, the rest paced at realtime_factor.
+    """
+
+    def __init__(self, trace: dict = None):
+        self.trace = trace or load_trace()["tts"]
+        t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+        self.tone = (2000 * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+
+    def voice_identity(self) -> tuple:
+        return ("mock", "tone", "mock")
+
+    async def stream_audio(self, text_chunk: str) -> AsyncGenerator[bytes, None]:
+        trace = self.trace
+        duration_s = max(0.3, len(text_chunk) / trace["chars_per_s"])
+        chunk_bytes = int(SAMPLE_RATE * trace["chunk_ms"] / 1000) * 2
+        total_bytes = int(duration_s * SAMPLE_RATE) * 2
+        await asyncio.sleep(trace["first_byte_ms"] / 1000)
+        sent = 0
+        while sent < total_bytes:
+            if sent:
+                await asyncio.sleep(trace["chunk_ms"] * trace["realtime_factor"] / 1000)
+            size = min(chunk_bytes, total_bytes - sent)
+            offset = sent % len(self.tone)
+            chunk = self.tone[offset:offset + size]
+            if len(chunk) < size:
+                chunk += self.tone[:size - len(chunk)]
+            sent += size
+            yield chunk
@@ -0,0 +1,236 @@
+"""
+/ws audio codecs: wire bytes, codec CPU and delivery latency on slow links.
+
+Per configuration (codec, and for "8 kHz" a negotiated 8 kHz rate both ways):
+
+- downlink: replies (4 s of speech-like audio at the engines' 24 kHz, in
+  100 ms TTS chunks produced at 4x real time) go through the real
+  OutputChannel (resample, encode, frame) into a recording socket;
+- uplink: 100 ms mic frames of a continuous conversation, encoded as the
+  client would and decoded + resampled to 16 kHz as DonnaSession does.
+
+Reported: wire kbps per direction (frame header and WebSocket framing
+included), codec CPU of one session (server encode/decode/resample plus the
+client side, as Python; % of a core per real-time session), fidelity of the lossy
+codecs (waveform SNR, and band spectral error for Opus, which doesn't keep the
+waveform), and delivery over a simulated link of each rate (FIFO, one direction
+each): reply time to first audio and playback stall, and uplink frame delay
+(capture -> decoded on the server). Where the codec's bitrate exceeds the link,
+the backlog grows for as long as audio flows.
+
+Opus needs opuslib + libopus; without them its rows are skipped.
+
+Run from backend/:
+    python -m benchmarks.audio_codecs [--seconds 30] [--links 256,64]
+"""
+import os
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+import json
+import time
+import base64
+import asyncio
+import argparse
+import statistics
+import numpy as np
+
+from audio_dsp.resample import StreamingResampler
+from benchmarks.pcm_source import synthetic_conversation
+from transport.audio_frames import HEADER_SIZE
+from transport.output_channel import OutputChannel
+from transport.codecs import (CODEC_PCM16, CODEC_MULAW, CODEC_OPUS, OPUS_AVAILABLE,
+                              create_encoder, create_decoder)
+
+ENGINE_OUTPUT_RATE = 24000
+ENGINE_INPUT_RATE = 16000
+TTS_CHUNK_S = 0.1
+TTS_SPEEDUP = 4
+REPLY_S = 4.0
+REPLY_EVERY_S = 10.0
+MIC_FRAME_S = 0.1
+
+# name, audio_transport, codec, negotiated rate (None = engine rates)
+CONFIGS = [
+    ("pcm16 json/base64", "json", CODEC_PCM16, None),
+    ("pcm16 binary", "binary", CODEC_PCM16, None),
+    ("mulaw binary", "binary", CODEC_MULAW, None),
+    ("mulaw binary 8 kHz", "binary", CODEC_MULAW, 8000),
+    ("opus binary", "binary", CODEC_OPUS, None),
+]
+
+
+def ws_overhead(payload: int, masked: bool) -> int:
+    # WebSocket frame header; client -> server frames carry a 4-byte mask
+    length = 2 if payload < 126 else 4 if payload < 65536 else 10
+    return length + (4 if masked else 0)
+
+
+def fidelity(reference: np.ndarray, decoded: np.ndarray):
+    """
+    (waveform SNR dB, mean band spectral error dB). Opus rebuilds the spectrum,
+    not the waveform, so only the second is meaningful for it.
+    """
+    n = min(len(reference), len(decoded))
+    ref, out = reference[:n].astype(np.float64), decoded[:n].astype(np.float64)
+    # Lossy codecs may delay the signal (Opus lookahead): compare at the best lag
+    best = max(range(0, 400), key=lambda lag: np.dot(ref[:n - lag], out[lag:]) if lag < n else -np.inf)
+    ref, out = ref[:n - best], out[best:]
+    snr = 10 * np.log10(np.sum(ref ** 2) / max(1e-9, np.sum((ref - out) ** 2)))
+    # 24 equal bands, the top 4 (near Nyquist, nearly empty) left out
+    ref_bands = np.array_split(np.abs(np.fft.rfft(ref)), 24)[:20]
+    out_bands = np.array_split(np.abs(np.fft.rfft(out)), 24)[:20]
+    spectral = np.mean([abs(20 * np.log10(o.sum() / r.sum())) for r, o in zip(ref_bands, out_bands)])
+    return snr, spectral
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_bytes(self, data: bytes):
+        self.messages.append(data)
+
+    async def send_text(self, text: str):
+        self.messages.append(text)
+
+
+def simulate_link(messages, kbps):
+    """
+    messages: (ready_at_s, wire_bytes) in send order -> time each one is fully received.
+    """
+    free_at = 0.0
+    done = []
+    for ready_at, size in messages:
+        free_at = max(ready_at, free_at) + size * 8 / (kbps * 1000)
+        done.append(free_at)
+    return done
+
+
+async def downlink(transport, codec, rate, seconds):
+    socket = RecordingSocket()
+    channel = OutputChannel(socket)
+    channel.negotiate({"audio_transport": [transport], "output_sample_rates": [rate] if rate else []})
+    channel.set_codec(codec)
+    decoder = create_decoder(codec, rate or ENGINE_OUTPUT_RATE)
+    reply, _ = synthetic_conversation(utterances=1, speech_s=REPLY_S, gap_s=0.0, sample_rate=ENGINE_OUTPUT_RATE)
+    chunk_bytes = int(TTS_CHUNK_S * ENGINE_OUTPUT_RATE) * 2
+    chunks = [reply[i:i + chunk_bytes] for i in range(0, len(reply), chunk_bytes)]
+
+    replies = int(seconds // REPLY_EVERY_S)
+    server_cpu = client_cpu = 0.0
+    sent = []  # per reply: [(ready_at, wire bytes, audio s)]
+    decoded = bytearray()
+    for r in range(replies):
+        messages = []
+        for k, pcm in enumerate(chunks):
+            produced_at = r * REPLY_EVERY_S + k * TTS_CHUNK_S / TTS_SPEEDUP
+            start = time.process_time()
+            await channel.send_audio(pcm, ENGINE_OUTPUT_RATE)
+            server_cpu += time.process_time() - start
+            await channel.flush()
+            for message in socket.messages:
+                start = time.process_time()
+                if isinstance(message, str):
+                    payload = base64.b64decode(json.loads(message)["data"])
+                    wire = len(message.encode())
+                else:
+                    payload = message[HEADER_SIZE:]
+                    wire = len(message)
+                pcm_out = decoder.decode(payload)
+                client_cpu += time.process_time() - start
+                if r == 0:
+                    decoded += pcm_out
+                messages.append((produced_at, wire + ws_overhead(wire, False), len(pcm) / 2 / ENGINE_OUTPUT_RATE))
+            socket.messages.clear()
+        sent.append(messages)
+
+    reference = np.frombuffer(reply, dtype="<i2")
+    if rate:
+        reference = np.frombuffer(StreamingResampler(ENGINE_OUTPUT_RATE, rate).process(reply), dtype="<i2")
+    quality = fidelity(reference, np.frombuffer(bytes(decoded), dtype="<i2"))
+    return sent, server_cpu, client_cpu, quality
+
+
+def uplink(codec, rate, seconds):
+    pcm, _ = synthetic_conversation(utterances=int(seconds // 3), speech_s=1.5, gap_s=1.5)
+    client_rate = rate or ENGINE_INPUT_RATE
+    if rate:
+        pcm = StreamingResampler(ENGINE_INPUT_RATE, rate).process(pcm)
+    frame_bytes = int(MIC_FRAME_S * client_rate) * 2
+    frames = [pcm[i:i + frame_bytes] for i in range(0, len(pcm) - frame_bytes + 1, frame_bytes)]
+    encoder = create_encoder(codec, client_rate)
+    decoder = create_decoder(codec, client_rate) if codec != CODEC_PCM16 else None
+    resampler = StreamingResampler(client_rate, ENGINE_INPUT_RATE) if rate else None
+    client_cpu = server_cpu = 0.0
+    messages = []
+    for i, frame in enumerate(frames):
+        start = time.process_time()
+        payload = encoder.encode(frame)
+        client_cpu += time.process_time() - start
+        start = time.process_time()
+        out = decoder.decode(payload) if decoder else payload
+        if resampler:
+            out = resampler.process(out)
+        server_cpu += time.process_time() - start
+        messages.append(((i + 1) * MIC_FRAME_S, len(payload) + ws_overhead(len(payload), True)))
+    return messages, client_cpu, server_cpu, len(frames) * MIC_FRAME_S
+
+
+def playback(messages, done):
+    """
+    (time to first audio, stall) of one reply: playback starts when the first
+    chunk is in and stalls whenever the next one isn't.
+    """
+    ttfa = done[0] - messages[0][0]
+    clock, stall = done[0], 0.0
+    for (_, _, audio_s), arrived in zip(messages, done):
+        if arrived > clock:
+            stall += arrived - clock
+            clock = arrived
+        clock += audio_s
+    return ttfa, stall
+
+
+async def main_async(args):
+    links = [float(k) for k in args.links.split(",")]
+    print(f"{args.seconds:.0f} s session: replies of {REPLY_S:.0f} s every {REPLY_EVERY_S:.0f} s "
+          f"(TTS at {TTS_SPEEDUP}x real time), continuous mic upload")
+    for name, transport, codec, rate in CONFIGS:
+        if codec == CODEC_OPUS and not OPUS_AVAILABLE:
+            print(f"\n{name}: skipped (opuslib/libopus not installed)")
+            continue
+        replies, down_server, down_client, quality = await downlink(transport, codec, rate, args.seconds)
+        up_messages, up_client, up_server, up_s = uplink(codec, rate, args.seconds)
+        down_s = sum(audio_s for messages in replies for _, _, audio_s in messages)
+        down_kbps = sum(size for messages in replies for _, size, _ in messages) * 8 / down_s / 1000
+        up_kbps = sum(size for _, size in up_messages) * 8 / up_s / 1000
+        # Share of a core for one session with the mic always on and the agent talking 40% of the time
+        talk_share = REPLY_S / REPLY_EVERY_S
+        cpu = ((down_server + down_client) / down_s * talk_share + (up_server + up_client) / up_s) * 100
+        line = f"\n{name}: down {down_kbps:6.1f} kbps, up {up_kbps:6.1f} kbps, codec CPU {cpu:.3f}% of a core/session"
+        if codec != CODEC_PCM16 or rate:
+            line += f", downlink SNR {quality[0]:.1f} dB, spectral error {quality[1]:.2f} dB"
+        print(line)
+        for kbps in links:
+            ttfa, stalls = [], []
+            for messages in replies:
+                done = simulate_link([(ready, size) for ready, size, _ in messages], kbps)
+                first, stall = playback(messages, done)
+                ttfa.append(first)
+                stalls.append(stall)
+            up_done = simulate_link(up_messages, kbps)
+            up_delay = [arrived - ready for (ready, _), arrived in zip(up_messages, up_done)]
+            print(f"  {kbps:5.0f} kbps link: reply first audio {statistics.mean(ttfa) * 1000:6.0f} ms, "
+                  f"playback stall {statistics.mean(stalls) * 1000:6.0f} ms/reply, uplink frame delay "
+                  f"p50 {statistics.median(up_delay) * 1000:6.0f} ms / end {up_delay[-1] * 1000:7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=30, help="session length (replies every 10 s)")
+    parser.add_argument("--links", default="256,64", help="simulated link rates, kbps")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
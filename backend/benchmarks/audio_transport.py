@@ -0,0 +1,75 @@
+"""
+Compare the two /ws audio transports for outbound TTS/model audio.
+
+For each mode, measures bytes on the wire and CPU per chunk on both ends:
+  - json:   base64 + json.dumps on the server, json.loads + base64 decode on the client
+  - binary: 12-byte header + raw PCM on the server, header parse + zero-copy view on the client
+and the resulting audio throughput one core can sustain.
+
+Run from backend/:
+    python -m benchmarks.audio_transport [--chunk-bytes 4096] [--chunks 5000]
+"""
+import json
+import time
+import base64
+import argparse
+import numpy as np
+
+from transport.audio_frames import encode_audio_frame, decode_audio_frame
+
+SAMPLE_RATE = 24000
+
+
+def encode_json(pcm: bytes, seq: int):
+    return json.dumps({"type": "audio", "data": base64.b64encode(pcm).decode("utf-8")})
+
+
+def decode_json(message: str):
+    return np.frombuffer(base64.b64decode(json.loads(message)["data"]), dtype="<i2")
+
+
+def encode_binary(pcm: bytes, seq: int):
+    return encode_audio_frame(pcm, 0, seq, SAMPLE_RATE)
+
+
+def decode_binary(message: bytes):
+    _, payload = decode_audio_frame(message)
+    return np.frombuffer(payload, dtype="<i2")
+
+
+def run(encode, decode, chunks):
+    start = time.perf_counter()
+    messages = [encode(pcm, seq) for seq, pcm in enumerate(chunks)]
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for message in messages:
+        decode(message)
+    decode_s = time.perf_counter() - start
+
+    wire = sum(len(m) for m in messages)
+    return wire, encode_s, decode_s
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-bytes", type=int, default=4096)
+    parser.add_argument("--chunks", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    chunks = [rng.integers(-8000, 8000, args.chunk_bytes // 2, dtype=np.int16).tobytes() for _ in range(args.chunks)]
+    payload = args.chunk_bytes * args.chunks
+    audio_s = payload / 2 / SAMPLE_RATE
+
+    print(f"{args.chunks} chunks x {args.chunk_bytes} bytes ({audio_s:.0f}s of {SAMPLE_RATE}Hz audio)")
+    for name, encode, decode in (("json", encode_json, decode_json), ("binary", encode_binary, decode_binary)):
+        wire, encode_s, decode_s = run(encode, decode, chunks)
+        print(f"- {name:6s}: wire {wire / payload * 100:5.1f}% of PCM ({wire} bytes), "
+              f"server {encode_s / args.chunks * 1e6:6.2f} us/chunk, "
+              f"client {decode_s / args.chunks * 1e6:6.2f} us/chunk, "
+              f"server throughput {audio_s / encode_s:,.0f}x realtime")
+
+
+if __name__ == "__main__":
+    main()
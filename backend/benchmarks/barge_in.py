@@ -0,0 +1,224 @@
+"""
+Barge-in: interruption-to-silence latency over /ws.
+
+Starts serve.py the way ws_harness does (mock pipeline, or the Live API
+stand-in with --engine gemini_live). Each of --sessions clients asks a
+question, lets the reply play for --barge-after-s and then talks over it,
+--barge-ins times. Playback is modelled like the frontend: chunks play back
+to back as they arrive, and stop_audio cuts what is scheduled.
+
+Per barge-in (from the client's first frame of interrupting speech):
+- stop_audio: until the stop_audio message arrives;
+- silence: until the interrupted reply is no longer heard, for two clients:
+  "legacy" plays any audio that arrives after the stop (the frontend before
+  generation ids), "generation" drops audio older than the stop's generation;
+- stale audio: audio of the interrupted reply that still arrived after the stop.
+
+The interrupted reply ends where the reply to the interruption starts: the
+first {"type": "state", "state": "processing"} after the interrupting
+utterance was sent. Audio of the interrupted reply announced as a new turn
+while the user is still talking is counted as stale.
+
+With --realtime-reply (gemini_live) the stand-in streams its reply in real time
+and, like the Live API, keeps streaming a talked-over reply for
+--interrupt-ms before sending "interrupted", so audio Google is still sending
+after the local barge-in has to be dropped by the engine.
+
+Run from backend/:
+    python -m benchmarks.barge_in [--engine pipeline] [--sessions 4] [--barge-ins 3] [--realtime-reply]
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+import websockets
+
+from audio_dsp.frame import analyze_frame
+from benchmarks.load_test import wait_ready
+from benchmarks.pcm_source import synthetic_conversation, split_frames
+from benchmarks.ws_harness import FRAME_S, SPEECH_RMS, start_processes
+from transport.audio_frames import HEADER_SIZE, decode_audio_frame
+
+# Reply audio bytes per ms: PCM16 at the engines' 24 kHz
+AUDIO_BYTES_PER_MS = 48
+
+
+def speech_and_silence():
+    pcm, _ = synthetic_conversation(utterances=1, speech_s=1.2, gap_s=1.0)
+    frames = [(frame, analyze_frame(frame).stats.rms >= SPEECH_RMS) for frame in split_frames(pcm)]
+    return [frame for frame, speech in frames if speech], [frame for frame, speech in frames if not speech]
+
+
+def is_stale(generation, current):
+    behind = (current - generation) & 0xFFFF
+    return behind != 0 and behind < 0x8000
+
+
+def silence_at(events, start, end, barge_at, use_generation):
+    """
+    When the reply playing at barge_at stops being heard, with playback
+    modelled over events[:end] (events[start:end] being the interrupted
+    reply's window); None if nothing was playing at barge_at.
+    """
+    state = {"ends_at": 0.0, "generation": 0}
+
+    def play(t, kind, value, audio_ms):
+        if kind == "stop":
+            state["ends_at"] = min(state["ends_at"], t)
+            if use_generation and value is not None:
+                state["generation"] = value & 0xFFFF
+        elif kind == "audio" and not (use_generation and is_stale(value, state["generation"])):
+            state["ends_at"] = max(state["ends_at"], t) + audio_ms / 1000
+
+    for event in events[:start]:
+        play(*event)
+    if state["ends_at"] <= barge_at:
+        return None
+    for event in events[start:end]:
+        play(*event)
+    return max(state["ends_at"], barge_at)
+
+
+def measure(events, barge_at, spoken_until):
+    start = next((i for i, event in enumerate(events) if event[0] >= barge_at), len(events))
+    end = next((i for i in range(start, len(events)) if events[i][1] == "turn" and events[i][0] >= spoken_until),
+               len(events))
+    legacy = silence_at(events, start, end, barge_at, use_generation=False)
+    if legacy is None:
+        return None
+    aware = silence_at(events, start, end, barge_at, use_generation=True)
+    stop = next((events[i] for i in range(start, end) if events[i][1] == "stop"), None)
+    stale_ms = 0.0
+    if stop:
+        stale_ms = sum(audio_ms for t, kind, _, audio_ms in events[start:end] if kind == "audio" and t > stop[0])
+    return {
+        "stop_ms": (stop[0] - barge_at) * 1000 if stop else None,
+        "legacy_ms": (legacy - barge_at) * 1000,
+        "generation_ms": (aware - barge_at) * 1000,
+        "stale_ms": stale_ms,
+    }
+
+
+async def run_client(url, speech, silence, args, results):
+    async with websockets.connect(url, max_size=None) as ws:
+        # (arrival time, "audio" | "stop" | "turn", generation, audio ms)
+        events = []
+
+        async def receive():
+            async for message in ws:
+                now = time.perf_counter()
+                if isinstance(message, bytes):
+                    header, _ = decode_audio_frame(message)
+                    events.append((now, "audio", header.generation, (len(message) - HEADER_SIZE) / AUDIO_BYTES_PER_MS))
+                    continue
+                msg = json.loads(message)
+                if msg.get("type") == "stop_audio":
+                    events.append((now, "stop", msg.get("generation"), 0.0))
+                elif msg.get("type") == "state" and msg.get("state") == "processing":
+                    events.append((now, "turn", None, 0.0))
+
+        receiver = asyncio.create_task(receive())
+        await ws.send(json.dumps({"type": "hello", "audio_transport": ["binary"]}))
+        start = time.perf_counter()
+        sent = 0
+
+        async def send(frame):
+            nonlocal sent
+            await ws.send(frame)
+            sent += 1
+            await asyncio.sleep(max(0.0, start + sent * FRAME_S - time.perf_counter()))
+
+        barges = []
+        for _ in range(args.barge_ins):
+            for frame in speech:
+                await send(frame)
+            # Wait for the reply, then let it play a while
+            asked_at = time.perf_counter()
+            heard_from = None
+            while time.perf_counter() - asked_at < args.reply_timeout:
+                if heard_from is None:
+                    heard_from = next((t for t, kind, _, _ in events if kind == "audio" and t > asked_at), None)
+                elif time.perf_counter() - heard_from >= args.barge_after_s:
+                    break
+                await send(silence[sent % len(silence)])
+            if heard_from is None:
+                continue
+            barge_at = time.perf_counter()
+            for frame in speech:
+                await send(frame)
+            barges.append((barge_at, time.perf_counter()))
+            # The reply to the interruption plays out before the next question
+            settle_until = time.perf_counter() + args.settle_s
+            while time.perf_counter() < settle_until:
+                await send(silence[sent % len(silence)])
+        receiver.cancel()
+
+    for barge_at, spoken_until in barges:
+        result = measure(events, barge_at, spoken_until)
+        if result:
+            results.append(result)
+
+
+def summarize(values):
+    if not values:
+        return "n/a"
+    return f"p50 {statistics.median(values):5.0f} ms, max {max(values):5.0f} ms"
+
+
+async def main_async(args):
+    speech, silence = speech_and_silence()
+    processes = start_processes(args)
+    try:
+        await wait_ready(args.port)
+        url = f"ws://127.0.0.1:{args.port}/ws"
+        results = []
+        await asyncio.gather(*(run_client(url, speech, silence, args, results) for _ in range(args.sessions)))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=15)
+
+    realtime = f", reply streamed in real time, interrupted after {args.interrupt_ms:.0f} ms" if args.realtime_reply else ""
+    print(f"{args.engine}: {args.sessions} session(s) x {args.barge_ins} barge-ins, "
+          f"{args.barge_after_s:.1f} s into each reply{realtime}; {len(results)} measured")
+    if not results:
+        print("FAIL: no barge-in interrupted a reply")
+        return 1
+    stops = [r["stop_ms"] for r in results if r["stop_ms"] is not None]
+    print(f"- stop_audio received:          {summarize(stops)} ({len(results) - len(stops)} barge-ins without one)")
+    print(f"- silence, legacy client:       {summarize([r['legacy_ms'] for r in results])}")
+    print(f"- silence, generation client:   {summarize([r['generation_ms'] for r in results])}")
+    stale = [r["stale_ms"] for r in results]
+    print(f"- stale audio after the stop:   mean {statistics.mean(stale):.0f} ms of audio, "
+          f"{sum(1 for ms in stale if ms)}/{len(stale)} barge-ins")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=["pipeline", "gemini_live"], default="pipeline")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--barge-ins", type=int, default=3, help="per session")
+    parser.add_argument("--barge-after-s", type=float, default=0.8, help="reply heard before talking over it")
+    parser.add_argument("--settle-s", type=float, default=8.0, help="silence after each barge-in")
+    parser.add_argument("--reply-timeout", type=float, default=10.0)
+    parser.add_argument("--trace", help="mock provider timing trace (JSON, see audio_providers/replay_trace.py)")
+    parser.add_argument("--live-trace", help="GEMINI_LIVE_RECORD_PATH recording for the Live API stand-in")
+    parser.add_argument("--eos-ms", type=float, default=300)
+    parser.add_argument("--response-ms", type=float, default=400)
+    parser.add_argument("--reply-s", type=float, default=4.0, help="stand-in reply audio (no --live-trace)")
+    parser.add_argument("--realtime-reply", action="store_true",
+                        help="stand-in streams its reply in real time and keeps streaming after a barge-in")
+    parser.add_argument("--interrupt-ms", type=float, default=600,
+                        help="with --realtime-reply: stand-in's delay before sending interrupted")
+    parser.add_argument("--port", type=int, default=8021)
+    parser.add_argument("--standin-port", type=int, default=8895)
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
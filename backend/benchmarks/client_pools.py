@@ -0,0 +1,140 @@
+"""
+Upstream connections opened per 1,000 turns: per-session clients vs shared pools.
+
+Runs simulated sessions (one LLM request plus TTS for each reply sentence per
+turn) against the local LLM and Kokoro stand-ins, each behind a TCP proxy that
+counts accepted connections. "per-session" gives every session its own
+AsyncOpenAI and httpx client and never closes them (the previous behaviour);
+"shared" uses the process-wide clients from audio_providers/clients.py.
+Every new connection here would be a TCP + TLS handshake against the real
+providers.
+
+Run from backend/:
+    python -m benchmarks.client_pools [--sessions 100] [--turns 10] [--concurrency 20]
+"""
+import io
+import os
+import re
+import asyncio
+import argparse
+import contextlib
+
+import httpx
+from openai import AsyncOpenAI
+
+from audio_providers.clients import close_shared_clients
+from audio_providers.llm.gemini_llm import GeminiLLMProvider
+from audio_providers.tts.kokoro_tts import KokoroTTSProvider
+from benchmarks.standins import llm_server, kokoro_server
+
+
+class CountingProxy:
+    """
+    TCP proxy that counts the connections clients open through it.
+    """
+    def __init__(self, upstream_port: int):
+        self.upstream_port = upstream_port
+        self.opened = 0
+        self.open_now = 0
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        self.opened += 1
+        self.open_now += 1
+        up_reader, up_writer = await asyncio.open_connection("127.0.0.1", self.upstream_port)
+
+        async def pipe(src, dst):
+            try:
+                while data := await src.read(65536):
+                    dst.write(data)
+                    await dst.drain()
+            except ConnectionError:
+                pass
+            finally:
+                dst.close()
+
+        await asyncio.gather(pipe(reader, up_writer), pipe(up_reader, writer))
+        self.open_now -= 1
+
+    def reset(self):
+        self.opened = 0
+
+
+async def run_session(llm, tts, turns):
+    for turn in range(turns):
+        reply = ""
+        async for token in llm.generate_response(f"Question number {turn}?"):
+            reply += token
+        for sentence in re.split(r'(?<=[.!?])\s+', reply.strip()):
+            async for _ in tts.stream_audio(sentence):
+                pass
+
+
+async def run(mode, llm_url, tts_url, args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def session():
+        async with semaphore:
+            if mode == "per-session":
+                llm = GeminiLLMProvider("offline", "You are DONNA.", client=AsyncOpenAI(api_key="offline", base_url=llm_url))
+                tts = KokoroTTSProvider(base_url=tts_url, client=httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=60.0)
+                ))
+            else:
+                llm = GeminiLLMProvider("offline", "You are DONNA.")
+                tts = KokoroTTSProvider(base_url=tts_url)
+            await run_session(llm, tts, args.turns)
+            if mode == "shared":
+                await llm.close()
+                await tts.close()
+
+    await asyncio.gather(*(session() for _ in range(args.sessions)))
+
+
+async def main_async(args):
+    llm = await llm_server.serve_in_background(args.port, ttft_ms=args.ttft_ms, token_ms=2)
+    tts = await kokoro_server.serve_in_background(args.port + 1, latency_ms=50, speed=50)
+    llm_proxy, tts_proxy = CountingProxy(args.port), CountingProxy(args.port + 1)
+    llm_url = f"http://127.0.0.1:{await llm_proxy.start()}/v1"
+    tts_url = f"http://127.0.0.1:{await tts_proxy.start()}"
+
+    os.environ["LLM_BASE_URL"] = llm_url
+    os.environ["LLM_API_KEY"] = "offline"
+
+    turns = args.sessions * args.turns
+    print(f"{args.sessions} sessions x {args.turns} turns, {args.concurrency} concurrent")
+    for mode in ("per-session", "shared"):
+        llm_proxy.reset()
+        tts_proxy.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            await run(mode, llm_url, tts_url, args)
+        await asyncio.sleep(0.2)
+        per_1000 = 1000 / turns
+        print(f"- {mode:<11} LLM {llm_proxy.opened * per_1000:6.0f}, TTS {tts_proxy.opened * per_1000:6.0f} "
+              f"connections opened per 1,000 turns; {llm_proxy.open_now + tts_proxy.open_now} still open afterwards")
+        if mode == "shared":
+            await close_shared_clients()
+            await asyncio.sleep(0.2)
+            print(f"  after close_shared_clients(): {llm_proxy.open_now + tts_proxy.open_now} still open")
+
+    llm.should_exit = True
+    tts.should_exit = True
+    await asyncio.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--ttft-ms", type=float, default=100)
+    parser.add_argument("--port", type=int, default=8870)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Event-loop lag with per-frame DSP inline vs on the DSP executor.
+
+Simulates --sessions sessions on one event loop, each delivering a 4096-byte
+mic frame every 128 ms (random phase; with --aligned all sessions deliver
+together, as after a network stall) and running frame analysis + its own
+EnergySpectralVAD on it, either inline (as DonnaSession did) or through
+audio_dsp.executor.DSPExecutor. A monitor task sleeps 2 ms in a loop and
+records how late it wakes: that lateness is the jitter every other session's
+audio sees.
+
+Run from backend/:
+    python -m benchmarks.dsp_offload [--sessions 50] [--seconds 10] [--threads 1]
+"""
+import time
+import random
+import asyncio
+import argparse
+
+from audio_dsp.frame import analyze_frame
+from audio_dsp.vad import EnergySpectralVAD
+from audio_dsp.executor import DSPExecutor
+from benchmarks.pcm_source import synthetic_conversation, split_frames
+
+FRAME_S = 4096 / 2 / 16000
+TICK_S = 0.002
+
+
+async def monitor(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_S)
+        lags.append((time.perf_counter() - start - TICK_S) * 1000)
+
+
+async def session(frames, executor, seconds, phase, frame_latency):
+    vad = EnergySpectralVAD()
+    start = time.perf_counter() + phase
+    sent = 0
+    while sent * FRAME_S < seconds:
+        await asyncio.sleep(max(0.0, start + sent * FRAME_S - time.perf_counter()))
+        data = frames[sent % len(frames)]
+        submitted = time.perf_counter()
+        if executor:
+            frame, events = await executor.process(data, vad)
+        else:
+            frame = analyze_frame(data)
+            events = vad.process(frame)
+        frame_latency.append((time.perf_counter() - submitted) * 1000)
+        sent += 1
+
+
+async def run(args, frames, use_executor):
+    executor = DSPExecutor(threads=args.threads) if use_executor else None
+    rng = random.Random(0)
+    lags, frame_latency = [], []
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(monitor(lags, stop))
+    await asyncio.gather(*(
+        session(frames[i % len(frames):] + frames[:i % len(frames)], executor, args.seconds,
+                0.0 if args.aligned else rng.uniform(0, FRAME_S), frame_latency)
+        for i in range(args.sessions)
+    ))
+    stop.set()
+    await watcher
+    stats = dict(executor.stats) if executor else None
+    if executor:
+        executor.shutdown()
+    return lags, frame_latency, stats
+
+
+def pct(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--aligned", action="store_true")
+    args = parser.parse_args()
+
+    frames = split_frames(synthetic_conversation()[0])
+    print(f"{args.sessions} sessions, {args.seconds:.0f} s, {'aligned' if args.aligned else 'random'} frame phase")
+    for label, use_executor in (("inline", False), (f"executor ({args.threads} thread)", True)):
+        lags, frame_latency, stats = asyncio.run(run(args, frames, use_executor))
+        print(f"- {label:<20} loop lag p50 {pct(lags, 0.5):5.2f} ms, p99 {pct(lags, 0.99):5.2f} ms, "
+              f"max {max(lags):5.2f} ms; frame turnaround p99 {pct(frame_latency, 0.99):5.2f} ms"
+              + (f"; {stats['frames']} frames in {stats['batches']} batches "
+                 f"(mean {stats['frames'] / stats['batches']:.1f}, max {stats['largest_batch']})" if stats else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark: per-frame cost of inbound mic-frame analysis.
+
+"before" replays what the tree used to do per frame: three independent
+struct.unpack + generator RMS passes (DonnaSession.run, DeepgramPipelineEngine
+and GeminiLiveEngine). "after" is a single audio_dsp.frame.analyze_frame call,
+which also yields peak, zero-crossing rate and DC offset.
+
+Run from backend/:
+    python -m benchmarks.frame_analysis [path/to/audio.pcm]
+"""
+import sys
+import math
+import struct
+import timeit
+
+from audio_dsp.frame import analyze_frame
+from benchmarks.pcm_source import FRAME_BYTES, load_pcm, synthetic_conversation, split_frames
+
+ITERATIONS = 2000
+
+
+def legacy_rms(audio_data: bytes) -> float:
+    count = len(audio_data) // 2
+    shorts = struct.unpack(f'<{count}h', audio_data)
+    sum_squares = sum(s**2 for s in shorts)
+    return math.sqrt(sum_squares / count)
+
+
+def legacy_frame(audio_data: bytes):
+    # Session debug RMS + pipeline barge-in + Gemini barge-in
+    legacy_rms(audio_data)
+    legacy_rms(audio_data)
+    legacy_rms(audio_data)
+
+
+def load_frames(path=None):
+    data = load_pcm(path) if path else synthetic_conversation()[0]
+    frames = split_frames(data, FRAME_BYTES)
+    if not frames:
+        print("Not enough audio for a single frame.")
+        sys.exit(1)
+    return frames
+
+
+def per_frame_us(fn, frames):
+    n = len(frames)
+    counter = iter(range(ITERATIONS))
+    total = timeit.timeit(lambda: fn(frames[next(counter) % n]), number=ITERATIONS)
+    return total / ITERATIONS * 1e6
+
+
+def main():
+    frames = load_frames(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    # Sanity check: both paths agree on RMS
+    frame = analyze_frame(frames[0])
+    assert abs(frame.stats.rms - legacy_rms(frames[0])) < 1e-6 * max(1.0, frame.stats.rms)
+
+    before = per_frame_us(legacy_frame, frames)
+    after = per_frame_us(analyze_frame, frames)
+
+    print(f"Frame size: {FRAME_BYTES} bytes ({FRAME_BYTES // 2} samples), {ITERATIONS} iterations")
+    print(f"- Before (3x struct.unpack RMS): {before:8.1f} us/frame")
+    print(f"- After  (1x analyze_frame):     {after:8.1f} us/frame")
+    print(f"- Speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Replay a Gemini Live API message stream through GeminiLiveEngine.handle_google_messages.
+
+Reports messages/sec and transient allocation per message (tracemalloc peak above
+baseline) with the audio passthrough fast path on and off, for both client audio
+transports. Input is a recording made with GEMINI_LIVE_RECORD_PATH=<file.jsonl>,
+or a synthetic stream shaped like Live API output (24kHz PCM inlineData parts).
+
+Run from backend/:
+    python -m benchmarks.gemini_replay [recording.jsonl] [--turns 20]
+"""
+import json
+import time
+import base64
+import asyncio
+import argparse
+import tracemalloc
+import numpy as np
+
+from conversation_engines.gemini_live import GeminiLiveEngine
+from transport.output_channel import OutputChannel
+
+
+def synthetic_stream(turns: int):
+    rng = np.random.default_rng(0)
+    messages = [json.dumps({"setupComplete": {}})]
+    for _ in range(turns):
+        for size in rng.choice([3840, 7680, 11520], size=25):
+            pcm = rng.integers(-6000, 6000, size // 2, dtype=np.int16).tobytes()
+            messages.append(json.dumps({"serverContent": {"modelTurn": {"parts": [
+                {"inlineData": {"mimeType": "audio/pcm;rate=24000", "data": base64.b64encode(pcm).decode()}}
+            ]}}}))
+        messages.append(json.dumps({"serverContent": {"turnComplete": True}}))
+    return messages
+
+
+def load_recording(path: str):
+    with open(path) as f:
+        return [json.loads(line)["msg"] for line in f if line.strip()]
+
+
+class NullWebSocket:
+    async def send_text(self, text):
+        pass
+
+    async def send_bytes(self, data):
+        pass
+
+
+class ReplaySocket:
+    """
+    Async-iterable stand-in for the Google websocket; samples tracemalloc between messages.
+    """
+
+    def __init__(self, messages, track_memory: bool):
+        self.messages = messages
+        self.track_memory = track_memory
+        self.peaks = []
+
+    async def __aiter__(self):
+        for message in self.messages:
+            if self.track_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                self.peaks.append(peak - current)
+                tracemalloc.reset_peak()
+            yield message
+
+    async def close(self):
+        pass
+
+
+async def replay(messages, passthrough: bool, transport: str, track_memory: bool):
+    engine = GeminiLiveEngine(system_prompt="", google_api_key="")
+    engine.PASSTHROUGH_AUDIO = passthrough
+    channel = OutputChannel(NullWebSocket())
+    channel.negotiate({"audio_transport": [transport]})
+    engine.output_handler = channel
+    engine.google_ws = ReplaySocket(messages, track_memory)
+    engine.running = True
+
+    start = time.perf_counter()
+    await engine.handle_google_messages()
+    await channel.flush()
+    elapsed = time.perf_counter() - start
+    peaks = engine.google_ws.peaks[1:]  # first sample precedes any processing
+    return elapsed, (sum(peaks) / len(peaks) if peaks else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    messages = load_recording(args.path) if args.path else synthetic_stream(args.turns)
+    print(f"Replaying {len(messages)} messages")
+
+    for transport in ("json", "binary"):
+        for passthrough in (False, True):
+            elapsed, _ = asyncio.run(replay(messages, passthrough, transport, track_memory=False))
+            tracemalloc.start()
+            _, alloc = asyncio.run(replay(messages, passthrough, transport, track_memory=True))
+            tracemalloc.stop()
+            label = f"{transport}, passthrough {'on ' if passthrough else 'off'}"
+            print(f"- {label}: {len(messages) / elapsed:9,.0f} msg/s, {alloc / 1024:7.1f} KiB transient alloc/msg")
+
+
+if __name__ == "__main__":
+    main()
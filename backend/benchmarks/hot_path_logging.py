@@ -0,0 +1,140 @@
+"""
+Audio frames/sec with the old print() logging vs the queue-based logger.
+
+Each mode runs in a child process whose stdout is a pipe read by this process,
+as under a container runtime or process manager. The child pushes 4096-byte
+frames through frame analysis + VAD as fast as it can on an event loop for
+--seconds, emitting the log lines the audio path used to produce:
+
+- the per-frame RMS debug check (one line per ~50 frames),
+- an STT interim transcript every other frame (~4 per second of audio),
+- per-sentence TTS/pipeline logs every 16 frames (~2 s of audio per sentence).
+
+Modes: "print" (the statements as they were), "logging INFO" (the new calls at
+the default level: gated, nothing formatted), "logging DEBUG" (everything
+formatted and written by the listener thread). With --slow-reader the parent
+drains stdout at ~16 KB/s, like a backed-up log shipper: print() then blocks
+the loop once the pipe buffer fills, the queue handler drops instead.
+
+Run from backend/:
+    python -m benchmarks.hot_path_logging [--seconds 3] [--slow-reader]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import threading
+import subprocess
+
+FRAME_S = 4096 / 2 / 16000
+MODES = ("print", "logging INFO", "logging DEBUG")
+INTERIM = "so I was wondering whether you could help me plan a trip to"
+SENTENCE = "Sure, I can help you plan a trip, where would you like to go?"
+
+
+def print_statements(frame, n):
+    if int(time.time() * 20) % 50 == 0:
+        print(f"DEBUG: RMS: {frame.stats.rms:.0f}")
+    if n % 2 == 0:
+        print(f"\r[STT Interim] {INTERIM}", end="", flush=True)
+    if n % 16 == 0:
+        print(f"\n[TTS] Synthesizing: '{SENTENCE}'")
+        print(f"[ElevenLabs] Requesting TTS for: '{SENTENCE[:20]}...'")
+        print("[ElevenLabs] Stream started")
+        print(f"[ElevenLabs] First chunk received ({4096} bytes)")
+        print(f"[ElevenLabs] Stream finished. Total: {96000} bytes, {24} chunks")
+        print(f"[Pipeline] Sent {12} chunks ({96000} bytes) for sentence")
+
+
+def logging_statements(frame, n, session, pipeline, tts):
+    if session.isEnabledFor(logging.DEBUG) and int(time.time() * 20) % 50 == 0:
+        session.debug("RMS: %.0f", frame.stats.rms)
+    if n % 2 == 0:
+        pipeline.debug("[STT Interim] %s", INTERIM)
+    if n % 16 == 0:
+        tts.debug("Synthesizing: '%s'", SENTENCE)
+        tts.debug("[ElevenLabs] Requesting TTS for: '%.20s...'", SENTENCE)
+        tts.debug("[ElevenLabs] Stream started")
+        tts.debug("[ElevenLabs] First chunk received (%d bytes)", 4096)
+        tts.debug("[ElevenLabs] Stream finished. Total: %d bytes, %d chunks", 96000, 24)
+        pipeline.debug("Sent %d chunks (%d bytes) for sentence", 12, 96000)
+
+
+async def run_child(mode, seconds):
+    from audio_dsp.frame import analyze_frame
+    from audio_dsp.vad import EnergySpectralVAD
+    from benchmarks.pcm_source import synthetic_conversation, split_frames
+    from telemetry.logs import configure_logging, get_logger
+
+    if mode != "print":
+        configure_logging(level=mode.split()[1], levels="")
+    session, pipeline, tts = get_logger("session"), get_logger("pipeline"), get_logger("tts")
+    frames = split_frames(synthetic_conversation()[0])
+    vad = EnergySpectralVAD()
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        frame = analyze_frame(frames[n % len(frames)])
+        vad.process(frame)
+        if mode == "print":
+            print_statements(frame, n)
+        else:
+            logging_statements(frame, n, session, pipeline, tts)
+        n += 1
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    dropped = sum(getattr(h, "dropped", 0) for h in logging.getLogger("donna").handlers)
+    os.write(2, (json.dumps({"frames_per_s": n / elapsed, "dropped": dropped}) + "\n").encode())
+    os._exit(0)  # don't wait for a stalled stdout at exit
+
+
+def drain(stream, slow):
+    while True:
+        data = stream.read1(4096 if slow else 65536)
+        if not data:
+            return
+        if slow:
+            time.sleep(0.25)
+
+
+def measure(mode, seconds, slow):
+    child = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.hot_path_logging", "--child", mode, "--seconds", str(seconds)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    reader = threading.Thread(target=drain, args=(child.stdout, slow), daemon=True)
+    reader.start()
+    err = child.stderr.read()
+    child.wait()
+    lines = [line for line in err.decode().splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(err.decode()[-500:])
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--slow-reader", action="store_true")
+    parser.add_argument("--child", choices=MODES)
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(run_child(args.child, args.seconds))
+        return
+
+    print(f"stdout drained {'slowly (~16 KB/s)' if args.slow_reader else 'as fast as possible'}, "
+          f"{args.seconds:.0f} s per mode; real time is {1 / FRAME_S:.1f} frames/s per session")
+    baseline = None
+    for mode in MODES:
+        result = measure(mode, args.seconds, args.slow_reader)
+        baseline = baseline or result["frames_per_s"]
+        print(f"- {mode:<14} {result['frames_per_s']:9.0f} frames/s ({result['frames_per_s'] / baseline:5.2f}x print)"
+              + (f", {result['dropped']} records dropped" if result["dropped"] else ""))
+
+
+if __name__ == "__main__":
+    main()
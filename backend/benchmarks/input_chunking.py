@@ -0,0 +1,165 @@
+"""
+Gemini Live upstream audio: the old inline 1024-byte sends vs RealtimeInputChunker.
+
+Drives GeminiLiveEngine.process_audio_input in real time with a synthetic
+conversation (4096-byte frames, as the client sends them) against a fake
+upstream socket whose send() takes a per-message overhead plus bytes/bandwidth,
+like websockets' send() awaiting drain on a congested uplink. Per mode and link:
+
+- messages and upstream bytes (base64 JSON on the wire, vs the raw PCM in),
+- CPU time of the whole run,
+- frame stall: how late frames are handed to the engine (the old path awaits
+  each send inline, so a slow send holds up the session's receive loop),
+- end-of-speech delivery: from when the client sent the frame where the local
+  VAD ends speech until all audio up to it has left the socket (what Google
+  needs before it can answer).
+
+Run from backend/:
+    python -m benchmarks.input_chunking [--utterances 3]
+"""
+import json
+import time
+import base64
+import asyncio
+import argparse
+import statistics
+
+from audio_dsp.frame import analyze_frame
+from audio_dsp.vad import VADEvent
+from benchmarks.pcm_source import synthetic_conversation, split_frames
+from conversation_engines.gemini_live import GeminiLiveEngine
+from conversation_engines.realtime_input import RealtimeInputChunker
+
+FRAME_S = 4096 / 2 / 16000
+LINKS = {
+    "fast": (0.002, 10_000_000),
+    # Mobile uplink under contention: a stall per message, barely above the base64 audio rate
+    "congested": (0.040, 56_000),
+}
+
+
+class FakeUpstream:
+    def __init__(self, overhead_s, bytes_per_s):
+        self.overhead_s = overhead_s
+        self.bytes_per_s = bytes_per_s
+        self.messages = 0
+        self.wire_bytes = 0
+        self.pcm_delivered = 0
+        self.on_delivered = None
+
+    async def send(self, message):
+        await asyncio.sleep(self.overhead_s + len(message) / self.bytes_per_s)
+        self.messages += 1
+        self.wire_bytes += len(message)
+        data = json.loads(message)["realtimeInput"]
+        for chunk in data.get("mediaChunks", []):
+            self.pcm_delivered += len(chunk["data"]) * 3 // 4 - chunk["data"].count("=")
+        if self.on_delivered:
+            self.on_delivered()
+
+
+class LegacyInputEngine(GeminiLiveEngine):
+    """
+    The input path as it was: buffer until >= 1024 bytes, then base64 +
+    json.dumps and await the send inline.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.input_audio_buffer = bytearray()
+
+    async def process_audio_input(self, frame, vad_events=None):
+        if vad_events is None:
+            vad_events = self.vad.process(frame)
+        self.input_audio_buffer.extend(frame.data)
+        if len(self.input_audio_buffer) < 1024:
+            return
+        audio_to_send = bytes(self.input_audio_buffer)
+        self.input_audio_buffer = bytearray()
+        b64_audio = base64.b64encode(audio_to_send).decode("utf-8")
+        realtime_input = {"realtimeInput": {"mediaChunks": [{"mimeType": "audio/pcm;rate=16000", "data": b64_audio}]}}
+        await self.google_ws.send(json.dumps(realtime_input))
+
+
+def accounted_bytes(engine, upstream):
+    """
+    Input bytes dealt with: delivered upstream, or deliberately not sent.
+    """
+    if isinstance(engine, LegacyInputEngine):
+        return upstream.pcm_delivered
+    stats = engine.input_chunker.stats
+    return upstream.pcm_delivered + stats["silence_skipped_bytes"] + stats["dropped_bytes"]
+
+
+async def run(mode, link, frames):
+    upstream = FakeUpstream(*LINKS[link])
+    if mode == "old":
+        engine = LegacyInputEngine("", "offline")
+    else:
+        engine = GeminiLiveEngine("", "offline", input_chunker=RealtimeInputChunker(skip_silence=(mode == "chunker")))
+    engine.google_ws = upstream
+    engine.running = True
+
+    waiting = []  # (speech end frame sent at, bytes pushed by then)
+    delivery = []
+
+    def check_delivered():
+        done = accounted_bytes(engine, upstream)
+        while waiting and done >= waiting[0][1]:
+            delivery.append(time.perf_counter() - waiting.pop(0)[0])
+
+    upstream.on_delivered = check_delivered
+    stalls = []
+    pushed = 0
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    for i, pcm in enumerate(frames):
+        await asyncio.sleep(max(0.0, start + i * FRAME_S - time.perf_counter()))
+        # When the client sent the frame; a stalled receive loop makes the engine see it later
+        sent_at = start + i * FRAME_S
+        stalls.append(time.perf_counter() - sent_at)
+        frame = analyze_frame(pcm)
+        events = engine.vad.process(frame)
+        pushed += len(pcm)
+        if VADEvent.SPEECH_END in events:
+            waiting.append((sent_at, pushed))
+        await engine.process_audio_input(frame, events)
+        check_delivered()
+    # Let the last sends finish
+    deadline = time.perf_counter() + 10
+    while waiting and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    if engine.input_send_task:
+        await engine.input_send_task
+    cpu_s = time.process_time() - cpu_start
+    engine.running = False
+    return upstream, cpu_s, stalls, delivery
+
+
+async def main_async(args):
+    pcm, spans = synthetic_conversation(utterances=args.utterances, speech_s=1.5, gap_s=2.5)
+    frames = split_frames(pcm)
+    audio_s = len(frames) * FRAME_S
+    print(f"{audio_s:.1f} s of input ({len(spans)} utterances, {len(frames)} frames, "
+          f"{len(frames) * 4096} bytes PCM), real time")
+    for link in LINKS:
+        overhead_s, bytes_per_s = LINKS[link]
+        print(f"\n{link} link ({overhead_s * 1000:.0f} ms/message, {bytes_per_s / 1000:,.0f} kB/s):")
+        for mode, label in (("old", "old 1024-byte inline"), ("chunker_all", "chunker, all audio"),
+                            ("chunker", "chunker, skip silence")):
+            upstream, cpu_s, stalls, delivery = await run(mode, link, frames)
+            delivery_ms = f"{statistics.mean(delivery) * 1000:6.0f} ms" if delivery else "   n/a"
+            print(f"- {label:<22} {upstream.messages:4d} msgs, {upstream.wire_bytes / 1000:7.1f} kB up "
+                  f"({upstream.wire_bytes / (len(frames) * 4096) * 100:3.0f}% of PCM), CPU {cpu_s * 1000:5.0f} ms, "
+                  f"frame stall p50/max {statistics.median(stalls) * 1000:4.0f}/{max(stalls) * 1000:5.0f} ms, "
+                  f"speech end delivered after {delivery_ms} (mean)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--utterances", type=int, default=3)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+First-byte latency and total time per sentence for KokoroTTSProvider,
+streaming vs non-streaming, against the local stand-in Kokoro server.
+
+Run from backend/:
+    python -m benchmarks.kokoro_streaming [--base-url http://host:port]
+Without --base-url the stand-in (benchmarks/standins/kokoro_server.py) is started in-process.
+"""
+import io
+import time
+import asyncio
+import argparse
+import contextlib
+
+from audio_providers.clients import close_shared_clients
+from audio_providers.tts.kokoro_tts import KokoroTTSProvider, HTTP2_AVAILABLE
+from benchmarks.standins.kokoro_server import serve_in_background
+
+SENTENCES = [
+    "Good morning.",
+    "I have moved your three o'clock to Thursday, and the client has already confirmed.",
+    "The quarterly numbers are in your inbox, flagged with the two items that need your signature today.",
+]
+
+
+async def measure(provider: KokoroTTSProvider, sentence: str):
+    start = time.perf_counter()
+    first = None
+    total_bytes = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        async for chunk in provider.stream_audio(sentence):
+            if chunk and first is None:
+                first = time.perf_counter() - start
+            total_bytes += len(chunk)
+    return first * 1000, (time.perf_counter() - start) * 1000, total_bytes
+
+
+async def main_async(args):
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = await serve_in_background(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"Kokoro at {base_url} (HTTP/2 {'available' if HTTP2_AVAILABLE else 'not installed, using HTTP/1.1'})")
+    for streaming in (False, True):
+        provider = KokoroTTSProvider(base_url=base_url, voice="bf_emma", streaming=streaming)
+        await measure(provider, "Warm up.")  # establish the keep-alive connection
+        print(f"- {'streaming' if streaming else 'non-streaming'}:")
+        for sentence in SENTENCES:
+            first, total, size = await measure(provider, sentence)
+            print(f"    {len(sentence):3d} chars, {size / 48000:5.2f}s audio: first byte {first:6.0f} ms, total {total:6.0f} ms")
+        await provider.close()
+    await close_shared_clients()
+
+    if server:
+        server.should_exit = True
+        await asyncio.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url")
+    parser.add_argument("--port", type=int, default=8880)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
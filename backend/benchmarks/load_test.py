@@ -0,0 +1,203 @@
+"""
+Load test: concurrent voice sessions per core at a p95 response-latency target.
+
+Starts the Live API stand-in (server-side end-of-speech detection, --eos-ms)
+and serve.py with --workers worker processes (CONVERSATION_ENGINE=gemini_live
+pointed at the stand-in), then runs fake clients at each concurrency level.
+Each client streams a synthetic conversation over /ws in real time (4096-byte
+frames every 128 ms, silence included, binary audio transport) and records the
+latency from its last speech frame to the first reply audio frame.
+
+Per level it reports p50/p95 latency, sessions refused by admission control,
+and the server workers' CPU utilization (from GET /capacity), so results stay
+meaningful when clients and stand-in share the machine: sessions per core is
+concurrent sessions / server cores actually used.
+
+Run from backend/:
+    python -m benchmarks.load_test [--workers 1] [--levels 10,25,50,100] [--p95-target-ms 1000]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import statistics
+
+import httpx
+import websockets
+
+from audio_dsp.frame import analyze_frame
+from benchmarks.pcm_source import synthetic_conversation, split_frames
+
+FRAME_S = 4096 / 2 / 16000
+SPEECH_RMS = 500
+
+
+def conversation_frames():
+    pcm, _ = synthetic_conversation(utterances=4, speech_s=1.2, gap_s=1.6)
+    return [(frame, analyze_frame(frame).stats.rms >= SPEECH_RMS) for frame in split_frames(pcm)]
+
+
+async def fake_client(url, frames, duration_s, latencies, outcome):
+    try:
+        ws = await websockets.connect(url, max_size=None)
+    except Exception:
+        outcome["failed"] += 1
+        return
+    state = {"last_speech_at": None}
+
+    async def receive():
+        async for message in ws:
+            is_audio = isinstance(message, bytes) or '"type": "audio"' in message[:40]
+            if is_audio and state["last_speech_at"] is not None:
+                latencies.append((time.perf_counter() - state["last_speech_at"]) * 1000)
+                state["last_speech_at"] = None
+
+    receiver = asyncio.create_task(receive())
+    try:
+        await ws.send(json.dumps({"type": "hello", "audio_transport": ["binary", "json"]}))
+        start = time.perf_counter()
+        sent = 0
+        while time.perf_counter() - start < duration_s:
+            frame, is_speech = frames[sent % len(frames)]
+            await ws.send(frame)
+            if is_speech:
+                state["last_speech_at"] = time.perf_counter()
+            sent += 1
+            # Real-time pacing on an absolute schedule
+            await asyncio.sleep(max(0.0, start + sent * FRAME_S - time.perf_counter()))
+        outcome["completed"] += 1
+    except websockets.exceptions.ConnectionClosed as e:
+        outcome["refused" if e.rcvd and e.rcvd.code == 1013 else "failed"] += 1
+    finally:
+        receiver.cancel()
+        await ws.close()
+
+
+async def sample_capacity(base_url, workers):
+    """
+    {pid: capacity snapshot}; fresh connections so SO_REUSEPORT spreads them over workers.
+    """
+    seen = {}
+    for _ in range(workers * 8):
+        async with httpx.AsyncClient() as client:
+            try:
+                snapshot = (await client.get(f"{base_url}/capacity")).json()
+            except Exception:
+                continue
+        seen[snapshot["worker_pid"]] = snapshot
+        if len(seen) == workers:
+            break
+    return seen
+
+
+async def run_level(args, sessions, frames):
+    url = f"ws://127.0.0.1:{args.port}/ws"
+    base_url = f"http://127.0.0.1:{args.port}"
+    latencies = []
+    outcome = {"completed": 0, "refused": 0, "failed": 0}
+
+    before = await sample_capacity(base_url, args.workers)
+    wall_start = time.perf_counter()
+    clients = []
+    for i in range(sessions):
+        # Stagger connects and phase so turns don't all line up
+        clients.append(asyncio.create_task(fake_client(url, frames[i % len(frames):] + frames[:i % len(frames)],
+                                                       args.duration, latencies, outcome)))
+        await asyncio.sleep(args.ramp / sessions)
+    await asyncio.gather(*clients)
+    wall = time.perf_counter() - wall_start
+    after = await sample_capacity(base_url, args.workers)
+
+    cpu = sum(after[pid]["cpu_seconds"] - before[pid]["cpu_seconds"] for pid in after if pid in before)
+    return latencies, outcome, cpu / wall
+
+
+def start_processes(args):
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    standin = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.standins.live_api_server", "--port", str(args.standin_port),
+         "--handshake-ms", "50", "--setup-ms", "50", "--response-ms", str(args.response_ms),
+         "--eos-ms", str(args.eos_ms)],
+        cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    env = dict(os.environ,
+               CONVERSATION_ENGINE="gemini_live",
+               GOOGLE_API_KEY="offline",
+               GEMINI_LIVE_URL=f"ws://127.0.0.1:{args.standin_port}",
+               MAX_SESSIONS_PER_WORKER=str(args.max_sessions))
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(args.workers), "--host", "127.0.0.1",
+         "--port", str(args.port), "--log-level", "warning"],
+        cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return standin, server
+
+
+async def wait_ready(port, timeout_s=30):
+    deadline = time.monotonic() + timeout_s
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"http://127.0.0.1:{port}/capacity")).status_code in (200, 503):
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def main_async(args):
+    frames = conversation_frames()
+    standin, server = start_processes(args)
+    try:
+        await wait_ready(args.port)
+        print(f"{args.workers} worker(s), stand-in reply {args.eos_ms:.0f} ms end-of-speech + {args.response_ms:.0f} ms, "
+              f"{args.duration:.0f} s per level, p95 target {args.p95_target_ms:.0f} ms")
+        best = None
+        for sessions in (int(level) for level in args.levels.split(",")):
+            latencies, outcome, cores_used = await run_level(args, sessions, frames)
+            if len(latencies) < 2:
+                print(f"- {sessions:4d} sessions: no replies measured ({outcome})")
+                continue
+            p50 = statistics.median(latencies)
+            p95 = statistics.quantiles(latencies, n=20)[18]
+            served = outcome["completed"]
+            per_core = served / max(cores_used, 1e-6)
+            ok = p95 <= args.p95_target_ms
+            print(f"- {sessions:4d} sessions: p50 {p50:6.0f} ms, p95 {p95:6.0f} ms {'ok ' if ok else 'MISS'}, "
+                  f"{outcome['refused']} refused, {outcome['failed']} failed, server CPU {cores_used:4.2f} cores "
+                  f"-> {per_core:5.0f} sessions/core")
+            if ok:
+                best = (served, per_core)
+        if best:
+            print(f"Max at p95 <= {args.p95_target_ms:.0f} ms: {best[0]} concurrent sessions on {args.workers} worker(s) "
+                  f"({best[0] / args.workers:.0f} per worker, ~{best[1]:.0f} per fully used core)")
+        else:
+            print(f"No level met p95 <= {args.p95_target_ms:.0f} ms")
+    finally:
+        server.terminate()
+        standin.terminate()
+        server.wait(timeout=15)
+        standin.wait(timeout=15)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--levels", default="10,25,50,100")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--ramp", type=float, default=3, help="seconds over which each level's clients connect")
+    parser.add_argument("--p95-target-ms", type=float, default=1000)
+    parser.add_argument("--max-sessions", type=int, default=0, help="MAX_SESSIONS_PER_WORKER for the server")
+    parser.add_argument("--eos-ms", type=float, default=300)
+    parser.add_argument("--response-ms", type=float, default=400)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--standin-port", type=int, default=8891)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Prompt size and time-to-first-token over a 500-turn session, unbounded vs budgeted history.
+
+Drives GeminiLLMProvider against the local LLM stand-in, whose first token is
+delayed in proportion to prompt size (--prefill-ms per 1k tokens), and records
+per-turn prompt tokens (as received by the server), client-side TTFT, and the
+size of the history kept in memory. "budgeted" uses ConversationHistory with
+LLM_HISTORY_TOKENS=--budget and background summarization via the stand-in.
+
+Run from backend/:
+    python -m benchmarks.long_session [--turns 500] [--budget 4000]
+"""
+import io
+import os
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import statistics
+
+from audio_providers.clients import close_shared_clients
+from audio_providers.llm.gemini_llm import GeminiLLMProvider
+from benchmarks.standins import llm_server
+
+CHECKPOINTS = (1, 50, 100, 250, 500)
+
+
+def user_turn(i: int) -> str:
+    return (f"Turn {i}: can you remind me what we said about item {i % 17} and then add that "
+            f"I want it scheduled for day {i % 30}, after lunch, with the usual people invited?")
+
+
+async def run_session(server, turns):
+    llm = GeminiLLMProvider("offline", "You are DONNA, a helpful AI assistant. " * 40)
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(1, turns + 1):
+            before = len(server.config.app.state.requests)
+            start = time.perf_counter()
+            ttft = None
+            async for _ in llm.generate_response(user_turn(i)):
+                if ttft is None:
+                    ttft = (time.perf_counter() - start) * 1000
+            streamed = [r for r in server.config.app.state.requests[before:] if r.get("stream")]
+            prompt = llm_server.prompt_tokens(streamed[-1]["messages"])
+            memory = len(json.dumps(llm.history.messages()))
+            rows.append((ttft, prompt, memory))
+        await llm.close()
+    return rows, llm.history.stats
+
+
+def report(label, rows, stats):
+    print(f"- {label}:")
+    for turn in CHECKPOINTS:
+        if turn <= len(rows):
+            ttft, prompt, memory = rows[turn - 1]
+            print(f"    turn {turn:3d}: prompt {prompt:6d} tokens, TTFT {ttft:6.1f} ms, history {memory / 1024:6.1f} KiB")
+    last = [r[0] for r in rows[-50:]]
+    print(f"    last 50 turns: TTFT mean {statistics.mean(last):6.1f} ms; {stats}")
+
+
+async def main_async(args):
+    server = await llm_server.serve_in_background(
+        args.port, ttft_ms=args.ttft_ms, token_ms=1, prefill_ms=args.prefill_ms
+    )
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ["LLM_API_KEY"] = "offline"
+    print(f"{args.turns} turns, stand-in TTFT {args.ttft_ms:.0f} ms + {args.prefill_ms:.0f} ms per 1k prompt tokens")
+
+    for label, budget in (("unbounded", "0"), (f"budget {args.budget} tokens", str(args.budget))):
+        os.environ["LLM_HISTORY_TOKENS"] = budget
+        rows, stats = await run_session(server, args.turns)
+        report(label, rows, stats)
+
+    await close_shared_clients()
+    server.should_exit = True
+    await asyncio.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--budget", type=int, default=4000)
+    parser.add_argument("--ttft-ms", type=float, default=50)
+    parser.add_argument("--prefill-ms", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8872)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Shared PCM inputs for the benchmark scripts.
+
+Real recordings (raw 16-bit mono .pcm such as backend/test_write/debug_input.pcm,
+or 16-bit mono .wav) are used when a path is given; otherwise a deterministic
+synthetic conversation is generated so results are reproducible.
+"""
+import wave
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_BYTES = 4096  # ScriptProcessor(2048) @ 16kHz, int16 mono
+
+
+def load_pcm(path: str) -> bytes:
+    if path.endswith(".wav"):
+        with wave.open(path, "rb") as w:
+            if w.getsampwidth() != 2 or w.getnchannels() != 1:
+                raise ValueError(f"{path}: expected 16-bit mono wav")
+            return w.readframes(w.getnframes())
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# Non-speech sounds inserted by synthetic_conversation(transients=True), in seconds
+COUGH_S = 0.12
+ECHO_BLIP_S = 0.15
+TRANSIENT_GAP_S = 0.9
+
+
+def synthetic_conversation(utterances: int = 5, speech_s: float = 1.2, gap_s: float = 0.9,
+                           sample_rate: int = SAMPLE_RATE, seed: int = 0, transients: bool = False):
+    """
+    Speech-like bursts (harmonic voice with syllabic modulation) separated by low noise.
+    With transients, every utterance is followed by a cough (a decaying broadband
+    burst) and a blip of speaker echo (voice too short to be a reply), each
+    padded by TRANSIENT_GAP_S of noise: sounds that should not interrupt the agent.
+    Returns (pcm_bytes, [(start_s, end_s), ...]) with the ground-truth speech spans.
+    """
+    rng = np.random.default_rng(seed)
+    pieces = []
+    spans = []
+    t_cursor = 0.0
+
+    def noise(seconds):
+        return rng.normal(0, 60, int(seconds * sample_rate))
+
+    def voice(seconds, f0_hz, amplitude):
+        n = int(seconds * sample_rate)
+        t = np.arange(n) / sample_rate
+        f0 = f0_hz + 15 * np.sin(2 * np.pi * 0.7 * t)
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        harmonics = sum(np.sin(k * phase) / k for k in range(1, 12))
+        syllables = 0.55 + 0.45 * np.sin(2 * np.pi * 4.0 * t) ** 2
+        return amplitude * harmonics * syllables + rng.normal(0, 60, n)
+
+    def cough(seconds):
+        n = int(seconds * sample_rate)
+        envelope = np.exp(-np.arange(n) / (0.3 * n))
+        return rng.normal(0, 6000, n) * envelope
+
+    pieces.append(noise(gap_s))
+    t_cursor += gap_s
+    for i in range(utterances):
+        pieces.append(voice(speech_s, 120 + 30 * i, 3500))
+        spans.append((t_cursor, t_cursor + speech_s))
+        t_cursor += speech_s
+        if transients:
+            for sound in (cough(COUGH_S), voice(ECHO_BLIP_S, 180, 2500)):
+                pieces += [noise(TRANSIENT_GAP_S), sound]
+                t_cursor += TRANSIENT_GAP_S + sound.size / sample_rate
+            pieces.append(noise(TRANSIENT_GAP_S))
+            t_cursor += TRANSIENT_GAP_S
+        pieces.append(noise(gap_s))
+        t_cursor += gap_s
+
+    signal = np.clip(np.concatenate(pieces), -32768, 32767)
+    return signal.astype("<i2").tobytes(), spans
+
+
+def split_frames(data: bytes, frame_bytes: int = FRAME_BYTES):
+    return [data[i:i + frame_bytes] for i in range(0, len(data) - frame_bytes + 1, frame_bytes)]
@@ -0,0 +1,98 @@
+"""
+Time-to-first-token with and without provider-side prefix caching of the system prompt.
+
+Runs --sessions short sessions (each a fresh GeminiLLMProvider built from the
+current PromptStore version, LLM_PROMPT_CACHE=key) against the local LLM
+stand-in, once with its prefix cache disabled and once enabled. Halfway through
+the cached run RULES.md (a temporary copy) is edited, to show the hot reload:
+the next session starts on a new prompt version and pays one uncached prefill.
+
+Run from backend/:
+    python -m benchmarks.prompt_cache [--sessions 20] [--turns 5] [--prefill-ms 100]
+"""
+import io
+import os
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import contextlib
+import statistics
+
+from audio_providers.clients import close_shared_clients
+from audio_providers.llm.gemini_llm import GeminiLLMProvider
+from benchmarks.standins import llm_server
+from system_prompt import PromptStore
+
+
+async def run_sessions(server, prompts, args, edit_rules_at=None, rules_path=None):
+    state = server.config.app.state
+    first_turn, later_turns, versions = [], [], []
+    for session in range(args.sessions):
+        if session == edit_rules_at:
+            with open(rules_path, "a") as f:
+                f.write("\n- Keep answers under three sentences.\n")
+        prompt = prompts.current()
+        versions.append(prompt.version)
+        with contextlib.redirect_stdout(io.StringIO()):
+            llm = GeminiLLMProvider("offline", prompt.text)
+            for turn in range(args.turns):
+                start = time.perf_counter()
+                ttft = None
+                async for _ in llm.generate_response(f"Session {session}, question {turn}: what's next on my list?"):
+                    if ttft is None:
+                        ttft = (time.perf_counter() - start) * 1000
+                (first_turn if turn == 0 else later_turns).append(ttft)
+            await llm.close()
+    cached = sum(state.cached_tokens)
+    total = sum(llm_server.prompt_tokens(r["messages"]) for r in state.requests if r.get("stream"))
+    state.requests.clear()
+    state.cached_tokens.clear()
+    return first_turn, later_turns, versions, cached / max(1, total)
+
+
+async def main_async(args):
+    os.environ["LLM_API_KEY"] = "offline"
+    os.environ["LLM_PROMPT_CACHE"] = "key"
+    os.environ["LLM_HISTORY_SUMMARY"] = "false"
+
+    with tempfile.TemporaryDirectory() as prompt_dir:
+        paths = [shutil.copy("../SOUL.md", prompt_dir), shutil.copy("../RULES.md", prompt_dir)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            prompts = PromptStore(paths, fallback="", check_interval_s=0)
+            prompt_tokens = len(prompts.current().text) // 4
+        print(f"System prompt ~{prompt_tokens} tokens; stand-in TTFT {args.ttft_ms:.0f} ms + "
+              f"{args.prefill_ms:.0f} ms per 1k uncached prompt tokens; {args.sessions} sessions x {args.turns} turns")
+
+        for port, prefix_cache in ((args.port, False), (args.port + 1, True)):
+            server = await llm_server.serve_in_background(
+                port, ttft_ms=args.ttft_ms, token_ms=1, prefill_ms=args.prefill_ms, prefix_cache=prefix_cache
+            )
+            os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+            edit_at = args.sessions // 2 if prefix_cache else None
+            first, later, versions, cached_share = await run_sessions(server, prompts, args, edit_at, paths[1])
+            label = "cached" if prefix_cache else "uncached"
+            print(f"- {label:<8} first turn TTFT mean {statistics.mean(first):6.1f} ms, "
+                  f"later turns {statistics.mean(later):6.1f} ms, {cached_share:.0%} of prompt tokens cached")
+            if prefix_cache:
+                reload_at = versions.index(versions[-1])
+                print(f"  prompt v{versions[0]} -> v{versions[-1]} at session {reload_at}: first turn "
+                      f"{first[reload_at]:6.1f} ms (miss), next session {first[reload_at + 1]:6.1f} ms")
+            await close_shared_clients()
+            server.should_exit = True
+            await asyncio.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--ttft-ms", type=float, default=150)
+    parser.add_argument("--prefill-ms", type=float, default=100)
+    parser.add_argument("--port", type=int, default=8874)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
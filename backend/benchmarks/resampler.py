@@ -0,0 +1,123 @@
+"""
+StreamingResampler vs the browser's box filter: throughput and aliasing.
+
+The box filter is useAudio.ts's downsampler ported to NumPy: each output
+sample is the mean of the input samples that fall in its slot, per
+ScriptProcessor block. It only downsamples, so the upsampling directions
+(TTS 24 kHz to a 44.1/48 kHz player) are reported for the resampler alone.
+
+- throughput: input samples per CPU second, fed in client-sized blocks
+  (one core; NumPy is kept single-threaded), plus the CPU share of one
+  real-time stream;
+- passband: worst gain deviation for tones up to 80% of the lower Nyquist;
+- aliasing (downsampling): output level of full-scale tones between the
+  output Nyquist and the input Nyquist, which should come out silent (worst
+  and mean, dB relative to the tone);
+- imaging (upsampling): worst energy above the input Nyquist in the output of
+  passband tones, which the input cannot have contained.
+
+Run from backend/:
+    python -m benchmarks.resampler [--seconds 2]
+"""
+import os
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+import time
+import argparse
+import numpy as np
+
+from audio_dsp.resample import StreamingResampler
+
+BLOCK = 4096  # ScriptProcessor buffer / typical TTS chunk
+
+
+def box_filter(x: np.ndarray, in_rate: int, out_rate: int) -> np.ndarray:
+    ratio = in_rate / out_rate
+    n = int(len(x) // ratio)
+    starts = np.floor(np.arange(n) * ratio).astype(np.int64)
+    ends = np.minimum(np.floor(np.arange(1, n + 1) * ratio).astype(np.int64), len(x))
+    sums = np.add.reduceat(x, starts) if n else np.zeros(0)
+    # reduceat sums up to the next start; the JS loop stops at floor((i + 1) * ratio), the same index
+    return (sums / np.maximum(1, ends - starts)).astype(np.float32)
+
+
+class BoxFilter:
+    def __init__(self, in_rate, out_rate):
+        self.in_rate, self.out_rate = in_rate, out_rate
+
+    def process_samples(self, x):
+        return box_filter(x, self.in_rate, self.out_rate)
+
+
+def stream(make, x, block=BLOCK):
+    resampler = make()
+    return np.concatenate([resampler.process_samples(x[i:i + block]) for i in range(0, len(x), block)])
+
+
+def throughput(make, in_rate, seconds):
+    x = (np.random.default_rng(0).normal(0, 0.1, in_rate * 10)).astype(np.float32)
+    resampler = make()
+    blocks = [x[i:i + BLOCK] for i in range(0, len(x), BLOCK)]
+    processed = 0
+    start = time.process_time()
+    while time.process_time() - start < seconds:
+        for b in blocks:
+            resampler.process_samples(b)
+        processed += len(x)
+    return processed / (time.process_time() - start)
+
+
+def tone_response(make, in_rate, out_rate, freq):
+    """
+    (gain dB, dB of output energy above the input Nyquist) for a full-scale tone.
+    """
+    t = np.arange(in_rate) / in_rate
+    y = stream(make, np.sin(2 * np.pi * freq * t).astype(np.float32))
+    settled = y[len(y) // 4:].astype(np.float64)
+    gain = 20 * np.log10(max(1e-9, np.sqrt(2 * np.mean(settled ** 2))))
+    spectrum = np.abs(np.fft.rfft(settled * np.hanning(len(settled)))) ** 2
+    freqs = np.fft.rfftfreq(len(settled), 1 / out_rate)
+    image = 10 * np.log10(max(1e-18, spectrum[freqs > in_rate / 2].sum() / spectrum.sum()))
+    return gain, image
+
+
+def quality(make, in_rate, out_rate):
+    nyquist = min(in_rate, out_rate) / 2
+    passband = [tone_response(make, in_rate, out_rate, f) for f in np.linspace(100, 0.8 * nyquist, 12)]
+    aliases = [tone_response(make, in_rate, out_rate, f)[0]
+               for f in np.linspace(nyquist * 1.02, in_rate / 2 * 0.98, 16)] if in_rate > out_rate else []
+    return [gain for gain, _ in passband], aliases, [image for _, image in passband]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=2, help="CPU time per throughput measurement")
+    args = parser.parse_args()
+
+    cases = [(48000, 16000), (44100, 16000), (24000, 48000), (24000, 44100)]
+    for in_rate, out_rate in cases:
+        print(f"{in_rate} -> {out_rate} Hz (blocks of {BLOCK} samples)")
+        filters = [("polyphase", lambda: StreamingResampler(in_rate, out_rate))]
+        if in_rate > out_rate:
+            filters.append(("box filter", lambda: BoxFilter(in_rate, out_rate)))
+        for name, make in filters:
+            rate = throughput(make, in_rate, args.seconds)
+            passband, aliases, images = quality(make, in_rate, out_rate)
+            line = (f"- {name:<10} {rate / 1e6:6.1f} M samples/s per core ({in_rate / rate * 100:.3f}% of a core "
+                    f"per stream), passband deviation {max(abs(g) for g in passband):5.2f} dB")
+            if aliases:
+                line += f", aliasing worst {max(aliases):6.1f} dB / mean {np.mean(aliases):6.1f} dB"
+            else:
+                line += f", imaging worst {max(images):6.1f} dB"
+            print(line)
+        if in_rate > out_rate:
+            # The box filter works per block and drops each block's fractional remainder
+            x = np.zeros(in_rate * 10, dtype=np.float32)
+            got = len(stream(lambda: BoxFilter(in_rate, out_rate), x))
+            print(f"  output length for 10 s: polyphase {len(stream(lambda: StreamingResampler(in_rate, out_rate), x))}, "
+                  f"box filter {got} (expected {out_rate * 10})")
+
+
+if __name__ == "__main__":
+    main()
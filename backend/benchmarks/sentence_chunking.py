@@ -0,0 +1,167 @@
+"""
+TTS chunking of streamed LLM replies: the old regex sentence split against
+SentenceChunker.
+
+- CPU: both splitters fed the same replies of increasing length, one
+  word-sized token at a time (as the mock LLM streams). The old split re-ran
+  re.split over the whole pending buffer after every token, so a reply
+  without a sentence end costs O(n^2); the chunker scans each character once.
+- Time to first audio: DeepgramPipelineEngine.handle_turn with the mock LLM and
+  TTS (trace timings: 380 ms to first token, 28 ms per token, TTS first byte
+  190 ms) and a client that plays audio in real time (tts_prefetch's
+  SimulatedClient). Reported per reply: first audio, audible silence after it
+  (TTS not keeping up with playback), TTS requests and when playback ends.
+
+Run from backend/:
+    python -m benchmarks.sentence_chunking [--trace trace.json] [--lengths 50,200,1000]
+"""
+import re
+import io
+import time
+import asyncio
+import argparse
+import contextlib
+
+from audio_providers.replay_trace import load_trace, response_tokens
+from audio_providers.llm.mock import MockLLMProvider
+from audio_providers.tts.mock import MockTTSProvider
+from benchmarks.tts_prefetch import SimulatedClient
+from conversation_engines import deepgram_pipeline
+from conversation_engines.deepgram_pipeline import DeepgramPipelineEngine
+from conversation_engines.sentence_chunker import SentenceChunker
+from transport.output_channel import OutputChannel
+
+# Replies with a long first sentence, the case the old split was slowest to voice
+LONG_REPLIES = [
+    "Well, based on the forecast for your area, tomorrow looks mild and mostly sunny with a light breeze "
+    "from the west in the afternoon. Expect a high around eighteen. It should cool down to about nine "
+    "degrees overnight, so bring a jacket if you're out late.",
+    "I found three options near you, and the closest one is Dr. Patel's clinic on Main St., which is about "
+    "1.5 miles away and opens at 8 a.m. tomorrow. The other two are a bit further out. Want me to book it?",
+]
+
+CPU_SENTENCE = "The committee met on Tuesday to review the plan, and most members agreed with the changes"
+
+
+class LegacySplitter:
+    """
+    The split handle_turn did before SentenceChunker, behind the same interface.
+    """
+
+    def __init__(self, **_):
+        self.buffer = ""
+
+    def push(self, text):
+        self.buffer += text
+        sentences = re.split(r'(?<=[.!?])\s+', self.buffer)
+        self.buffer = sentences[-1]
+        return [s for s in sentences[:-1] if s.strip()]
+
+    def flush(self):
+        rest, self.buffer = self.buffer.strip(), ""
+        return rest or None
+
+
+def cpu_reply(words, sentence_words):
+    """
+    A reply of `words` words in sentences of `sentence_words` (0 = no sentence end).
+    """
+    base = CPU_SENTENCE.split()
+    out = []
+    for i in range(words):
+        word = base[i % len(base)]
+        if sentence_words and (i + 1) % sentence_words == 0:
+            word += "."
+        out.append(word)
+    return [w + " " for w in out]
+
+
+def cpu_per_reply(splitter_class, tokens, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        splitter = splitter_class()
+        chunks = []
+        for token in tokens:
+            chunks += splitter.push(token)
+        rest = splitter.flush()
+        if rest:
+            chunks.append(rest)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(chunks)
+
+
+class CountingTTS(MockTTSProvider):
+    def __init__(self, trace):
+        super().__init__(trace)
+        self.requests = []
+
+    async def stream_audio(self, text_chunk):
+        self.requests.append(text_chunk)
+        async for chunk in super().stream_audio(text_chunk):
+            yield chunk
+
+
+async def run_turn(splitter_class, response, trace):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = DeepgramPipelineEngine("", "offline", "offline", {"provider": "mock", "trace": trace["tts"]},
+                                        llm=MockLLMProvider("", {"responses": [response]}))
+    engine.tts = CountingTTS(trace["tts"])
+    client = SimulatedClient(time.perf_counter())
+    client.channel = engine.output_handler = OutputChannel(client)
+    reporter = asyncio.create_task(client.report_loop())
+    # handle_turn looks the splitter up by name, so the old one can stand in for a run
+    deepgram_pipeline.SentenceChunker = splitter_class
+    try:
+        await engine.handle_turn("hello")
+        await client.channel.flush()
+    finally:
+        deepgram_pipeline.SentenceChunker = SentenceChunker
+        reporter.cancel()
+    return {
+        "first_audio_ms": client.first_audio * 1000,
+        "silence_ms": sum(client.sentence_gaps),
+        "requests": engine.tts.requests,
+        "playback_end_ms": client.next_play * 1000,
+    }
+
+
+async def turn_latency(trace, replies):
+    for text in replies:
+        response = {"ttft_ms": 380, "token_ms": 28, "text": text} if isinstance(text, str) else text
+        tokens = response_tokens(response)
+        words = len(response.get("text", "").split()) or len(tokens)
+        print(f"\n\"{(response.get('text') or ''.join(t for _, t in tokens))[:60]}...\" ({words} words)")
+        for name, splitter_class in (("regex split", LegacySplitter), ("chunker", SentenceChunker)):
+            result = await run_turn(splitter_class, response, trace)
+            first = result["requests"][0] if result["requests"] else ""
+            print(f"- {name:11s}: first audio {result['first_audio_ms']:5.0f} ms, silence after it "
+                  f"{result['silence_ms']:4.0f} ms, {len(result['requests'])} TTS requests, playback ends "
+                  f"{result['playback_end_ms']:6.0f} ms; first chunk \"{first[:40]}\"")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trace", help="mock provider timing trace (JSON, see audio_providers/replay_trace.py)")
+    parser.add_argument("--lengths", default="50,200,1000,3000", help="reply lengths in words for the CPU run")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    trace = load_trace(args.trace)
+
+    print("CPU per reply, one word per token (best of %d)" % args.repeat)
+    for sentence_words in (15, 0):
+        label = "15-word sentences" if sentence_words else "no sentence end"
+        for words in (int(n) for n in args.lengths.split(",")):
+            tokens = cpu_reply(words, sentence_words)
+            legacy, legacy_chunks = cpu_per_reply(LegacySplitter, tokens, args.repeat)
+            chunker, chunks = cpu_per_reply(SentenceChunker, tokens, args.repeat)
+            print(f"- {label}, {words:5d} words: regex split {legacy * 1e3:8.2f} ms ({legacy_chunks:3d} chunks), "
+                  f"chunker {chunker * 1e3:6.2f} ms ({chunks:3d} chunks), {legacy / max(chunker, 1e-9):6.1f}x")
+
+    print("\nTime to first audio, mock LLM + TTS")
+    asyncio.run(turn_latency(trace, trace["llm"]["responses"] + LONG_REPLIES))
+
+
+if __name__ == "__main__":
+    main()
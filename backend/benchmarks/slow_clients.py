@@ -0,0 +1,200 @@
+"""
+Slow-client load test: healthy sessions' reply latency with and without
+clients that can't keep up with their audio.
+
+Starts the Live API stand-in (server-side end-of-speech detection, --reply-s
+of reply audio per turn) and serve.py (one worker, gemini_live), then runs
+--healthy fake clients from load_test alone, and again alongside --slow slow
+clients. A slow client streams the same conversation in real time but reads
+its socket at --slow-read-kbps through a small receive buffer, like a phone
+on a congested downlink, so the server's socket backs up and its output
+queue grows. Like the frontend, it reports playback_status every 100 ms
+while it has audio to play. Users leave --gap-s after each utterance, long enough to hear
+the whole reply, so replies aren't cut short by barge-in (which drops the
+queued audio).
+
+Reports healthy clients' turn latency (last speech frame -> first reply audio)
+for both runs, when the slow clients were cut off (with close code 1008, or
+dropped when the close frame is stuck behind their backlog; the client only
+notices after reading what was already buffered) and the worker's slow-client
+and output queue metrics.
+
+Run from backend/:
+    python -m benchmarks.slow_clients [--healthy 20] [--slow 5] [--duration 40]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import statistics
+
+import httpx
+import websockets
+
+from audio_dsp.frame import analyze_frame
+from benchmarks.load_test import FRAME_S, SPEECH_RMS, fake_client, wait_ready
+from benchmarks.pcm_source import synthetic_conversation, split_frames
+from transport.audio_frames import HEADER_SIZE
+
+# Reply audio bytes per ms: PCM16 at the engines' 24 kHz
+AUDIO_BYTES_PER_MS = 48
+
+
+def conversation_frames(gap_s):
+    pcm, _ = synthetic_conversation(utterances=4, speech_s=1.2, gap_s=gap_s)
+    return [(frame, analyze_frame(frame).stats.rms >= SPEECH_RMS) for frame in split_frames(pcm)]
+
+
+async def slow_client(url, port, frames, duration_s, read_kbps, result):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # A small window, so the server's writes back up instead of filling our buffers
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    sock.setblocking(False)
+    ws = await websockets.connect(url, sock=sock, max_size=None, max_queue=1)
+    start = time.perf_counter()
+
+    # Audio plays back to back as it arrives, like the frontend's scheduled playback
+    playback = {"received_ms": 0.0, "ends_at": 0.0}
+
+    async def receive():
+        async for message in ws:
+            size = len(message) if isinstance(message, bytes) else len(message.encode())
+            result["received_bytes"] += size
+            if isinstance(message, bytes):
+                audio_ms = (size - HEADER_SIZE) / AUDIO_BYTES_PER_MS
+                playback["received_ms"] += audio_ms
+                playback["ends_at"] = max(playback["ends_at"], time.perf_counter()) + audio_ms / 1000
+            await asyncio.sleep(size * 8 / (read_kbps * 1000))
+
+    async def report():
+        # Every 100 ms while audio is queued, plus once more when it runs dry (as App.tsx)
+        last_buffered = 0.0
+        while True:
+            await asyncio.sleep(0.1)
+            buffered = max(0.0, playback["ends_at"] - time.perf_counter()) * 1000
+            if buffered > 0 or last_buffered > 0:
+                await ws.send(json.dumps({"type": "playback_status", "buffered_ms": round(buffered),
+                                          "received_ms": round(playback["received_ms"])}))
+            last_buffered = buffered
+
+    receiver = asyncio.create_task(receive())
+    reporter = asyncio.create_task(report())
+    try:
+        await ws.send(json.dumps({"type": "hello", "audio_transport": ["binary", "json"]}))
+        sent = 0
+        while time.perf_counter() - start < duration_s:
+            await ws.send(frames[sent % len(frames)][0])
+            sent += 1
+            await asyncio.sleep(max(0.0, start + sent * FRAME_S - time.perf_counter()))
+        result["outcome"] = "connected"
+    except websockets.exceptions.ConnectionClosed as e:
+        code = e.rcvd.code if e.rcvd else None
+        result["outcome"] = {1008: "closed by server (1008)", None: "dropped by server"}.get(code, f"closed ({code})")
+        result["closed_after_s"] = time.perf_counter() - start
+    finally:
+        receiver.cancel()
+        reporter.cancel()
+        await ws.close()
+
+
+async def run(args, slow, frames):
+    url = f"ws://127.0.0.1:{args.port}/ws"
+    latencies = []
+    outcome = {"completed": 0, "refused": 0, "failed": 0}
+    slow_results = [{"received_bytes": 0, "outcome": None, "closed_after_s": None} for _ in range(slow)]
+    clients = []
+    for i in range(slow):
+        clients.append(asyncio.create_task(slow_client(url, args.port, frames, args.duration, args.slow_read_kbps,
+                                                       slow_results[i])))
+    for i in range(args.healthy):
+        offset = i * 7 % len(frames)
+        clients.append(asyncio.create_task(fake_client(url, frames[offset:] + frames[:offset], args.duration,
+                                                       latencies, outcome)))
+        await asyncio.sleep(args.ramp / args.healthy)
+    await asyncio.gather(*clients)
+    return latencies, outcome, slow_results
+
+
+def start_processes(args):
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    standin = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.standins.live_api_server", "--port", str(args.standin_port),
+         "--handshake-ms", "50", "--setup-ms", "50", "--response-ms", "400", "--eos-ms", "300",
+         "--reply-s", str(args.reply_s)],
+        cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    env = dict(os.environ,
+               CONVERSATION_ENGINE="gemini_live",
+               GOOGLE_API_KEY="offline",
+               GEMINI_LIVE_URL=f"ws://127.0.0.1:{args.standin_port}",
+               ENGINE_POOL_SIZE="0",
+               SLOW_CLIENT_TIMEOUT_S=str(args.slow_timeout))
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1", "--host", "127.0.0.1", "--port", str(args.port),
+         "--log-level", "warning"],
+        cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return standin, server
+
+
+async def output_metrics(port):
+    async with httpx.AsyncClient() as client:
+        text = (await client.get(f"http://127.0.0.1:{port}/metrics")).text
+    return [line for line in text.splitlines()
+            if line.startswith(("donna_slow_client", "donna_output_audio_dropped", "donna_output_queue_peak_ms_count",
+                                "donna_output_queue_peak_ms_sum"))]
+
+
+def summarize(latencies):
+    if len(latencies) < 2:
+        return "no replies measured"
+    p95 = statistics.quantiles(latencies, n=20)[18]
+    return f"p50 {statistics.median(latencies):5.0f} ms, p95 {p95:5.0f} ms, max {max(latencies):5.0f} ms ({len(latencies)} replies)"
+
+
+async def main_async(args):
+    frames = conversation_frames(args.gap_s)
+    standin, server = start_processes(args)
+    try:
+        await wait_ready(args.port)
+        print(f"{args.healthy} healthy clients, {args.duration:.0f} s; replies of {args.reply_s:.0f} s "
+              f"({args.reply_s * 48:.0f} kB); slow clients read at {args.slow_read_kbps:.0f} kbps "
+              f"(audio needs 384), SLOW_CLIENT_TIMEOUT_S={args.slow_timeout:.0f}")
+        latencies, outcome, _ = await run(args, 0, frames)
+        print(f"- healthy only:       {summarize(latencies)}, {outcome['failed']} failed")
+        latencies, outcome, slow_results = await run(args, args.slow, frames)
+        print(f"- with {args.slow} slow clients: {summarize(latencies)}, {outcome['failed']} failed")
+        for i, result in enumerate(slow_results):
+            closed = f" after {result['closed_after_s']:.1f} s" if result["closed_after_s"] else ""
+            print(f"  slow client {i}: {result['outcome']}{closed}, read {result['received_bytes'] / 1000:.0f} kB")
+        for line in await output_metrics(args.port):
+            print(f"  {line}")
+    finally:
+        server.terminate()
+        standin.terminate()
+        server.wait(timeout=15)
+        standin.wait(timeout=15)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--healthy", type=int, default=20)
+    parser.add_argument("--slow", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=40)
+    parser.add_argument("--ramp", type=float, default=3, help="seconds over which healthy clients connect")
+    parser.add_argument("--reply-s", type=float, default=4.0, help="stand-in reply audio per turn")
+    parser.add_argument("--gap-s", type=float, default=6.0, help="silence after each utterance")
+    parser.add_argument("--slow-read-kbps", type=float, default=64)
+    parser.add_argument("--slow-timeout", type=float, default=10, help="SLOW_CLIENT_TIMEOUT_S for the server")
+    parser.add_argument("--port", type=int, default=8012)
+    parser.add_argument("--standin-port", type=int, default=8893)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Local stand-in for a Kokoro (OpenAI-compatible) TTS server.
+
+Implements POST /v1/audio/speech with response_format "pcm" and both
+"stream": false (whole sentence after full synthesis) and "stream": true
+(chunked PCM as it is "synthesized"). Audio is a deterministic tone,
+~60ms per input character at 24kHz, generated at --speed x realtime after
+a fixed --latency-ms, so latency measurements are repeatable offline.
+
+Run from backend/:
+    python -m benchmarks.standins.kokoro_server [--port 8880]
+then set KOKORO_BASE_URL=http://127.0.0.1:8880
+"""
+import asyncio
+import argparse
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+
+SAMPLE_RATE = 24000
+CHUNK_SAMPLES = SAMPLE_RATE // 20  # 50ms per streamed chunk
+
+
+def synthesize(text: str) -> bytes:
+    seconds = max(0.2, 0.06 * len(text))
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (3000 * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+
+
+def create_app(latency_ms: float = 150, speed: float = 5.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/audio/speech")
+    async def speech(request: Request):
+        body = await request.json()
+        pcm = synthesize(body.get("input", ""))
+        chunk_bytes = CHUNK_SAMPLES * 2
+        chunk_s = CHUNK_SAMPLES / SAMPLE_RATE / speed
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency_ms / 1000 + len(pcm) / 2 / SAMPLE_RATE / speed)
+            return Response(pcm, media_type="audio/pcm")
+
+        async def generate():
+            await asyncio.sleep(latency_ms / 1000)
+            for i in range(0, len(pcm), chunk_bytes):
+                await asyncio.sleep(chunk_s)
+                yield pcm[i:i + chunk_bytes]
+
+        return StreamingResponse(generate(), media_type="audio/pcm")
+
+    return app
+
+
+async def serve_in_background(port: int, **kwargs):
+    """
+    Start the stand-in inside the current event loop. Returns the uvicorn Server;
+    set server.should_exit = True to stop it.
+    """
+    config = uvicorn.Config(create_app(**kwargs), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8880)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--speed", type=float, default=5.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.speed), host="127.0.0.1", port=args.port)
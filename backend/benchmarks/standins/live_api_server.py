@@ -0,0 +1,192 @@
+"""
+Local stand-in for the Gemini Live API (BidiGenerateContent) websocket.
+
+Accepts a connection after --handshake-ms (standing in for DNS + TLS + auth),
+answers the setup message with setupComplete after --setup-ms, and replies to
+the first realtimeInput audio of each turn with a short modelTurn (--reply-s
+of 24kHz PCM tone as inlineData) after --response-ms, followed by turnComplete. Enough to
+drive GeminiLiveEngine end to end offline.
+
+With --eos-ms it instead behaves like server-side turn detection: it waits
+for speech (input RMS above SPEECH_RMS) followed by --eos-ms without speech,
+then replies, so clients can stream continuously (silence included).
+Speech during a reply cancels it at once, unless --interrupt-ms is given:
+then, like the Live API, the reply keeps streaming for --interrupt-ms before
+it is cut off with {"serverContent": {"interrupted": true}}.
+
+With --realtime the tone is streamed in real time (one 100 ms part every
+100 ms) instead of all at once, as a long Live API reply arrives.
+
+With --trace <recording.jsonl> (made with GEMINI_LIVE_RECORD_PATH) each reply
+replays the next recorded model turn instead of the tone: the recorded
+messages, with their recorded gaps, from the turn's first modelTurn through
+turnComplete.
+
+Run from backend/:
+    python -m benchmarks.standins.live_api_server [--port 8890]
+then set GEMINI_LIVE_URL=ws://127.0.0.1:8890
+"""
+import json
+import base64
+import asyncio
+import argparse
+import numpy as np
+import websockets
+
+SAMPLE_RATE = 24000
+CHUNK_SAMPLES = SAMPLE_RATE // 10  # 100ms per inlineData part
+SPEECH_RMS = 500
+
+
+def reply_audio(seconds: float = 1.0) -> bytes:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (3000 * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+
+
+def input_rms(msg: dict) -> float:
+    chunks = msg["realtimeInput"].get("mediaChunks", [])
+    pcm = b"".join(base64.b64decode(chunk["data"]) for chunk in chunks)
+    samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype="<i2").astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+
+def load_turns(path: str):
+    """
+    Model turns from a GEMINI_LIVE_RECORD_PATH recording: [[(offset_s, raw_msg), ...], ...],
+    offsets relative to the turn's first message.
+    """
+    turns, current = [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            server_content = json.loads(entry["msg"]).get("serverContent") or {}
+            if not current and "modelTurn" not in server_content:
+                continue  # setupComplete, transcriptions, interruptions between turns
+            current.append((entry["t"], entry["msg"]))
+            if server_content.get("turnComplete"):
+                start = current[0][0]
+                turns.append([(t - start, msg) for t, msg in current])
+                current = []
+    return turns
+
+
+def tone_turn(seconds: float = 1.0, realtime: bool = False):
+    audio = reply_audio(seconds)
+    chunk_bytes = CHUNK_SAMPLES * 2
+    pace_s = CHUNK_SAMPLES / SAMPLE_RATE / chunk_bytes if realtime else 0.0
+    messages = [
+        (i * pace_s, json.dumps({"serverContent": {"modelTurn": {"parts": [
+            {"inlineData": {"mimeType": "audio/pcm;rate=24000",
+                            "data": base64.b64encode(audio[i:i + chunk_bytes]).decode("utf-8")}}
+        ]}}}))
+        for i in range(0, len(audio), chunk_bytes)
+    ]
+    return messages + [(len(audio) * pace_s, json.dumps({"serverContent": {"turnComplete": True}}))]
+
+
+def create_handler(setup_ms: float = 150, response_ms: float = 400, eos_ms: float = None, turns=None,
+                   reply_s: float = 1.0, realtime: bool = False, interrupt_ms: float = None):
+    turns = turns or [tone_turn(reply_s, realtime)]
+
+    async def respond(ws, replies):
+        await asyncio.sleep(response_ms / 1000)
+        # Each connection replays the turns from the first one
+        turn = turns[replies["count"] % len(turns)]
+        replies["count"] += 1
+        replies["streaming"] = True
+        try:
+            start = asyncio.get_running_loop().time()
+            for offset, message in turn:
+                delay = start + offset - asyncio.get_running_loop().time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await ws.send(message)
+        finally:
+            replies["streaming"] = False
+
+    async def interrupt(ws, reply):
+        await asyncio.sleep(interrupt_ms / 1000)
+        if not reply.done():
+            reply.cancel()
+            await ws.send(json.dumps({"serverContent": {"interrupted": True}}))
+
+    async def respond_after_silence(ws, replies):
+        await asyncio.sleep(eos_ms / 1000)
+        await respond(ws, replies)
+
+    async def handler(ws):
+        responding = None
+        interrupting = None
+        replies = {"count": 0, "streaming": False}
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                if "setup" in msg:
+                    await asyncio.sleep(setup_ms / 1000)
+                    await ws.send(json.dumps({"setupComplete": {}}))
+                elif "realtimeInput" not in msg:
+                    continue
+                elif eos_ms is None:
+                    if responding is None or responding.done():
+                        responding = asyncio.create_task(respond(ws, replies))
+                elif input_rms(msg) >= SPEECH_RMS:
+                    if interrupt_ms is not None and replies["streaming"]:
+                        # Talked over: the reply goes on until the interruption is detected
+                        if interrupting is None or interrupting.done():
+                            interrupting = asyncio.create_task(interrupt(ws, responding))
+                        continue
+                    # Speech (re)starts the end-of-speech timer
+                    if responding:
+                        responding.cancel()
+                    responding = asyncio.create_task(respond_after_silence(ws, replies))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            if responding:
+                responding.cancel()
+            if interrupting:
+                interrupting.cancel()
+
+    return handler
+
+
+async def serve_in_background(port: int, handshake_ms: float = 250, **kwargs):
+    """
+    Start the stand-in inside the current event loop. Returns the websockets Server;
+    call server.close() to stop it.
+    """
+    async def delay_handshake(connection, request):
+        await asyncio.sleep(handshake_ms / 1000)
+        return None
+
+    return await websockets.serve(
+        create_handler(**kwargs), "127.0.0.1", port, process_request=delay_handshake
+    )
+
+
+async def run(args):
+    server = await serve_in_background(
+        args.port, handshake_ms=args.handshake_ms, setup_ms=args.setup_ms,
+        response_ms=args.response_ms, eos_ms=args.eos_ms, reply_s=args.reply_s,
+        realtime=args.realtime, interrupt_ms=args.interrupt_ms,
+        turns=load_turns(args.trace) if args.trace else None
+    )
+    print(f"Live API stand-in on ws://127.0.0.1:{args.port}")
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8890)
+    parser.add_argument("--handshake-ms", type=float, default=250)
+    parser.add_argument("--setup-ms", type=float, default=150)
+    parser.add_argument("--response-ms", type=float, default=400)
+    parser.add_argument("--eos-ms", type=float, default=None)
+    parser.add_argument("--reply-s", type=float, default=1.0, help="length of the tone reply")
+    parser.add_argument("--realtime", action="store_true", help="stream the tone in real time")
+    parser.add_argument("--interrupt-ms", type=float, default=None,
+                        help="keep streaming a talked-over reply this long, then send interrupted")
+    parser.add_argument("--trace", default=None, help="GEMINI_LIVE_RECORD_PATH recording to replay")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,137 @@
+"""
+Local stand-in for an OpenAI-compatible chat completions server.
+
+Implements POST /v1/chat/completions, streamed (server-sent events) or not.
+The reply is a fixed number of short sentences, one token every --token-ms
+after a time-to-first-token of --ttft-ms plus --prefill-ms per 1k prompt
+tokens (~4 chars/token), so GeminiLLMProvider can be driven offline with
+repeatable timing that still grows with prompt size.
+
+With --prefix-cache, it also models provider-side prompt caching: the longest
+run of leading messages seen byte-for-byte in an earlier request is "cached"
+and costs a tenth of the prefill time. Cached token counts are reported in
+usage.prompt_tokens_details when the request asks for usage.
+
+Run from backend/:
+    python -m benchmarks.standins.llm_server [--port 8870]
+then set LLM_BASE_URL=http://127.0.0.1:8870/v1
+"""
+import json
+import time
+import hashlib
+import asyncio
+import argparse
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = "Sure, I can help with that. Here is what I found. Let me know if you need anything else."
+
+
+def prompt_tokens(messages) -> int:
+    return sum(len(str(m.get("content", ""))) for m in messages) // 4
+
+
+def cached_prefix_tokens(seen: set, messages) -> int:
+    """
+    Tokens in the longest previously seen message prefix; records this request's prefixes.
+    """
+    digest = hashlib.sha256()
+    cached = tokens = 0
+    for message in messages:
+        digest.update(json.dumps(message, sort_keys=True).encode("utf-8"))
+        tokens += prompt_tokens([message])
+        key = digest.hexdigest()
+        if key in seen:
+            cached = tokens
+        seen.add(key)
+    return cached
+
+
+def create_app(ttft_ms: float = 300, token_ms: float = 15, prefill_ms: float = 0,
+               prefix_cache: bool = False) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = []
+    app.state.cached_tokens = []
+    seen_prefixes = set()
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        app.state.requests.append(body)
+        model = body.get("model", "stand-in")
+        messages = body.get("messages", [])
+        total = prompt_tokens(messages)
+        cached = cached_prefix_tokens(seen_prefixes, messages) if prefix_cache else 0
+        app.state.cached_tokens.append(cached)
+        first_token_s = (ttft_ms + prefill_ms * (total - cached + 0.1 * cached) / 1000) / 1000
+        usage = {
+            "prompt_tokens": total,
+            "completion_tokens": len(REPLY) // 4,
+            "total_tokens": total + len(REPLY) // 4,
+            "prompt_tokens_details": {"cached_tokens": cached}
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(first_token_s)
+            return {
+                "id": "chatcmpl-standin",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+                "usage": usage
+            }
+
+        def event(delta: dict = None, finish_reason=None, usage: dict = None) -> str:
+            chunk = {
+                "id": "chatcmpl-standin",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            if usage:
+                chunk["usage"] = usage
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        async def generate():
+            await asyncio.sleep(first_token_s)
+            yield event({"role": "assistant", "content": ""})
+            for word in REPLY.split(" "):
+                yield event({"content": word + " "})
+                await asyncio.sleep(token_ms / 1000)
+            yield event({}, finish_reason="stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield event(usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    return app
+
+
+async def serve_in_background(port: int, **kwargs):
+    """
+    Start the stand-in inside the current event loop. Returns the uvicorn Server;
+    server.config.app.state.requests holds the received request bodies.
+    Set server.should_exit = True to stop it.
+    """
+    config = uvicorn.Config(create_app(**kwargs), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8870)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--prefill-ms", type=float, default=0)
+    parser.add_argument("--prefix-cache", action="store_true")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.ttft_ms, args.token_ms, args.prefill_ms, args.prefix_cache),
+                host="127.0.0.1", port=args.port)
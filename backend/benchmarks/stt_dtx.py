@@ -0,0 +1,154 @@
+"""
+Upstream STT bytes and word error rate with DTX off vs on, on the same replayed audio.
+
+Streams PCM in real time through the local VAD into an STT provider, once
+forwarding every frame and once through UpstreamDTX (both runs side by side),
+and reports:
+
+- audio bytes sent upstream, keepalives and pauses,
+- speech coverage: share of ground-truth speech frames that reached the STT
+  (synthetic input only; the pre-roll should keep this at 100%),
+- end of speech -> final transcript (synthetic input only: from the
+  ground-truth end of each utterance),
+- WER of the final transcripts against the reference text.
+
+--stt deepgram (DEEPGRAM_API_KEY) needs recordings with a reference transcript
+next to each file (same name, .txt). The default, --stt mock, replays the
+built-in trace against a synthetic conversation whose gaps outlast Deepgram's
+10 s idle timeout; its "recognition" is scripted per utterance, so the WER
+there only shows whether whole utterances were lost or merged.
+
+Run from backend/:
+    python -m benchmarks.stt_dtx [files...] [--stt mock|deepgram]
+"""
+import os
+import re
+import time
+import asyncio
+import argparse
+
+from audio_dsp.frame import analyze_frame
+from audio_dsp.vad import EnergySpectralVAD
+from audio_providers.replay_trace import load_trace
+from audio_providers.stt.mock import MockSTTProvider
+from benchmarks.pcm_source import FRAME_BYTES, load_pcm, synthetic_conversation, split_frames
+from conversation_engines.stt_dtx import UpstreamDTX
+
+FRAME_S = FRAME_BYTES / 2 / 16000
+
+
+def words(text):
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = words(reference), words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (r != h))
+    return row[len(hyp)] / max(1, len(ref))
+
+
+def create_stt(kind):
+    if kind == "deepgram":
+        from audio_providers.stt.deepgram import DeepgramSTTProvider
+        return DeepgramSTTProvider(os.environ["DEEPGRAM_API_KEY"])
+    return MockSTTProvider(load_trace()["stt"])
+
+
+async def run(kind, frames, dtx_enabled, tail_s):
+    stt = create_stt(kind)
+    await stt.connect()
+    vad = EnergySpectralVAD()
+    dtx = UpstreamDTX(stt) if dtx_enabled else None
+    finals, final_times = [], []
+    start = time.perf_counter()
+
+    async def collect():
+        async for event in stt.listen():
+            if event["type"] == "text" and event.get("is_final"):
+                finals.append(event["value"])
+                final_times.append(time.perf_counter() - start)
+
+    collector = asyncio.create_task(collect())
+    forwarded = [False] * len(frames)
+    for i, pcm in enumerate(frames):
+        await asyncio.sleep(max(0.0, start + i * FRAME_S - time.perf_counter()))
+        vad.process(analyze_frame(pcm))
+        if dtx:
+            before = dtx.stats["bytes_sent"]
+            await dtx.send(pcm, vad.in_speech)
+            # This frame, plus any pre-roll frames sent ahead of it
+            for k in range(i, i - (dtx.stats["bytes_sent"] - before) // len(pcm), -1):
+                forwarded[k] = True
+        else:
+            await stt.send_audio(pcm)
+            forwarded[i] = True
+    await asyncio.sleep(tail_s)
+    sent_bytes = dtx.stats["bytes_sent"] if dtx else len(frames) * FRAME_BYTES
+    idle_closed = getattr(stt, "stats", {}).get("idle_closed", False)
+    await stt.close()
+    collector.cancel()
+    return {"finals": finals, "final_times": final_times, "forwarded": forwarded, "sent_bytes": sent_bytes,
+            "dtx": dtx.stats if dtx else None, "idle_closed": idle_closed}
+
+
+def load_input(args):
+    if args.files:
+        pcm = b"".join(load_pcm(path) for path in args.files)
+        references = []
+        for path in args.files:
+            reference_path = os.path.splitext(path)[0] + ".txt"
+            if not os.path.exists(reference_path):
+                raise SystemExit(f"missing reference transcript {reference_path}")
+            with open(reference_path) as f:
+                references.append(f.read())
+        return split_frames(pcm), None, " ".join(references)
+    if args.stt == "deepgram":
+        raise SystemExit("--stt deepgram needs recordings with reference transcripts")
+    pcm, spans = synthetic_conversation(utterances=args.utterances, speech_s=1.5, gap_s=args.gap)
+    utterances = load_trace()["stt"]["utterances"]
+    reference = " ".join(utterances[i % len(utterances)]["final"] for i in range(len(spans)))
+    return split_frames(pcm), spans, reference
+
+
+async def main_async(args):
+    frames, spans, reference = load_input(args)
+    total = len(frames) * FRAME_BYTES
+    print(f"{len(frames) * FRAME_S:.1f} s of input ({total} bytes), stt={args.stt}, real time")
+    speech_frames = None
+    if spans:
+        speech_frames = [i for i in range(len(frames))
+                         if any(start < (i + 1) * FRAME_S and i * FRAME_S < end for start, end in spans)]
+    off, on = await asyncio.gather(run(args.stt, frames, False, args.tail), run(args.stt, frames, True, args.tail))
+    for name, result in (("DTX off", off), ("DTX on", on)):
+        line = f"- {name:<8} upstream {result['sent_bytes'] / 1000:7.1f} kB ({result['sent_bytes'] / total * 100:3.0f}%)"
+        if result["dtx"]:
+            line += f", {result['dtx']['pauses']} pauses, {result['dtx']['keepalives']} keepalives"
+        if speech_frames:
+            covered = sum(1 for i in speech_frames if result["forwarded"][i])
+            line += f", speech coverage {covered / len(speech_frames) * 100:.0f}%"
+        delays = [min((t for t in result["final_times"] if t > end), default=None) for _, end in spans or []]
+        delays = [t - end for t, (_, end) in zip(delays, spans or []) if t is not None]
+        if delays:
+            line += f", speech end -> final {sum(delays) / len(delays) * 1000:.0f} ms"
+        line += f", {len(result['finals'])} finals, WER {word_error_rate(reference, ' '.join(result['finals'])) * 100:.1f}%"
+        if result["idle_closed"]:
+            line += " (stream closed for inactivity)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="16-bit mono 16kHz .pcm/.wav, each with a .txt reference")
+    parser.add_argument("--stt", choices=["mock", "deepgram"], default="mock")
+    parser.add_argument("--utterances", type=int, default=3)
+    parser.add_argument("--gap", type=float, default=12.0, help="synthetic silence between utterances (s)")
+    parser.add_argument("--tail", type=float, default=2.0, help="seconds to wait for the last final")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Phrase cache effectiveness on a repetitive reply mix, against the stand-in Kokoro server.
+
+Replays a session-like sequence of sentences (greetings, "one moment", apologies
+mixed with unique content) through KokoroTTSProvider with and without
+CachedTTSProvider, and reports hit rate, bytes saved, and first-byte latency.
+A second pass with a fresh memory tier shows the on-disk tier.
+
+Run from backend/:
+    python -m benchmarks.tts_cache [--turns 40]
+"""
+import io
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import contextlib
+
+from audio_providers.clients import close_shared_clients
+from audio_providers.tts.kokoro_tts import KokoroTTSProvider
+from audio_providers.tts.cache import PhraseAudioCache, CachedTTSProvider
+from benchmarks.standins.kokoro_server import serve_in_background
+
+STOCK = [
+    "Good morning.",
+    "One moment.",
+    "Let me check that for you.",
+    "I'm sorry, I encountered an error.",
+    "Done.",
+]
+
+
+def session_script(turns: int):
+    rng = random.Random(0)
+    lines = []
+    for i in range(turns):
+        lines.append(rng.choice(STOCK))
+        lines.append(f"Here is the detail for request number {i}, which nobody has asked before.")
+    return lines
+
+
+async def play(tts, lines):
+    firsts = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for line in lines:
+            start = time.perf_counter()
+            first = None
+            async for chunk in tts.stream_audio(line):
+                if chunk and first is None:
+                    first = time.perf_counter() - start
+            firsts.append(first * 1000)
+    return firsts
+
+
+async def main_async(args):
+    server = await serve_in_background(args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    lines = session_script(args.turns)
+
+    kokoro = KokoroTTSProvider(base_url=base_url, streaming=True)
+    firsts = await play(kokoro, lines)
+    print(f"{len(lines)} sentences, {len(set(lines))} distinct")
+    print(f"- uncached: mean first byte {sum(firsts) / len(firsts):6.1f} ms")
+
+    with tempfile.TemporaryDirectory() as disk_dir:
+        cache = PhraseAudioCache(disk_dir=disk_dir)
+        firsts = await play(CachedTTSProvider(kokoro, cache), lines)
+        print(f"- cached:   mean first byte {sum(firsts) / len(firsts):6.1f} ms, hit rate {cache.hit_rate():.0%}, "
+              f"{cache.stats['bytes_saved'] / 1024:.0f} KiB and {cache.stats['latency_saved_s'] * 1000:.0f} ms synthesis saved")
+
+        # New process-like state: empty memory tier, same disk directory
+        cold = PhraseAudioCache(disk_dir=disk_dir)
+        firsts = await play(CachedTTSProvider(kokoro, cold), STOCK)
+        print(f"- disk tier (cold memory): mean first byte {sum(firsts) / len(firsts):6.1f} ms for stock phrases, "
+              f"{cold.stats['disk_hits']}/{len(STOCK)} served from disk, "
+              f"{cold.stats['latency_saved_s'] * 1000:.0f} ms synthesis saved")
+
+    await kokoro.close()
+    await close_shared_clients()
+    server.should_exit = True
+    await asyncio.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--port", type=int, default=8881)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Measure audible inter-sentence gaps for DeepgramPipelineEngine.handle_turn with
+serial TTS (lookahead 0) and with sentence prefetch (1-3).
+
+Uses stand-in LLM/TTS providers with fixed latencies, so no network is needed:
+the LLM streams a multi-sentence reply token by token, and the TTS has a
+first-byte delay then streams 24kHz PCM faster than realtime. A simulated
+client plays audio in real time and reports its buffer (flow control), so the
+gap is the silence actually heard between sentence N and N+1, and the turn
+timings and peak client queue show how far the server runs ahead of playback.
+
+Run from backend/:
+    python -m benchmarks.tts_prefetch [--ttfb-ms 250] [--sentences 6]
+"""
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import io
+import base64
+
+from conversation_engines.deepgram_pipeline import DeepgramPipelineEngine
+from transport.output_channel import OutputChannel
+from transport.audio_frames import HEADER_SIZE
+
+SAMPLE_RATE = 24000
+
+
+class StandInLLM:
+    def __init__(self, sentences: int, token_delay: float):
+        words = []
+        for i in range(sentences):
+            words += f"This is sentence number {i + 1} of the reply.".split()
+        self.tokens = [w + " " for w in words]
+        self.token_delay = token_delay
+
+    async def generate_response(self, text_input, record_history=True):
+        for token in self.tokens:
+            await asyncio.sleep(self.token_delay)
+            yield token
+
+    def record_user(self, user_text):
+        pass
+
+    def record_reply(self, assistant_text):
+        pass
+
+
+class StandInTTS:
+    def __init__(self, ttfb: float, speed: float):
+        self.ttfb = ttfb
+        self.speed = speed  # x realtime
+
+    async def stream_audio(self, text_chunk):
+        await asyncio.sleep(self.ttfb)
+        seconds = 0.06 * len(text_chunk)  # ~60ms of speech per character
+        chunk = b"\x00\x00" * (SAMPLE_RATE // 10)
+        for _ in range(int(seconds * 10)):
+            await asyncio.sleep(0.1 / self.speed)
+            yield chunk
+
+
+class SimulatedClient:
+    """
+    WebSocket stand-in that "plays" received audio in real time like useAudio.ts
+    (each chunk scheduled right after the previous one) and reports its playback
+    buffer every 100ms like App.tsx, so server-side flow control is exercised.
+    """
+
+    def __init__(self, start: float):
+        self.start = start
+        self.next_play = 0.0
+        self.received_ms = 0.0
+        self.channel = None
+        self.sentence_gaps = []  # audible silence before each sentence after the first
+        self.first_audio = None
+        self.turn_complete = None
+        self.max_buffered_ms = 0.0
+        self._sentence_started = False
+        self._sentences = 0
+
+    def now(self):
+        return time.perf_counter() - self.start
+
+    def _on_audio(self, pcm_bytes: int):
+        now = self.now()
+        duration = pcm_bytes / 2 / SAMPLE_RATE
+        if self.first_audio is None:
+            self.first_audio = now
+        if self._sentence_started and self._sentences > 1:
+            self.sentence_gaps.append(max(0.0, now - self.next_play) * 1000)
+        self._sentence_started = False
+        self.next_play = max(now, self.next_play) + duration
+        self.max_buffered_ms = max(self.max_buffered_ms, (self.next_play - now) * 1000)
+        self.received_ms += duration * 1000
+
+    async def send_text(self, message):
+        data = json.loads(message)
+        if data["type"] == "response_chunk":
+            self._sentence_started = True
+            self._sentences += 1
+        elif data["type"] == "audio":
+            self._on_audio(len(base64.b64decode(data["data"])))
+        elif data["type"] == "turn_complete":
+            self.turn_complete = self.now()
+
+    async def send_bytes(self, data):
+        self._on_audio(len(data) - HEADER_SIZE)
+
+    async def report_loop(self):
+        while True:
+            await asyncio.sleep(0.1)
+            buffered = max(0.0, self.next_play - self.now()) * 1000
+            self.channel.flow.on_client_report(buffered, self.received_ms)
+
+
+async def run_turn(lookahead: int, args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = DeepgramPipelineEngine("", "offline", "offline", {"provider": "kokoro"})
+    engine.llm = StandInLLM(args.sentences, args.token_ms / 1000)
+    engine.tts = StandInTTS(args.ttfb_ms / 1000, args.tts_speed)
+    engine.tts_lookahead = lookahead
+
+    client = SimulatedClient(time.perf_counter())
+    client.channel = engine.output_handler = OutputChannel(client, target_buffer_ms=args.target_buffer_ms)
+    reporter = asyncio.create_task(client.report_loop())
+    with contextlib.redirect_stdout(io.StringIO()):
+        await engine.handle_turn("hello")
+        await client.channel.flush()
+    reporter.cancel()
+
+    playback_end = client.next_play
+    return (client.sentence_gaps, client.first_audio * 1000, playback_end * 1000,
+            client.turn_complete * 1000, client.max_buffered_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=6)
+    parser.add_argument("--ttfb-ms", type=float, default=250)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--tts-speed", type=float, default=8.0)
+    parser.add_argument("--target-buffer-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{args.sentences} sentences, TTS first byte {args.ttfb_ms:.0f} ms at {args.tts_speed:.0f}x realtime")
+    for lookahead in (0, 1, 2, 3):
+        gaps, first_audio, playback_end, turn_complete, max_buffered = asyncio.run(run_turn(lookahead, args))
+        label = "serial" if lookahead == 0 else f"lookahead {lookahead}"
+        print(f"- {label:11s}: audible inter-sentence gap mean {sum(gaps) / max(1, len(gaps)):5.0f} ms, "
+              f"max {max(gaps, default=0):5.0f} ms; first audio {first_audio:4.0f} ms; "
+              f"playback ends {playback_end:5.0f} ms; turn_complete {turn_complete:5.0f} ms; "
+              f"peak client queue {max_buffered:5.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Per-turn latency tracing: hot-path cost, and what it reports end to end.
+
+1. Micro-benchmark of the calls the engines make: mark() on every outbound
+   audio chunk, note() on VAD events, and the once-per-turn begin/finish
+   (where the histograms are observed), plus rendering /metrics.
+2. GeminiLiveEngine against the Live API stand-in with server-side
+   end-of-speech (--eos-ms): a synthetic conversation is streamed in real time
+   and the resulting turn histograms and JSON trace (TRACE_DIR) are printed.
+
+Run from backend/:
+    python -m benchmarks.turn_tracing [--utterances 4] [--eos-ms 300] [--response-ms 400]
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import timeit
+
+from audio_dsp.frame import analyze_frame
+from conversation_engines.gemini_live import GeminiLiveEngine
+from telemetry.metrics import REGISTRY
+from telemetry.tracing import SessionTracer, PIPELINE_EVENTS, GEMINI_LIVE_EVENTS
+from benchmarks.pcm_source import synthetic_conversation, split_frames
+from benchmarks.standins.live_api_server import serve_in_background
+
+FRAME_S = 4096 / 2 / 16000
+
+
+def micro(number=200_000):
+    tracer = SessionTracer("bench", PIPELINE_EVENTS)
+    tracer.begin_turn("turn_start")
+    results = {
+        "mark (per audio chunk)": timeit.timeit(lambda: tracer.mark("first_audio_sent"), number=number) / number,
+        "note (per VAD event)": timeit.timeit(lambda: tracer.note("speech_end"), number=number) / number,
+    }
+
+    def turn():
+        tracer.note("speech_end")
+        tracer.note("stt_final")
+        tracer.begin_turn("turn_start")
+        for event in PIPELINE_EVENTS[3:]:
+            tracer.mark(event)
+        tracer.finish_turn()
+
+    turns = number // 20
+    results["full turn (begin + marks + finish)"] = timeit.timeit(turn, number=turns) / turns
+    renders = 200
+    results["render /metrics"] = timeit.timeit(REGISTRY.render, number=renders) / renders
+    print("Hot-path cost:")
+    for label, seconds in results.items():
+        print(f"- {label:<36} {seconds * 1e6:8.2f} µs")
+    print(f"  (a 4096-byte input frame is {FRAME_S * 1000:.0f} ms of audio)")
+
+
+class NullClient:
+    async def __call__(self, message: str):
+        pass
+
+
+async def end_to_end(args):
+    server = await serve_in_background(
+        args.port, handshake_ms=50, setup_ms=50, response_ms=args.response_ms, eos_ms=args.eos_ms
+    )
+    os.environ["GEMINI_LIVE_URL"] = f"ws://127.0.0.1:{args.port}"
+    trace_dir = tempfile.mkdtemp(prefix="donna-traces-")
+    engine = GeminiLiveEngine(
+        system_prompt="You are DONNA.", google_api_key="offline",
+        tracer=SessionTracer("gemini_live", GEMINI_LIVE_EVENTS, dump_dir=trace_dir)
+    )
+    pcm, _ = synthetic_conversation(utterances=args.utterances, speech_s=1.2, gap_s=2.0)
+    frames = [analyze_frame(f) for f in split_frames(pcm)]
+    await engine.start_session(output_handler=NullClient())
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        await engine.process_audio_input(frame)
+        await asyncio.sleep(max(0.0, start + (i + 1) * FRAME_S - time.perf_counter()))
+    await asyncio.sleep(args.response_ms / 1000 + 0.5)
+    await engine.end_session()
+    server.close()
+
+    print(f"\nGET /metrics after {args.utterances} turns (stand-in: {args.eos_ms:.0f} ms end-of-speech "
+          f"+ {args.response_ms:.0f} ms response):")
+    for line in REGISTRY.render().splitlines():
+        if "gemini_live" in line and ("_sum" in line or "_count" in line or "donna_turns_total" in line):
+            print("  " + line)
+    for name in os.listdir(trace_dir):
+        with open(os.path.join(trace_dir, name)) as f:
+            trace = json.load(f)
+        print(f"\nTrace {name}:")
+        for turn in trace["turns"]:
+            print(f"  turn {turn['turn']} ({turn['outcome']}): {turn['events_ms']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--utterances", type=int, default=4)
+    parser.add_argument("--eos-ms", type=float, default=300)
+    parser.add_argument("--response-ms", type=float, default=400)
+    parser.add_argument("--port", type=int, default=8893)
+    args = parser.parse_args()
+    micro()
+    asyncio.run(end_to_end(args))
+
+
+if __name__ == "__main__":
+    main()
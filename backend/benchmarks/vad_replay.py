@@ -0,0 +1,111 @@
+"""
+Replay PCM through the local VAD and report events, detection latency and CPU cost.
+
+Also runs the legacy barge-in rule (RMS > 1000 for 7 consecutive frames) on the
+same audio for comparison. With no path, a synthetic conversation with known
+speech spans is used so onset/offset latency can be measured; a cough and a
+blip of speaker echo follow every utterance (--no-transients to leave them
+out), and each barge-in trigger (the engines' SPEECH_SUSTAINED, the bare
+SPEECH_START onset, the legacy rule) is scored against them: a trigger outside
+the speech spans is a false barge-in that would have cut the agent off.
+
+Run from backend/:
+    python -m benchmarks.vad_replay [path/to/audio.pcm|.wav] [--frame-bytes N] [--no-transients]
+"""
+import sys
+import time
+import argparse
+
+from audio_dsp.frame import analyze_frame
+from audio_dsp.vad import EnergySpectralVAD, VADEvent
+from benchmarks.pcm_source import FRAME_BYTES, SAMPLE_RATE, load_pcm, synthetic_conversation, split_frames
+
+# A trigger this long after an utterance ends still belongs to it (frames are reported at their end)
+SPAN_TOLERANCE_S = 0.3
+
+
+def legacy_onsets(frames, frame_s):
+    hits = 0
+    onsets = []
+    for i, data in enumerate(frames):
+        if analyze_frame(data).stats.rms > 1000:
+            hits += 1
+            if hits >= 7:
+                onsets.append((i + 1) * frame_s)
+                hits = 0
+        else:
+            hits = 0
+    return onsets
+
+
+def false_triggers(triggers, spans):
+    return [t for t in triggers if not any(start <= t <= end + SPAN_TOLERANCE_S for start, end in spans)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--frame-bytes", type=int, default=FRAME_BYTES)
+    parser.add_argument("--no-transients", action="store_true", help="synthetic speech only, no coughs or echo")
+    args = parser.parse_args()
+
+    utterances = 5
+    if args.path:
+        data, spans = load_pcm(args.path), None
+    else:
+        data, spans = synthetic_conversation(utterances, transients=not args.no_transients)
+
+    frames = [analyze_frame(f) for f in split_frames(data, args.frame_bytes)]
+    if not frames:
+        print("Not enough audio for a single frame.")
+        sys.exit(1)
+    frame_s = args.frame_bytes / 2 / SAMPLE_RATE
+
+    vad = EnergySpectralVAD(sample_rate=SAMPLE_RATE)
+    events = []
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        for event in vad.process(frame):
+            # Events are reported at the end of the frame that produced them
+            events.append((event, (i + 1) * frame_s))
+    elapsed = time.perf_counter() - start
+    audio_s = len(frames) * frame_s
+
+    print(f"Audio: {audio_s:.2f}s in {len(frames)} frames of {args.frame_bytes} bytes")
+    print(f"- VAD CPU: {elapsed / len(frames) * 1e6:.1f} us/frame, realtime factor {audio_s / elapsed:.0f}x")
+    for event, at in events:
+        print(f"  {at:7.3f}s  {event.value}")
+
+    if spans:
+        starts = [at for event, at in events if event is VADEvent.SPEECH_START]
+        sustained = [at for event, at in events if event is VADEvent.SPEECH_SUSTAINED]
+        ends = [at for event, at in events if event is VADEvent.SPEECH_END]
+        legacy = legacy_onsets([f.data for f in frames], frame_s)
+        print(f"- Ground truth utterances: {len(spans)}, VAD starts: {len(starts)}, ends: {len(ends)}")
+        for label, detected in (("VAD onset", starts), ("VAD barge-in (sustained)", sustained),
+                                ("Legacy RMS onset", legacy), ("VAD end", ends)):
+            use_end = label == "VAD end"
+            delays = []
+            for span in spans:
+                ref = span[1] if use_end else span[0]
+                after = [t for t in detected if ref <= t < ref + 2.0]
+                if after:
+                    delays.append((after[0] - ref) * 1000)
+            if delays:
+                print(f"- {label} latency: mean {sum(delays) / len(delays):.0f} ms, "
+                      f"max {max(delays):.0f} ms ({len(delays)}/{len(spans)} detected)")
+            else:
+                print(f"- {label} latency: not detected")
+
+        if not args.no_transients:
+            sounds = 2 * utterances
+            print(f"- False barge-ins on {sounds} coughs/echo blips ({audio_s / 60:.1f} min of audio):")
+            for label, triggers in (("VAD barge-in (sustained)", sustained), ("VAD onset", starts),
+                                    ("Legacy RMS rule", legacy)):
+                false = false_triggers(triggers, spans)
+                print(f"    {label:25s} {len(false):2d} ({len(false) / sounds:.0%}), at "
+                      + (", ".join(f"{t:.2f}s" for t in false) or "-"))
+
+
+if __name__ == "__main__":
+    main()
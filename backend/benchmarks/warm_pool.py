@@ -0,0 +1,120 @@
+"""
+Connect-to-first-response time with and without the engine warm pool.
+
+Drives GeminiLiveEngine against the local Live API stand-in: each simulated
+client "connects", gets an engine (cold via the factory, or from EnginePool),
+starts the session, sends its first 128ms of speech and waits for the first
+audio chunk back. Clients arrive --interval-ms apart so the pool has time to
+refill between them (set it low to see the pool fall back to cold engines).
+
+Run from backend/:
+    python -m benchmarks.warm_pool [--sessions 20] [--pool-size 2]
+"""
+import io
+import os
+import time
+import asyncio
+import argparse
+import contextlib
+import statistics
+
+from audio_dsp.frame import analyze_frame
+from conversation_engines.gemini_live import GeminiLiveEngine
+from conversation_engines.pool import EnginePool
+from benchmarks.pcm_source import synthetic_conversation, split_frames
+from benchmarks.standins.live_api_server import serve_in_background
+
+
+class FirstAudioClient:
+    """
+    Minimal output handler: resolves a future on the first audio message.
+    """
+    def __init__(self):
+        self.first_audio = asyncio.get_running_loop().create_future()
+
+    async def __call__(self, message: str):
+        if '"type": "audio"' in message and not self.first_audio.done():
+            self.first_audio.set_result(time.perf_counter())
+
+
+async def run_session(acquire, frames):
+    client = FirstAudioClient()
+    start = time.perf_counter()
+    engine, warm = await acquire()
+    await engine.start_session(output_handler=client)
+    ready = time.perf_counter()
+    for frame in frames:
+        await engine.process_audio_input(frame)
+    first = await asyncio.wait_for(client.first_audio, 10)
+    await engine.end_session()
+    return (ready - start) * 1000, (first - start) * 1000, warm
+
+
+async def measure(acquire, frames, sessions, interval_s):
+    ready_ms, first_ms, warm = [], [], 0
+    for _ in range(sessions):
+        ready, first, was_warm = await run_session(acquire, frames)
+        ready_ms.append(ready)
+        first_ms.append(first)
+        warm += was_warm
+        await asyncio.sleep(interval_s)
+    return ready_ms, first_ms, warm
+
+
+def report(label, ready_ms, first_ms, warm):
+    first_sorted = sorted(first_ms)
+    p95 = first_sorted[int(0.95 * (len(first_sorted) - 1))]
+    print(f"- {label:<7} engine ready {statistics.mean(ready_ms):6.1f} ms, "
+          f"first response mean {statistics.mean(first_ms):6.1f} ms / p95 {p95:6.1f} ms "
+          f"({warm}/{len(first_ms)} warm)")
+
+
+async def main_async(args):
+    server = await serve_in_background(
+        args.port, handshake_ms=args.handshake_ms, setup_ms=args.setup_ms, response_ms=args.response_ms
+    )
+    os.environ["GEMINI_LIVE_URL"] = f"ws://127.0.0.1:{args.port}"
+    frames = [analyze_frame(f) for f in split_frames(synthetic_conversation(1)[0])[:1]]
+
+    def factory():
+        return GeminiLiveEngine(system_prompt="You are DONNA.", google_api_key="offline")
+
+    async def cold():
+        return factory(), False
+
+    print(f"Stand-in: handshake {args.handshake_ms:.0f} ms, setup {args.setup_ms:.0f} ms, "
+          f"response {args.response_ms:.0f} ms; {args.sessions} sessions {args.interval_ms:.0f} ms apart")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        cold_results = await measure(cold, frames, args.sessions, args.interval_ms / 1000)
+
+        pool = EnginePool(factory, size=args.pool_size, health_interval_s=1.0)
+        await pool.start()
+        while len(pool.idle) < args.pool_size:
+            await asyncio.sleep(0.05)
+        pooled_results = await measure(pool.acquire, frames, args.sessions, args.interval_ms / 1000)
+        stats = dict(pool.stats)
+        await pool.close()
+
+    report("cold", *cold_results)
+    report("pooled", *pooled_results)
+    print(f"  pool stats: {stats}")
+
+    server.close()
+    await server.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--interval-ms", type=float, default=500)
+    parser.add_argument("--handshake-ms", type=float, default=250)
+    parser.add_argument("--setup-ms", type=float, default=150)
+    parser.add_argument("--response-ms", type=float, default=400)
+    parser.add_argument("--port", type=int, default=8890)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
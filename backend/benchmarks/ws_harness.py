@@ -0,0 +1,195 @@
+"""
+Offline end-to-end harness: drives /ws with PCM files against mock providers.
+
+Starts serve.py with every provider replaced by a local replay of a timing
+trace, so the run needs no API keys or network and is repeatable (CI):
+
+- --engine pipeline: CONVERSATION_ENGINE=deepgram_pipeline with MOCK_PROVIDERS
+  (audio_providers/*/mock.py replaying --trace, default: the built-in trace);
+- --engine gemini_live: the Live API stand-in with server-side end of speech,
+  replaying --live-trace (a GEMINI_LIVE_RECORD_PATH recording) if given.
+
+Each of --sessions clients negotiates binary audio, streams the PCM files (or
+a synthetic conversation) in real time and records, per user utterance, the
+latency from its last speech frame to the first reply audio. Reports turn
+latency percentiles, turns completed and reply audio throughput, plus the
+server's own per-event breakdown from GET /metrics. Exits non-zero when a
+turn got no reply or p95 exceeds --max-p95-ms, so it can gate CI.
+
+Run from backend/:
+    python -m benchmarks.ws_harness [pcm/wav files...] [--engine pipeline] [--sessions 4]
+"""
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import statistics
+
+import httpx
+import websockets
+
+from audio_dsp.frame import analyze_frame
+from benchmarks.pcm_source import load_pcm, synthetic_conversation, split_frames
+from benchmarks.load_test import wait_ready
+
+FRAME_S = 4096 / 2 / 16000
+SPEECH_RMS = 500
+
+
+def input_frames(paths):
+    if paths:
+        pcm = b"".join(load_pcm(path) for path in paths)
+    else:
+        # Gaps longer than the replies, so each reply is attributable to one utterance
+        pcm, _ = synthetic_conversation(utterances=3, speech_s=1.5, gap_s=6.0)
+    return [(frame, analyze_frame(frame).stats.rms >= SPEECH_RMS) for frame in split_frames(pcm)]
+
+
+def count_utterances(frames):
+    return sum(1 for i, (_, speech) in enumerate(frames) if speech and (i == 0 or not frames[i - 1][1]))
+
+
+async def run_client(url, frames, tail_s, result):
+    async with websockets.connect(url, max_size=None) as ws:
+        # waiting: the user stopped speaking and no reply audio has arrived yet
+        state = {"last_speech_at": None, "waiting": False}
+
+        async def receive():
+            async for message in ws:
+                if isinstance(message, bytes):
+                    result["audio_bytes"] += len(message)
+                    if state["waiting"]:
+                        result["latencies"].append((time.perf_counter() - state["last_speech_at"]) * 1000)
+                        state["waiting"] = False
+                elif '"turn_complete"' in message:
+                    result["turns_completed"] += 1
+
+        receiver = asyncio.create_task(receive())
+        await ws.send(json.dumps({"type": "hello", "audio_transport": ["binary"]}))
+        start = time.perf_counter()
+        for i, (frame, is_speech) in enumerate(frames):
+            await ws.send(frame)
+            if is_speech:
+                state["last_speech_at"] = time.perf_counter()
+                state["waiting"] = False
+            elif i and frames[i - 1][1]:
+                state["waiting"] = True
+            await asyncio.sleep(max(0.0, start + (i + 1) * FRAME_S - time.perf_counter()))
+        # Let the last reply play out
+        await asyncio.sleep(tail_s)
+        receiver.cancel()
+
+
+def metrics_breakdown(text):
+    """
+    {(engine, event): mean seconds} from the donna_turn_latency_seconds histogram.
+    """
+    sums, counts = {}, {}
+    for line in text.splitlines():
+        match = re.match(r'donna_turn_latency_seconds_(sum|count)\{engine="([^"]+)",event="([^"]+)"\} (\S+)', line)
+        if match:
+            kind, engine, event, value = match.groups()
+            (sums if kind == "sum" else counts)[(engine, event)] = float(value)
+    return {key: sums[key] / counts[key] for key in sums if counts.get(key)}
+
+
+def start_processes(args):
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, GOOGLE_API_KEY="offline", LOG_LEVEL="WARNING", ENGINE_POOL_SIZE="0")
+    processes = []
+    if args.engine == "gemini_live":
+        command = [sys.executable, "-m", "benchmarks.standins.live_api_server", "--port", str(args.standin_port),
+                   "--handshake-ms", "50", "--setup-ms", "50", "--response-ms", str(args.response_ms),
+                   "--eos-ms", str(args.eos_ms), "--reply-s", str(args.reply_s)]
+        if args.live_trace:
+            command += ["--trace", os.path.abspath(args.live_trace)]
+        # barge_in.py: reply streamed in real time, talked-over replies cut off late like the Live API
+        if getattr(args, "realtime_reply", False):
+            command += ["--realtime", "--interrupt-ms", str(args.interrupt_ms)]
+        processes.append(subprocess.Popen(command, cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        env.update(CONVERSATION_ENGINE="gemini_live", GEMINI_LIVE_URL=f"ws://127.0.0.1:{args.standin_port}")
+    else:
+        env.update(CONVERSATION_ENGINE="deepgram_pipeline", MOCK_PROVIDERS="true", TTS_CACHE_MB="0")
+        if args.trace:
+            env["MOCK_TRACE"] = os.path.abspath(args.trace)
+    processes.append(subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1", "--host", "127.0.0.1", "--port", str(args.port),
+         "--log-level", "warning"],
+        cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    ))
+    return processes
+
+
+async def main_async(args):
+    frames = input_frames(args.pcm)
+    expected_turns = count_utterances(frames)
+    processes = start_processes(args)
+    try:
+        await wait_ready(args.port)
+        url = f"ws://127.0.0.1:{args.port}/ws"
+        results = [{"latencies": [], "audio_bytes": 0, "turns_completed": 0}
+                   for _ in range(args.sessions)]
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(run_client(url, frames, args.tail, result) for result in results))
+        wall = time.perf_counter() - wall_start
+        async with httpx.AsyncClient() as client:
+            metrics = (await client.get(f"http://127.0.0.1:{args.port}/metrics")).text
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=15)
+
+    latencies = [latency for result in results for latency in result["latencies"]]
+    answered = len(latencies)
+    completed = sum(result["turns_completed"] for result in results)
+    audio_s = sum(result["audio_bytes"] for result in results) / 2 / 24000
+    print(f"{args.engine}: {args.sessions} session(s) x {expected_turns} utterances, "
+          f"{len(frames) * FRAME_S:.1f} s of input each")
+    if answered < 2:
+        print(f"FAIL: only {answered} turns answered")
+        return 1
+    p50 = statistics.median(latencies)
+    p95 = statistics.quantiles(latencies, n=20)[18] if answered >= 20 else max(latencies)
+    print(f"- turn latency (last speech frame -> first reply audio): p50 {p50:.0f} ms, p95 {p95:.0f} ms, "
+          f"max {max(latencies):.0f} ms")
+    print(f"- turns answered {answered}/{expected_turns * args.sessions}, turn_complete {completed}, "
+          f"reply audio {audio_s:.1f} s ({audio_s / wall:.2f} s of audio per wall second)")
+    breakdown = metrics_breakdown(metrics)
+    if breakdown:
+        print("- server breakdown (mean from start of turn):")
+        for (engine, event), mean_s in sorted(breakdown.items(), key=lambda item: item[1]):
+            print(f"    {engine:<18} {event:<18} {mean_s * 1000:7.0f} ms")
+
+    failed = answered < expected_turns * args.sessions
+    if failed:
+        print("FAIL: some utterances got no reply")
+    if args.max_p95_ms and p95 > args.max_p95_ms:
+        print(f"FAIL: p95 {p95:.0f} ms > {args.max_p95_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pcm", nargs="*", help="16-bit mono 16kHz .pcm/.wav files, streamed back to back")
+    parser.add_argument("--engine", choices=["pipeline", "gemini_live"], default="pipeline")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--trace", help="mock provider timing trace (JSON, see audio_providers/replay_trace.py)")
+    parser.add_argument("--live-trace", help="GEMINI_LIVE_RECORD_PATH recording for the Live API stand-in")
+    parser.add_argument("--eos-ms", type=float, default=300)
+    parser.add_argument("--response-ms", type=float, default=400)
+    parser.add_argument("--reply-s", type=float, default=1.0, help="stand-in reply audio (no --live-trace)")
+    parser.add_argument("--tail", type=float, default=4, help="seconds to wait for the last reply")
+    parser.add_argument("--max-p95-ms", type=float, default=0, help="fail if p95 turn latency exceeds this")
+    parser.add_argument("--port", type=int, default=8020)
+    parser.add_argument("--standin-port", type=int, default=8894)
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
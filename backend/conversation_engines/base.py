@@ -1,5 +1,13 @@
+import json
+import base64
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List, Optional
+from audio_dsp.frame import AudioFrame
+from audio_dsp.vad import VADEvent, VoiceActivityDetector
+from telemetry.tracing import SessionTracer
+from telemetry.logs import get_logger
+
+logger = get_logger("playback")
 
 class ConversationEngine(ABC):
     """
@@ -7,6 +15,21 @@ class ConversationEngine(ABC):
     Defines the contract for handling audio/text input and generating responses.
     """
 
+    # Both engines emit 16-bit mono PCM at 24kHz (Gemini native audio, pcm_24000 TTS)
+    OUTPUT_SAMPLE_RATE = 24000
+    # ...and take 16-bit mono PCM at 16kHz; other client rates are resampled by the session
+    INPUT_SAMPLE_RATE = 16000
+
+    # Per-session local VAD; the session may run it off the event loop (audio_dsp.executor)
+    vad: Optional[VoiceActivityDetector] = None
+
+    # Per-session turn spans (telemetry.tracing); engines mark their own events
+    tracer: Optional[SessionTracer] = None
+
+    # Audio generation: bumped by every interruption (stop_audio_output). Audio
+    # produced for an older generation is dropped rather than played.
+    audio_generation: int = 0
+
     @abstractmethod
     async def start_session(self, output_handler: Any):
         """
@@ -15,10 +38,33 @@ class ConversationEngine(ABC):
         """
         pass
 
+    async def warm_up(self):
+        """
+        Optionally connect to external provider(s) before a client is attached.
+        start_session() must still work on an engine that was never warmed.
+        """
+        pass
+
+    async def is_healthy(self) -> bool:
+        """
+        Whether a warmed, idle engine can still be handed to a session.
+        """
+        return True
+
+    def leave_pool(self):
+        """
+        Called when a warmed engine is handed to a session: stop whatever kept
+        it connected while idle.
+        """
+        pass
+
     @abstractmethod
-    async def process_audio_input(self, audio_data: bytes):
+    async def process_audio_input(self, frame: AudioFrame, vad_events: Optional[List[VADEvent]] = None):
         """
         Process a chunk of raw audio input.
+        frame: The client PCM chunk, already analyzed once by the session (see audio_dsp.frame).
+        vad_events: self.vad's events for this frame when the session already ran it
+        (DSP executor); None means run self.vad here.
         """
         pass
 
@@ -35,3 +81,86 @@ class ConversationEngine(ABC):
         Clean up resources and close connections.
         """
         pass
+
+    async def send_audio_output(self, pcm: bytes, generation: Optional[int] = None):
+        """
+        Send a chunk of output audio to the client.
+        Uses the handler's negotiated transport (binary frames) when it has one,
+        otherwise the legacy base64 {"type": "audio"} JSON message.
+        generation: the audio generation the chunk was produced for (default:
+        the current one); audio of an interrupted generation is dropped.
+        """
+        if generation is None:
+            generation = self.audio_generation
+        elif generation != self.audio_generation:
+            return
+        send_audio = getattr(self.output_handler, "send_audio", None)
+        if send_audio:
+            await send_audio(pcm, self.OUTPUT_SAMPLE_RATE, generation)
+        else:
+            await self.output_handler(json.dumps({
+                "type": "audio",
+                "data": base64.b64encode(pcm).decode("utf-8"),
+                "generation": generation
+            }))
+        if self.tracer:
+            self.tracer.mark("first_audio_sent")
+
+    async def send_audio_output_base64(self, data: str, generation: Optional[int] = None):
+        """
+        Like send_audio_output, for audio that arrived base64 encoded.
+        """
+        if generation is None:
+            generation = self.audio_generation
+        elif generation != self.audio_generation:
+            return
+        send_audio_base64 = getattr(self.output_handler, "send_audio_base64", None)
+        if send_audio_base64:
+            await send_audio_base64(data, self.OUTPUT_SAMPLE_RATE, generation)
+        else:
+            await self.output_handler(json.dumps({"type": "audio", "data": data, "generation": generation}))
+        if self.tracer:
+            self.tracer.mark("first_audio_sent")
+
+    async def stop_audio_output(self):
+        """
+        Tell the client to drop queued playback (barge-in / interruption) and
+        start a new audio generation, so nothing produced for the old one plays.
+        """
+        # Bumped before any await: from here on, audio of the old generation is stale
+        self.audio_generation += 1
+        # A queued output channel also drops the audio it hasn't written yet
+        stop_audio = getattr(self.output_handler, "stop_audio", None)
+        if stop_audio:
+            await stop_audio(self.audio_generation)
+        else:
+            await self.output_handler(json.dumps({"type": "stop_audio", "generation": self.audio_generation}))
+        flow = getattr(self.output_handler, "flow", None)
+        if flow:
+            discarded_ms = flow.on_playback_stopped()
+            logger.info("Stopped with ~%.0f ms of unplayed audio discarded (%.0f ms heard so far)",
+                        discarded_ms, flow.sent_ms - discarded_ms)
+
+    def playback_pending(self) -> bool:
+        """
+        Whether the client is still playing audio, by the flow controller's
+        estimate (False without flow control).
+        """
+        flow = getattr(self.output_handler, "flow", None)
+        return bool(flow) and flow.estimated_buffer_ms() > 0
+
+    async def wait_for_playback_credit(self):
+        """
+        Pace output to the client's playback buffer (no-op without flow control).
+        """
+        flow = getattr(self.output_handler, "flow", None)
+        if flow:
+            await flow.wait_for_credit()
+
+    async def wait_for_playback_drain(self):
+        """
+        Wait until the client has played everything sent so far (no-op without flow control).
+        """
+        flow = getattr(self.output_handler, "flow", None)
+        if flow:
+            await flow.wait_until_drained()
@@ -1,28 +1,58 @@
 import asyncio
 import json
-import base64
-import re
+import time
+from typing import List
 from conversation_engines.base import ConversationEngine
+from audio_dsp.frame import AudioFrame
+from audio_dsp.vad import VoiceActivityDetector, EnergySpectralVAD, VADEvent
+from conversation_engines.speculation import SpeculativeResponse, SPECULATION_RESULTS, SPECULATION_LATENCY_SAVED
+from conversation_engines.tts_pipeline import TTSPrefetchPipeline
+from conversation_engines.sentence_chunker import SentenceChunker
+from conversation_engines.stt_dtx import UpstreamDTX
 from audio_providers.stt.deepgram import DeepgramSTTProvider
 from audio_providers.llm.gemini_llm import GeminiLLMProvider
 from audio_providers.tts.elevenlabs_tts import ElevenLabsTTSProvider
 from audio_providers.tts.kokoro_tts import KokoroTTSProvider
+from audio_providers.tts.cache import CachedTTSProvider
+from audio_providers.tts.mock import MockTTSProvider
+from audio_providers.stt.base import STTProvider
+from audio_providers.llm.base import LLMProvider, ErrorReply
+from telemetry.tracing import SessionTracer, PIPELINE_EVENTS
+from telemetry.logs import get_logger
+
+logger = get_logger("pipeline")
 
 class DeepgramPipelineEngine(ConversationEngine):
-    def __init__(self, system_prompt: str, deepgram_key: str, google_key: str, tts_config: dict):
-        self.stt = DeepgramSTTProvider(deepgram_key)
-        self.llm = GeminiLLMProvider(google_key, system_prompt)
+    def __init__(self, system_prompt: str, deepgram_key: str, google_key: str, tts_config: dict,
+                 vad: VoiceActivityDetector = None, speculation_config: dict = None,
+                 tracer: SessionTracer = None, stt: STTProvider = None, llm: LLMProvider = None,
+                 dtx_config: dict = None, chunker_config: dict = None):
+        self.system_prompt = system_prompt
+        # stt/llm may be passed in (mock providers for offline runs, see EngineFactory)
+        self.stt = stt or DeepgramSTTProvider(deepgram_key)
+        self.llm = llm or GeminiLLMProvider(google_key, system_prompt)
 
         # Initialize TTS provider based on config
-        if tts_config.get("provider") == "kokoro":
+        if tts_config.get("provider") == "mock":
+            self.tts = MockTTSProvider(tts_config.get("trace"))
+            logger.info("Using mock TTS")
+        elif tts_config.get("provider") == "kokoro":
             self.tts = KokoroTTSProvider(
                 base_url=tts_config.get("base_url", "https://kokoro.jmwalker.dev"),
-                voice=tts_config.get("voice", "af_bella")
+                voice=tts_config.get("voice", "af_bella"),
+                streaming=tts_config.get("streaming", True)
             )
-            print(f"Using Kokoro TTS: {tts_config.get('base_url')}")
+            logger.info("Using Kokoro TTS: %s", tts_config.get("base_url"))
         else:
             self.tts = ElevenLabsTTSProvider(tts_config.get("api_key"))
-            print("Using ElevenLabs TTS")
+            logger.info("Using ElevenLabs TTS")
+
+        # Repeated phrases (greetings, apologies) are served from the shared phrase cache
+        if tts_config.get("cache"):
+            self.tts = CachedTTSProvider(self.tts, tts_config["cache"])
+
+        # Sentences synthesized ahead of the one currently playing (0 = serial)
+        self.tts_lookahead = max(0, min(3, tts_config.get("lookahead", 2)))
         
         self.output_handler = None
         self.running = False
@@ -31,52 +61,113 @@ class DeepgramPipelineEngine(ConversationEngine):
         self.turn_task = None
         self.silence_timer_task = None
         self.keepalive_task = None
-        self.interruption_hits = 0
+        # Keeps a pooled engine's Deepgram stream open until a session takes it
+        self.idle_keepalive_task = None
+        self.warmed_at = None
+        # Local VAD drives barge-in and can declare end-of-turn before Deepgram does
+        self.vad = vad or EnergySpectralVAD()
+        self.local_speech_ended = False
+        self.tracer = tracer or SessionTracer("deepgram_pipeline", PIPELINE_EVENTS)
+
+        # Speculative turn start: run the LLM on a stable transcript before the turn is confirmed
+        speculation_config = speculation_config or {}
+        self.speculation_enabled = speculation_config.get("enabled", False)
+        self.speculation_stable_s = speculation_config.get("stable_ms", 300) / 1000.0
+        self.speculation = None
+        self.speculation_timer_task = None
+        self.speculation_stats = {"hits": 0, "misses": 0, "latency_saved_ms": 0.0}
+
+        # DTX: stop streaming silence to the STT once the local VAD hears none (see stt_dtx.py)
+        dtx_config = dtx_config or {}
+        self.dtx = None
+        if dtx_config.get("enabled", False):
+            self.dtx = UpstreamDTX(
+                self.stt,
+                trailing_ms=dtx_config.get("trailing_ms", 300),
+                preroll_ms=dtx_config.get("preroll_ms", 400),
+                keepalive_s=dtx_config.get("keepalive_s", 8.0)
+            )
+
+        # How streamed LLM text is cut into TTS requests (see sentence_chunker.py)
+        self.chunker_config = chunker_config or {}
+
+    async def warm_up(self):
+        """
+        Open the Deepgram connection ahead of time (pooled engines). No audio
+        flows until a session starts, so keepalives hold the stream open past
+        Deepgram's idle timeout meanwhile.
+        """
+        await self.stt.connect()
+        self.warmed_at = time.monotonic()
+        self.idle_keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def is_healthy(self) -> bool:
+        if self.idle_keepalive_task and self.idle_keepalive_task.done():
+            return False
+        return await self.stt.is_connected()
+
+    def leave_pool(self):
+        if self.idle_keepalive_task:
+            self.idle_keepalive_task.cancel()
+            self.idle_keepalive_task = None
 
     async def start_session(self, output_handler):
         self.output_handler = output_handler
         self.running = True
-        await self.stt.connect()
+        if self.warmed_at is None:
+            await self.warm_up()
+        # The client's microphone stream keeps the connection alive from here
+        self.leave_pool()
         self.orchestrator_task = asyncio.create_task(self.orchestrate())
-        print("Deepgram Pipeline Started")
-
-    async def process_audio_input(self, audio_data: bytes):
-        # Local RMS check for fast verified barge-in
-        import struct
-        import math
-        count = len(audio_data) // 2
-        if count > 0:
-            shorts = struct.unpack(f'<{count}h', audio_data)
-            sum_sq = sum(s**2 for s in shorts)
-            rms = math.sqrt(sum_sq / count)
-            
-            # If agent is speaking and we see sustained volume, interrupt
-            if self.turn_task and not self.turn_task.done() and rms > 1000:
-                self.interruption_hits += 1
-                if self.interruption_hits >= 7: # ~200ms of speech
-                    print(f"[Barge-In] Local VAD verified sustained speech (RMS: {rms:.0f}) -> Stopping playback")
-                    self.interruption_hits = 0
+        logger.info("Deepgram pipeline started")
+
+    async def process_audio_input(self, frame: AudioFrame, vad_events: List[VADEvent] = None):
+        if vad_events is None:
+            vad_events = self.vad.process(frame)
+        for event in vad_events:
+            if event is VADEvent.SPEECH_START:
+                self.local_speech_ended = False
+                self.tracer.reset_pending()
+            elif event is VADEvent.SPEECH_SUSTAINED:
+                # If agent is speaking and the user keeps talking, stop playback right away
+                if self.turn_task and not self.turn_task.done():
+                    logger.info("[Barge-In] Local VAD detected sustained speech -> Stopping playback")
                     if self.output_handler:
-                        await self.output_handler(json.dumps({"type": "stop_audio"}))
-            else:
-                self.interruption_hits = 0
+                        await self.stop_audio_output()
+            elif event is VADEvent.SPEECH_END:
+                self.local_speech_ended = True
+                self.tracer.note("speech_end")
+                await self._on_local_speech_end()
 
         # Allow audio input even during agent turn to support Deepgram's own VAD/STT
-        await self.stt.send_audio(audio_data)
+        if self.dtx:
+            await self.dtx.send(frame.data, self.vad.in_speech)
+        else:
+            await self.stt.send_audio(frame.data)
 
     async def process_text_input(self, text: str):
         await self.handle_turn(text)
 
+    async def _on_local_speech_end(self):
+        # Only commit if STT has already delivered final text; otherwise the
+        # next final transcript will be committed as soon as it arrives.
+        if not self.current_transcript:
+            return
+        logger.info("[VAD] Local end of speech -> Processing Turn")
+        if self.silence_timer_task:
+            self.silence_timer_task.cancel()
+        await self.process_turn_logic()
+
     async def _silence_timer(self, duration=1.2):
         try:
             await asyncio.sleep(duration)
-            print("\n[Pipeline] Silence timeout -> Forcing Turn")
+            logger.info("Silence timeout -> Forcing Turn")
             await self.process_turn_logic()
         except asyncio.CancelledError:
             pass
 
     async def _keepalive_loop(self):
-        """Send keepalive messages to Deepgram every 5 seconds during agent turn."""
+        """Send keepalive messages to Deepgram every 5 seconds (agent turn, or idle in the pool)."""
         try:
             while True:
                 await asyncio.sleep(5)
@@ -84,22 +175,68 @@ class DeepgramPipelineEngine(ConversationEngine):
         except asyncio.CancelledError:
             pass
 
+    def _schedule_speculation(self, text: str):
+        # Only speculate while the agent is idle: history is then guaranteed
+        # not to change before the turn is confirmed.
+        if not self.speculation_enabled or (self.turn_task and not self.turn_task.done()):
+            return
+        if self.speculation and self.speculation.matches(text):
+            return
+        if self.speculation_timer_task:
+            self.speculation_timer_task.cancel()
+        self.speculation_timer_task = asyncio.create_task(self._speculation_timer(text))
+
+    async def _speculation_timer(self, text: str):
+        try:
+            await asyncio.sleep(self.speculation_stable_s)
+        except asyncio.CancelledError:
+            return
+        # Transcript has been stable for the window: start the LLM now, hold its output
+        if self.speculation:
+            self.speculation.cancel()
+        logger.info("[Speculation] Starting LLM early for: '%s'", text)
+        self.speculation = SpeculativeResponse(self.llm, text)
+
+    def _take_speculation(self, text: str):
+        """
+        Resolve the pending speculation against the confirmed turn text.
+        Returns it on a hit (to be streamed by handle_turn), cancels it on a miss.
+        """
+        if self.speculation_timer_task:
+            self.speculation_timer_task.cancel()
+            self.speculation_timer_task = None
+        speculation, self.speculation = self.speculation, None
+        if not speculation:
+            return None
+        if speculation.matches(text):
+            speculation.commit()
+            self.speculation_stats["hits"] += 1
+            SPECULATION_RESULTS.inc("hit")
+            return speculation
+        logger.info("[Speculation] Miss: speculated '%s', confirmed '%s' -> Restarting", speculation.text, text)
+        speculation.cancel()
+        self.speculation_stats["misses"] += 1
+        SPECULATION_RESULTS.inc("miss")
+        return None
+
     async def process_turn_logic(self):
         full_text = " ".join(self.current_transcript).strip()
         self.current_transcript = []
         if full_text:
             if self.turn_task and not self.turn_task.done():
-                print(f"\n[Barge-In] Interrupting current turn for: '{full_text}'")
+                logger.info("[Barge-In] Interrupting current turn for: '%s'", full_text)
                 self.turn_task.cancel()
                 try:
                     await self.turn_task # Wait for cancellation to complete
                 except asyncio.CancelledError:
                     pass
                 if self.output_handler:
-                    await self.output_handler(json.dumps({"type": "stop_audio"}))
+                    await self.stop_audio_output()
             
-            print(f"[Pipeline] Starting turn with text: '{full_text}'")
-            self.turn_task = asyncio.create_task(self.handle_turn(full_text))
+            logger.info("Starting turn with text: '%s'", full_text)
+            self.tracer.begin_turn("turn_start")
+            speculation = self._take_speculation(full_text)
+            self.turn_task = asyncio.create_task(self.handle_turn(full_text, speculation))
         else:
             # Only log if we expected something, to avoid noise
             pass
@@ -116,18 +253,21 @@ class DeepgramPipelineEngine(ConversationEngine):
                     
                     if is_agent_active:
                          # We don't ignore it anymore, we'll use it to interrupt
-                         print(f"\n[Barge-In] User spoke during agent turn: '{text}'")
+                         logger.info("[Barge-In] User spoke during agent turn: '%s'", text)
                     
                     current_turn_text = " ".join(self.current_transcript + [text])
+                    self._schedule_speculation(current_turn_text)
 
                     if is_final:
-                        print(f"\n[STT Final] {text}")
+                        self.tracer.note("stt_final")
+                        logger.info("[STT Final] %s", text)
                         # Restart silence timer
                         if self.silence_timer_task:
                             self.silence_timer_task.cancel()
-                        self.silence_timer_task = asyncio.create_task(self._silence_timer(1.2))
+                        if not (self.local_speech_ended and not self.vad.in_speech):
+                            self.silence_timer_task = asyncio.create_task(self._silence_timer(1.2))
                     else:
-                        print(f"\r[STT Interim] {text}", end="", flush=True)
+                        logger.debug("[STT Interim] %s", text)
 
                     await self.output_handler(json.dumps({
                         "type": "transcript",
@@ -137,17 +277,21 @@ class DeepgramPipelineEngine(ConversationEngine):
 
                     if is_final:
                         self.current_transcript.append(text)
+                        # Local VAD already saw the user stop - no need to wait for the timer
+                        if self.local_speech_ended and not self.vad.in_speech:
+                            logger.info("[VAD] Final transcript after local end of speech -> Processing Turn")
+                            await self.process_turn_logic()
                 
                 elif event["type"] == "signal":
                     if event["value"] == "speech_started":
-                        print("\n[VAD] User started speaking")
+                        logger.debug("[VAD] User started speaking")
                         # We no longer interrupt on 'speech_started' to avoid jitter from noise
                         # Cancel silence timer
                         if self.silence_timer_task:
                             self.silence_timer_task.cancel()
                     
                     elif event["value"] == "utterance_end":
-                        print("\n[VAD] Deepgram UtteranceEnd -> Processing Turn")
+                        logger.info("[VAD] Deepgram UtteranceEnd -> Processing Turn")
                         # Turn transition logic remains here, but interruption is handled in process_audio_input
                         
                         # Cancel silence timer (we are handling it now)
@@ -158,10 +302,10 @@ class DeepgramPipelineEngine(ConversationEngine):
         except asyncio.CancelledError:
             pass
         except Exception as e:
-            print(f"Orchestrator Error: {e}")
+            logger.error("Orchestrator error: %s", e)
 
-    async def handle_turn(self, text: str):
-        print(f"\n[LLM] Generating response for: '{text}'")
+    async def handle_turn(self, text: str, speculation: SpeculativeResponse = None):
+        logger.debug("[LLM] Generating response for: '%s'", text)
         # Send processing state to frontend
         if self.output_handler:
             await self.output_handler(json.dumps({"type": "state", "state": "processing"}))
@@ -169,87 +313,146 @@ class DeepgramPipelineEngine(ConversationEngine):
         # Start keepalive loop to prevent Deepgram timeout during agent turn
         self.keepalive_task = asyncio.create_task(self._keepalive_loop())
         self.turn_total_bytes = 0  # Track total audio bytes for this turn
+        # A barge-in bumps the generation; whatever this turn produces after that is dropped
+        generation = self.audio_generation
+        # Sentences the client was sent: the reply as far as it got before any barge-in
+        spoken = []
+        fallback = None
+
+        async def emit(sentence, audio_generator):
+            if generation == self.audio_generation and sentence != fallback:
+                spoken.append(sentence)
+            await self.emit_sentence(sentence, audio_generator, generation=generation)
+
+        tts_pipeline = TTSPrefetchPipeline(self.tts, emit, self.tts_lookahead)
         try:
-            response_stream = self.llm.generate_response(text)
+            # The user's words are kept whatever happens to the reply
+            if speculation:
+                # Speculative result already in flight (or finished) for this exact text;
+                # its request was built before the user message is added here
+                response_stream = speculation.stream()
+                self.llm.record_user(text)
+            else:
+                response_stream = self.llm.generate_response(text)
 
-            buffer = ""
+            chunker = SentenceChunker(**self.chunker_config)
+            first_chunk = True
             async for chunk in response_stream:
-                buffer += chunk
-                sentences = re.split(r'(?<=[.!?])\s+', buffer)
-                if len(sentences) > 1:
-                    for sentence in sentences[:-1]:
-                        if sentence.strip():
-                             await self.speak_sentence(sentence)
-                    buffer = sentences[-1]
-
-            if buffer.strip():
-                await self.speak_sentence(buffer)
-
-            # Small echo buffer at end of turn
-            print(f"\n[Pipeline] Total turn audio: {self.turn_total_bytes} bytes")
-            await asyncio.sleep(0.5)
-
-            print("\n[Turn Complete]")
+                if generation != self.audio_generation:
+                    # Barged in on (local VAD): the rest of the reply would only be dropped
+                    break
+                if isinstance(chunk, ErrorReply):
+                    # Spoken on its own, after what came before it, but not kept as the reply
+                    rest = chunker.flush()
+                    if rest:
+                        await tts_pipeline.submit(rest)
+                    fallback = chunk.strip()
+                    await tts_pipeline.submit(fallback)
+                    break
+                if first_chunk:
+                    first_chunk = False
+                    self.tracer.mark("llm_first_token")
+                    if speculation:
+                        saved = speculation.latency_saved() or 0.0
+                        self.speculation_stats["latency_saved_ms"] += saved * 1000
+                        SPECULATION_LATENCY_SAVED.inc(amount=saved)
+                        stats = self.speculation_stats
+                        logger.info("[Speculation] Hit: saved %.0f ms (hits=%d misses=%d total_saved=%.0f ms)",
+                                    saved * 1000, stats["hits"], stats["misses"], stats["latency_saved_ms"])
+                for sentence in chunker.push(chunk):
+                    self.tracer.mark("first_sentence")
+                    await tts_pipeline.submit(sentence)
+
+            rest = chunker.flush()
+            if rest and generation == self.audio_generation:
+                self.tracer.mark("first_sentence")
+                await tts_pipeline.submit(rest)
+            await tts_pipeline.finish()
+
+            logger.debug("Total turn audio: %d bytes", self.turn_total_bytes)
+            if generation == self.audio_generation:
+                # Turn stays active (barge-in armed) until the client has actually played it out
+                await self.wait_for_playback_drain()
+            if generation != self.audio_generation:
+                logger.info("[Turn Interrupted]")
+                self.tracer.finish_turn("interrupted")
+                return
+
+            logger.info("[Turn Complete]")
             await self.output_handler(json.dumps({"type": "turn_complete"}))
+            self.tracer.finish_turn("complete")
 
         except asyncio.CancelledError:
-            print("\n[Turn Cancelled]")
+            logger.info("[Turn Cancelled]")
+            self.tracer.finish_turn("interrupted")
         except Exception as e:
-            print(f"\n[Turn Error] {e}")
+            logger.error("[Turn Error] %s", e)
+            self.tracer.finish_turn("error")
         finally:
+            # Stops emission and any TTS still prefetching (no-op after finish)
+            tts_pipeline.cancel()
+            if spoken:
+                self.llm.record_reply(" ".join(spoken))
+            if speculation:
+                speculation.cancel()
             # Stop keepalive loop when turn ends
             if self.keepalive_task:
                 self.keepalive_task.cancel()
                 self.keepalive_task = None
 
     async def speak_sentence(self, sentence: str):
-        print(f"\n[TTS] Synthesizing: '{sentence}'")
+        logger.debug("[TTS] Synthesizing: '%s'", sentence)
+        await self.emit_sentence(sentence, self.tts.stream_audio(sentence))
+
+    async def emit_sentence(self, sentence: str, audio_generator, generation: int = None):
+        """
+        Send a sentence's text and audio to the client. audio_generator may be a
+        live TTS stream or audio prefetched by TTSPrefetchPipeline. Nothing is
+        sent once `generation` (default: the current one) has been interrupted.
+        """
+        if generation is None:
+            generation = self.audio_generation
+        if generation != self.audio_generation:
+            return
         await self.output_handler(json.dumps({
             "type": "response_chunk",
             "content": sentence + " "
         }))
 
         try:
-            audio_generator = self.tts.stream_audio(sentence)
             chunks_sent = 0
             total_bytes = 0
             audio_buffer = bytearray()
             MIN_CHUNK_SIZE = 4096 # 4KB buffer (~0.1s) for low latency
             
             async for audio_chunk in audio_generator:
+                if generation != self.audio_generation:
+                    break
                 if audio_chunk:
+                    if not total_bytes and not audio_buffer:
+                        self.tracer.mark("tts_first_byte")
                     audio_buffer.extend(audio_chunk)
                     
                     if len(audio_buffer) >= MIN_CHUNK_SIZE:
-                        b64_data = base64.b64encode(audio_buffer).decode("utf-8")
-                        await self.output_handler(json.dumps({
-                            "type": "audio",
-                            "data": b64_data
-                        }))
+                        # Client-driven pacing: keep ~target_buffer_ms queued, no more
+                        await self.wait_for_playback_credit()
+                        await self.send_audio_output(audio_buffer, generation)
                         chunks_sent += 1
                         total_bytes += len(audio_buffer)
                         audio_buffer = bytearray()
             
             # Send remaining buffer
             if len(audio_buffer) > 0:
-                b64_data = base64.b64encode(audio_buffer).decode("utf-8")
-                await self.output_handler(json.dumps({
-                    "type": "audio",
-                    "data": b64_data
-                }))
+                await self.wait_for_playback_credit()
+                await self.send_audio_output(audio_buffer, generation)
                 chunks_sent += 1
                 total_bytes += len(audio_buffer)
                 
-            print(f"[Pipeline] Sent {chunks_sent} chunks ({total_bytes} bytes) for sentence")
+            logger.debug("Sent %d chunks (%d bytes) for sentence", chunks_sent, total_bytes)
             self.turn_total_bytes += total_bytes
 
-            # Reintroduce a 'soft wait' (half duration) to prevent overlapping 
-            # while keeping latency low. Frontend handles exact scheduling.
-            sentence_duration = total_bytes / 48000.0
-            await asyncio.sleep(sentence_duration * 0.5)
-            
         except Exception as e:
-            print(f"[TTS Error] {e}")
+            logger.error("[TTS Error] %s", e)
 
     async def end_session(self):
         self.running = False
@@ -261,7 +464,23 @@ class DeepgramPipelineEngine(ConversationEngine):
             self.silence_timer_task.cancel()
         if self.keepalive_task:
             self.keepalive_task.cancel()
+        self.leave_pool()
+        if self.speculation_timer_task:
+            self.speculation_timer_task.cancel()
+        if self.speculation:
+            self.speculation.cancel()
         await self.stt.close()
-        print("Pipeline Session Ended")
+        await self.llm.close()
+        await self.tts.close()
+        await self.tracer.close()
+        if self.dtx:
+            stats = self.dtx.stats
+            logger.info("[DTX] %d bytes sent upstream, %d suppressed (%d pauses, %d keepalives)",
+                        stats["bytes_sent"], stats["bytes_suppressed"], stats["pauses"], stats["keepalives"])
+        if isinstance(self.tts, CachedTTSProvider):
+            cache = self.tts.cache
+            logger.info("[TTS Cache] Hit rate %.0f%%, %d bytes and %.1fs of synthesis latency saved so far",
+                        cache.hit_rate() * 100, cache.stats["bytes_saved"], cache.stats["latency_saved_s"])
+        logger.info("Pipeline session ended")
 
     
\ No newline at end of file
@@ -1,12 +1,117 @@
 import os
 from .gemini_live import GeminiLiveEngine
 from .deepgram_pipeline import DeepgramPipelineEngine
+from .realtime_input import RealtimeInputChunker
+from audio_dsp.vad import EnergySpectralVAD
+from audio_providers.tts.cache import PhraseAudioCache
+from audio_providers.replay_trace import load_trace
+from audio_providers.stt.mock import MockSTTProvider
+from audio_providers.llm.mock import MockLLMProvider
+from telemetry.tracing import SessionTracer, PIPELINE_EVENTS, GEMINI_LIVE_EVENTS
+from telemetry.logs import get_logger
+
+logger = get_logger("engine")
 
 class EngineFactory:
+    # Phrase audio cache is process-wide so every session benefits from every other's hits
+    _tts_cache = None
+    # Timing trace for MOCK_PROVIDERS, loaded once
+    _mock_trace = None
+
+    @staticmethod
+    def get_tts_cache():
+        max_mb = float(os.getenv("TTS_CACHE_MB", "32"))
+        if max_mb <= 0:
+            return None
+        if EngineFactory._tts_cache is None:
+            EngineFactory._tts_cache = PhraseAudioCache(
+                max_bytes=int(max_mb * 1024 * 1024),
+                disk_dir=os.getenv("TTS_CACHE_DIR") or None,
+                max_disk_bytes=int(float(os.getenv("TTS_CACHE_DISK_MB", "256")) * 1024 * 1024)
+            )
+        return EngineFactory._tts_cache
+
+    @staticmethod
+    def create_vad():
+        # One detector per session: it carries streaming state (noise floor, hangover)
+        return EnergySpectralVAD(
+            onset_ms=int(os.getenv("VAD_ONSET_MS", "60")),
+            # Speech needed before the agent is interrupted (shorter lets coughs and echo barge in)
+            sustain_ms=int(os.getenv("VAD_BARGE_IN_MS", "200")),
+            hangover_ms=int(os.getenv("VAD_HANGOVER_MS", "600")),
+            min_energy_db=float(os.getenv("VAD_MIN_ENERGY_DB", "54"))
+        )
+
+    @staticmethod
+    def create_input_chunker():
+        # Per session: holds the pending upstream audio and the adapted send interval
+        return RealtimeInputChunker(
+            target_interval_ms=float(os.getenv("INPUT_TARGET_INTERVAL_MS", "100")),
+            max_interval_ms=float(os.getenv("INPUT_MAX_INTERVAL_MS", "400")),
+            # Opt-in: gating on the local VAD's energy threshold would drop quiet speech
+            skip_silence=os.getenv("INPUT_SKIP_SILENCE", "false").lower() == "true"
+        )
+
+    @staticmethod
+    def get_dtx_config():
+        return {
+            "enabled": os.getenv("STT_DTX", "false").lower() == "true",
+            "trailing_ms": float(os.getenv("STT_DTX_TRAILING_MS", "300")),
+            "preroll_ms": float(os.getenv("STT_DTX_PREROLL_MS", "400"))
+        }
+
+    @staticmethod
+    def get_tts_chunker_config():
+        return {
+            "first_min_words": int(os.getenv("TTS_FIRST_CHUNK_MIN_WORDS", "4")),
+            "first_max_words": int(os.getenv("TTS_FIRST_CHUNK_MAX_WORDS", "12")),
+            "min_words": int(os.getenv("TTS_CHUNK_MIN_WORDS", "8")),
+            "max_words": int(os.getenv("TTS_CHUNK_MAX_WORDS", "40"))
+        }
+
+    @staticmethod
+    def create_tracer(engine: str, events):
+        # Turn spans always feed /metrics; TRACE_DIR additionally writes one JSON trace per session
+        return SessionTracer(engine, events, dump_dir=os.getenv("TRACE_DIR") or None)
+
+    @staticmethod
+    def get_mock_trace():
+        if EngineFactory._mock_trace is None:
+            EngineFactory._mock_trace = load_trace(os.getenv("MOCK_TRACE") or None)
+        return EngineFactory._mock_trace
+
+    @staticmethod
+    def create_mock_pipeline(system_prompt: str):
+        # Offline pipeline: STT/LLM/TTS replay a timing trace, no keys or network needed
+        trace = EngineFactory.get_mock_trace()
+        return DeepgramPipelineEngine(
+            system_prompt=system_prompt,
+            deepgram_key=None,
+            google_key=None,
+            tts_config={
+                "provider": "mock",
+                "trace": trace["tts"],
+                "lookahead": int(os.getenv("TTS_LOOKAHEAD", "2"))
+            },
+            vad=EngineFactory.create_vad(),
+            speculation_config={
+                "enabled": os.getenv("SPECULATIVE_LLM", "false").lower() == "true",
+                "stable_ms": int(os.getenv("SPECULATION_STABLE_MS", "300"))
+            },
+            tracer=EngineFactory.create_tracer("deepgram_pipeline", PIPELINE_EVENTS),
+            stt=MockSTTProvider(trace["stt"]),
+            llm=MockLLMProvider(system_prompt, trace["llm"]),
+            dtx_config=EngineFactory.get_dtx_config(),
+            chunker_config=EngineFactory.get_tts_chunker_config()
+        )
+
     @staticmethod
     def create_engine(system_prompt: str):
         engine_type = os.getenv("CONVERSATION_ENGINE", "gemini_live")
 
+        if engine_type == "deepgram_pipeline" and os.getenv("MOCK_PROVIDERS", "false").lower() == "true":
+            return EngineFactory.create_mock_pipeline(system_prompt)
+
         if engine_type == "deepgram_pipeline":
             deepgram_key = os.getenv("DEEPGRAM_API_KEY")
             google_key = os.getenv("GOOGLE_API_KEY")
@@ -17,31 +122,50 @@ class EngineFactory:
                 tts_config = {
                     "provider": "kokoro",
                     "base_url": os.getenv("KOKORO_BASE_URL", "https://kokoro.jmwalker.dev"),
-                    "voice": os.getenv("KOKORO_VOICE", "bf_emma")
+                    "voice": os.getenv("KOKORO_VOICE", "bf_emma"),
+                    "streaming": os.getenv("KOKORO_STREAMING", "true").lower() == "true",
+                    "lookahead": int(os.getenv("TTS_LOOKAHEAD", "2")),
+                    "cache": EngineFactory.get_tts_cache()
                 }
                 required_keys = [deepgram_key, google_key]
             else:
                 tts_config = {
                     "provider": "elevenlabs",
-                    "api_key": os.getenv("ELEVENLABS_API_KEY")
+                    "api_key": os.getenv("ELEVENLABS_API_KEY"),
+                    "lookahead": int(os.getenv("TTS_LOOKAHEAD", "2")),
+                    "cache": EngineFactory.get_tts_cache()
                 }
                 required_keys = [deepgram_key, google_key, tts_config["api_key"]]
 
             if not all(required_keys):
-                print("WARNING: Missing keys for Pipeline Engine. Falling back to Gemini Live.")
+                logger.warning("Missing keys for Pipeline Engine. Falling back to Gemini Live.")
                 return GeminiLiveEngine(
                     system_prompt=system_prompt,
-                    google_api_key=os.getenv("GOOGLE_API_KEY")
+                    google_api_key=os.getenv("GOOGLE_API_KEY"),
+                    vad=EngineFactory.create_vad(),
+                    tracer=EngineFactory.create_tracer("gemini_live", GEMINI_LIVE_EVENTS),
+                    input_chunker=EngineFactory.create_input_chunker()
                 )
 
             return DeepgramPipelineEngine(
                 system_prompt=system_prompt,
                 deepgram_key=deepgram_key,
                 google_key=google_key,
-                tts_config=tts_config
+                tts_config=tts_config,
+                vad=EngineFactory.create_vad(),
+                speculation_config={
+                    "enabled": os.getenv("SPECULATIVE_LLM", "false").lower() == "true",
+                    "stable_ms": int(os.getenv("SPECULATION_STABLE_MS", "300"))
+                },
+                tracer=EngineFactory.create_tracer("deepgram_pipeline", PIPELINE_EVENTS),
+                dtx_config=EngineFactory.get_dtx_config(),
+                chunker_config=EngineFactory.get_tts_chunker_config()
             )
         else:
             return GeminiLiveEngine(
                 system_prompt=system_prompt,
-                google_api_key=os.getenv("GOOGLE_API_KEY")
+                google_api_key=os.getenv("GOOGLE_API_KEY"),
+                vad=EngineFactory.create_vad(),
+                tracer=EngineFactory.create_tracer("gemini_live", GEMINI_LIVE_EVENTS),
+                input_chunker=EngineFactory.create_input_chunker()
             )
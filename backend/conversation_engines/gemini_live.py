@@ -1,49 +1,101 @@
+import os
 import json
+import time
 import asyncio
 import base64
+import logging
 import websockets
 import websockets.exceptions
-import traceback
+import websockets.protocol
+from typing import List
 from .base import ConversationEngine
+from .realtime_input import RealtimeInputChunker
+from audio_dsp.frame import AudioFrame
+from audio_dsp.vad import VoiceActivityDetector, EnergySpectralVAD, VADEvent
+from transport.output_channel import base64_decoded_size
+from telemetry.tracing import SessionTracer, GEMINI_LIVE_EVENTS
+from telemetry.logs import get_logger
+
+logger = get_logger("gemini_live")
 
 class GeminiLiveEngine(ConversationEngine):
     MIN_AUDIO_BUFFER_SIZE = 4096  # 4KB buffer for lower latency (~0.15s)
     DEBUG_SAVE_AUDIO = True  # Save first 5 seconds of audio for debugging
+    # Forward model audio chunks that are already >= MIN_AUDIO_BUFFER_SIZE without decoding/re-encoding
+    PASSTHROUGH_AUDIO = True
+    LIVE_API_URL = "wss://generativelanguage.googleapis.com/ws/google.ai.generativelanguage.v1beta.GenerativeService.BidiGenerateContent"
+    SETUP_TIMEOUT_S = 10.0
+    # Skip a pump round while this much is already queued on the upstream socket
+    INPUT_WRITE_HIGH_WATER = 64 * 1024
 
-    def __init__(self, system_prompt: str, google_api_key: str):
+    def __init__(self, system_prompt: str, google_api_key: str, vad: VoiceActivityDetector = None,
+                 tracer: SessionTracer = None, input_chunker: RealtimeInputChunker = None):
         self.system_prompt = system_prompt
         self.google_api_key = google_api_key
+        # GEMINI_LIVE_URL points at a local stand-in (benchmarks/standins/live_api_server.py)
+        self.live_api_url = os.getenv("GEMINI_LIVE_URL") or self.LIVE_API_URL
         self.google_ws = None
         self.running = False
         self.is_responding = False
+        # Set by a local barge-in while Google is still streaming the reply: the rest of
+        # that model turn is dropped until Google ends it (interrupted / turnComplete)
+        self.dropping_turn = False
         self.output_handler = None
         self.audio_buffer = bytearray()
-        self.input_audio_buffer = bytearray()
+        # Paces microphone audio upstream (see realtime_input.py); one send in flight at a time
+        self.input_chunker = input_chunker or RealtimeInputChunker()
+        self.input_send_task = None
         self.debug_audio_buffer = bytearray()
         self.debug_audio_saved = False
-        self.interruption_hits = 0
+        # Optional JSONL recording of raw Live API messages (for benchmarks/gemini_replay.py);
+        # read here rather than at import, which happens before main loads .env
+        self.record_path = os.getenv("GEMINI_LIVE_RECORD_PATH") or None
+        self.record_file = None
+        self.warmed_at = None
+        # Local VAD for barge-in; turn detection itself stays with Google's automaticActivityDetection
+        self.vad = vad or EnergySpectralVAD()
+        # Turn spans from local end of speech; Google's turn boundary itself isn't visible here
+        self.tracer = tracer or SessionTracer("gemini_live", GEMINI_LIVE_EVENTS)
 
-    async def start_session(self, output_handler):
-        self.output_handler = output_handler
-        url = f"wss://generativelanguage.googleapis.com/ws/google.ai.generativelanguage.v1beta.GenerativeService.BidiGenerateContent?key={self.google_api_key}"
+    async def warm_up(self):
+        """
+        Connect and complete the setup handshake before any client is attached,
+        so a pooled engine is ready the moment a session takes it.
+        """
+        url = f"{self.live_api_url}?key={self.google_api_key}"
         try:
             self.google_ws = await websockets.connect(url)
-            print("Connected to Google Live API")
+            logger.info("Connected to Google Live API")
             await self.send_setup()
-            self.running = True
-            
-            # Start the background task to listen to Google
-            asyncio.create_task(self.handle_google_messages())
-            
+            # Wait for setupComplete so the connection is known-good before audio flows
+            reply = json.loads(await asyncio.wait_for(self.google_ws.recv(), self.SETUP_TIMEOUT_S))
+            if "setupComplete" not in reply:
+                raise RuntimeError(f"Unexpected setup reply: {str(reply)[:200]}")
+            logger.debug("Setup complete")
+            self.warmed_at = time.monotonic()
+
         except websockets.exceptions.InvalidStatusCode as e:
-            print(f"Google Connection Failed: Status {e.status_code}")
-            print(f"Headers: {e.headers}")
+            logger.error("Google connection failed: status %s, headers %s", e.status_code, e.headers)
             raise e
         except Exception as e:
-            print(f"Google Connection Error: {e}")
-            traceback.print_exc()
+            logger.exception("Google connection error: %s", e)
             raise e
 
+    async def is_healthy(self) -> bool:
+        return (
+            self.google_ws is not None
+            and self.google_ws.state == websockets.protocol.State.OPEN
+        )
+
+    async def start_session(self, output_handler):
+        self.output_handler = output_handler
+        if self.warmed_at is None:
+            await self.warm_up()
+        self.running = True
+
+        # Start the background task to listen to Google
+        asyncio.create_task(self.handle_google_messages())
+
     async def send_setup(self):
         setup_msg = {
             "setup": {
@@ -69,96 +121,120 @@ class GeminiLiveEngine(ConversationEngine):
         }
         await self.google_ws.send(json.dumps(setup_msg))
 
-    async def process_audio_input(self, audio_data: bytes):
+    async def process_audio_input(self, frame: AudioFrame, vad_events: List[VADEvent] = None):
         if not self.running or not self.google_ws:
             return
 
         # ALLOW INPUT EVEN IF MODEL IS RESPONDING (Enable Barge-In)
         # Gemini handles interruption natively if setup with automaticActivityDetection
 
-        # Buffer audio to send larger chunks (Gemini may need bigger chunks)
-        self.input_audio_buffer.extend(audio_data)
+        # MANUAL BARGE-IN: Interrupt as soon as the local VAD hears sustained speech while responding,
+        # or while the client is still playing a reply Gemini already finished sending
+        if vad_events is None:
+            vad_events = self.vad.process(frame)
+        for event in vad_events:
+            if event is VADEvent.SPEECH_END:
+                self.tracer.note("speech_end")
+            elif event is VADEvent.SPEECH_START:
+                self.tracer.reset_pending()
+            if event is VADEvent.SPEECH_SUSTAINED and (self.is_responding or self.playback_pending()):
+                logger.info("[Barge-In] Local VAD detected sustained speech -> Interrupting")
+                self.tracer.finish_turn("interrupted")
+                if self.is_responding:
+                    self.dropping_turn = True
+                self.is_responding = False
+                self.audio_buffer = bytearray()
+                # Send stop to frontend (only queued, so it doesn't hold up the input path)
+                await self.stop_audio_output()
 
-        # Send in 1024 byte chunks as per Google docs
-        if len(self.input_audio_buffer) < 1024:
+        self.input_chunker.push(frame.data, self.vad.in_speech)
+        if VADEvent.SPEECH_END in vad_events:
+            self.input_chunker.flush()
+        self._pump_input()
+
+    def _pump_input(self):
+        """
+        Start sending the next due realtimeInput message unless a send is still
+        in flight or the socket is backed up; the audio then stays in the
+        chunker and goes out coalesced with what follows.
+        """
+        if self.input_send_task is not None:
+            self.input_chunker.on_coalesced()
+            return
+        transport = getattr(self.google_ws, "transport", None)
+        if transport is not None and transport.get_write_buffer_size() > self.INPUT_WRITE_HIGH_WATER:
+            self.input_chunker.on_coalesced()
             return
+        message = self.input_chunker.next_message()
+        if message is not None:
+            self.input_send_task = asyncio.create_task(self._send_input(message))
 
-        audio_to_send = bytes(self.input_audio_buffer)
-        self.input_audio_buffer = bytearray()
-
-        # DEBUG: Log audio chunk info
-        import struct
-        num_samples = len(audio_to_send) // 2
-        if num_samples > 0:
-            samples = struct.unpack(f'<{num_samples}h', audio_to_send)
-            rms = (sum(s*s for s in samples) / num_samples) ** 0.5
-            # print(f"[Gemini Input] {len(audio_to_send)} bytes, {num_samples} samples, RMS: {rms:.0f}")
-
-            # MANUAL BARGE-IN: If volume is high enough while responding, interrupt
-            # Require 7 consecutive hits (approx 220ms of audio) above threshold to filter noise
-            if self.is_responding and rms > 1000: 
-                self.interruption_hits += 1
-                if self.interruption_hits >= 7:
-                    print(f"[Barge-In] Local VAD verified sustained speech (RMS: {rms:.0f}) -> Interrupting")
-                    self.is_responding = False
-                    self.interruption_hits = 0
-                    self.audio_buffer = bytearray()
-                    # Send stop to frontend
-                    asyncio.create_task(self.output_handler(json.dumps({"type": "stop_audio"})))
-            else:
-                self.interruption_hits = 0
-
-        b64_audio = base64.b64encode(audio_to_send).decode("utf-8")
-        
-        realtime_input = {
-            "realtimeInput": {
-                "mediaChunks": [{
-                    "mimeType": "audio/pcm;rate=16000",
-                    "data": b64_audio
-                }]
-            }
-        }
+    async def _send_input(self, message: str):
+        start = time.perf_counter()
         try:
-            await self.google_ws.send(json.dumps(realtime_input))
+            await self.google_ws.send(message)
         except Exception as e:
-            print(f"Error sending audio to Google: {e}")
+            logger.error("Error sending audio to Google: %s", e)
+            return
+        finally:
+            self.input_send_task = None
+        self.input_chunker.on_sent(time.perf_counter() - start)
+        # Audio that arrived during the send may already be due
+        if self.running:
+            self._pump_input()
 
     async def process_text_input(self, text: str):
         pass
 
     async def handle_google_messages(self):
         try:
+            if self.record_path:
+                self.record_file = open(self.record_path, "a")
+                record_start = time.monotonic()
+
             async for raw_msg in self.google_ws:
                 if not self.running:
                     break
-                
-                # print(f"DEBUG: Received from Google: {len(raw_msg)} bytes")
+
+                if self.record_file:
+                    raw_text = raw_msg.decode("utf-8") if isinstance(raw_msg, bytes) else raw_msg
+                    self.record_file.write(json.dumps({"t": time.monotonic() - record_start, "msg": raw_text}) + "\n")
+
                 response = json.loads(raw_msg)
-                
-                # Log ALL responses for debugging
-                print(f"[Gemini Response] {json.dumps(response)[:500]}")
+
+                # Log responses for debugging - level-gated so nothing is formatted on the hot path
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[Gemini Response] %s", raw_msg[:500])
 
                 if response.get("setupComplete"):
-                    print("DEBUG: Setup Complete")
+                    logger.debug("Setup complete")
                 
                 # Handle Transcriptions
                 transcription = response.get("audioTranscription")
                 if transcription:
-                    print(f"[Gemini STT] User said: '{transcription.get('text')}'")
+                    logger.info("[Gemini STT] User said: '%s'", transcription.get("text"))
 
                 # Extract Audio
                 server_content = response.get("serverContent")
                 if server_content:
                     # Detect Interruption (Google native)
                     if server_content.get("interrupted"):
-                        print("DEBUG: Google sent Interrupted signal")
-                        self.is_responding = False
-                        self.audio_buffer = bytearray()
-                        await self.output_handler(json.dumps({"type": "stop_audio"}))
+                        logger.info("Google sent Interrupted signal")
+                        if self.dropping_turn:
+                            # Already cut off locally; the client has had its stop_audio
+                            self.dropping_turn = False
+                        else:
+                            self.tracer.finish_turn("interrupted")
+                            self.is_responding = False
+                            self.audio_buffer = bytearray()
+                            await self.stop_audio_output()
 
                     model_turn = server_content.get("modelTurn")
-                    if model_turn:
+                    if model_turn and self.dropping_turn:
+                        logger.debug("Dropping model turn audio after local barge-in")
+                    elif model_turn:
                         if not self.is_responding:
+                            self.tracer.begin_turn("first_response")
                             await self.output_handler(json.dumps({
                                 "type": "state",
                                 "state": "processing"
@@ -172,51 +248,66 @@ class GeminiLiveEngine(ConversationEngine):
                                 break
 
                             if "inlineData" in part:
+                                audio_b64 = part["inlineData"]["data"]
+
+                                # Fast path: nothing buffered and the chunk alone is big enough,
+                                # so forward it as received (no decode -> re-encode round trip)
+                                if (self.PASSTHROUGH_AUDIO and not self.audio_buffer
+                                        and base64_decoded_size(audio_b64) >= self.MIN_AUDIO_BUFFER_SIZE):
+                                    await self.send_audio_output_base64(audio_b64)
+                                    continue
+
                                 # Received Audio - buffer it for smooth playback
-                                raw_audio = base64.b64decode(part["inlineData"]["data"])
+                                raw_audio = base64.b64decode(audio_b64)
                                 self.audio_buffer.extend(raw_audio)
 
                                 # Send when buffer is large enough
                                 if len(self.audio_buffer) >= self.MIN_AUDIO_BUFFER_SIZE:
                                     if self.is_responding:
-                                        b64_data = base64.b64encode(self.audio_buffer).decode("utf-8")
-                                        await self.output_handler(json.dumps({
-                                            "type": "audio",
-                                            "data": b64_data
-                                        }))
+                                        await self.send_audio_output(self.audio_buffer)
                                     self.audio_buffer = bytearray()
                             elif "text" in part:
                                 # Received Text
-                                print(f"DEBUG: Received Text Part: {part['text'][:100]}...")
+                                logger.debug("Received text part: %.100s...", part["text"])
                                 await self.output_handler(json.dumps({
                                     "type": "response_chunk",
                                     "content": part["text"]
                                 }))
 
                 # Handle Turn Complete
-                if server_content and server_content.get("turnComplete"):
+                if server_content and server_content.get("turnComplete") and self.dropping_turn:
+                    # End of the reply cut off locally (already finished as interrupted)
+                    self.dropping_turn = False
+                    self.audio_buffer = bytearray()
+                elif server_content and server_content.get("turnComplete"):
                     # Flush any remaining audio in buffer
                     if len(self.audio_buffer) > 0:
-                        b64_data = base64.b64encode(self.audio_buffer).decode("utf-8")
-                        await self.output_handler(json.dumps({
-                            "type": "audio",
-                            "data": b64_data
-                        }))
+                        await self.send_audio_output(self.audio_buffer)
                         self.audio_buffer = bytearray()
 
-                    print("DEBUG: Google sent Turn Complete -> Forwarding to Client")
+                    logger.debug("Google sent Turn Complete -> Forwarding to Client")
                     self.is_responding = False
+                    self.tracer.finish_turn("complete")
                     await self.output_handler(json.dumps({"type": "turn_complete"}))
 
         except Exception as e:
-            print(f"Google Loop Error: {e}")
+            logger.error("Google loop error: %s", e)
         finally:
-            print("DEBUG: Google Loop Exited")
+            logger.debug("Google loop exited")
             self.running = False
+            if self.record_file:
+                self.record_file.close()
+                self.record_file = None
             # We don't close the output_handler here, as it's owned by the session
 
     async def end_session(self):
         self.running = False
+        if self.input_send_task:
+            self.input_send_task.cancel()
+        stats = self.input_chunker.stats
+        logger.info("Input: %d messages, %d bytes sent, %d silent bytes skipped, %d dropped",
+                    stats["messages"], stats["bytes_sent"], stats["silence_skipped_bytes"], stats["dropped_bytes"])
         if self.google_ws:
             await self.google_ws.close()
-            print("Closed Google Live Connection")
+            logger.info("Closed Google Live connection")
+        await self.tracer.close()
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from typing import Callable, List, Optional, Tuple
+
+from .base import ConversationEngine
+from telemetry.logs import get_logger
+
+logger = get_logger("pool")
+
+
+class EnginePool:
+    """
+    Keeps `size` engines connected to their providers (ConversationEngine.warm_up)
+    so a new client gets a ready engine instead of paying the provider handshake.
+
+    - acquire() hands out the oldest healthy idle engine, or builds a cold one if
+      the pool is empty; either way a refill is scheduled in the background.
+    - Idle engines keep their own provider connections alive (e.g. Deepgram
+      keepalives) until acquire() calls leave_pool().
+    - Idle engines are health-checked every `health_interval_s` and recycled
+      (closed and replaced) once they have been idle for `max_idle_s`, before the
+      provider's own idle timeout would drop them.
+    - Engines that `is_stale` rejects (e.g. built with an outdated system prompt)
+      are replaced the same way.
+    - Engines are never returned to the pool: each session owns its engine and
+      ends it, since provider sessions carry conversation state.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], ConversationEngine],
+        size: int = 2,
+        max_idle_s: float = 240.0,
+        health_interval_s: float = 15.0,
+        warm_timeout_s: float = 15.0,
+        is_stale: Optional[Callable[[ConversationEngine], bool]] = None
+    ):
+        self.factory = factory
+        self.size = size
+        self.max_idle_s = max_idle_s
+        self.health_interval_s = health_interval_s
+        self.warm_timeout_s = warm_timeout_s
+        # e.g. built with a system prompt that has since been reloaded
+        self.is_stale = is_stale
+        self.idle: List[Tuple[float, ConversationEngine]] = []
+        self.warming = 0
+        self.running = False
+        self.maintenance_task: Optional[asyncio.Task] = None
+        self.tasks = set()
+        self.stats = {"warm": 0, "cold": 0, "recycled": 0, "unhealthy": 0, "stale": 0, "warm_failures": 0}
+
+    async def start(self):
+        self.running = True
+        self.refill()
+        self.maintenance_task = asyncio.create_task(self.maintain())
+        logger.info("Warming %d engine(s)", self.size)
+
+    async def acquire(self) -> Tuple[ConversationEngine, bool]:
+        """
+        Returns (engine, warm). A cold engine has not been connected yet;
+        its start_session() does that as usual. A warm one is health-checked
+        (e.g. its STT stream still connected) right before it is handed out.
+        """
+        while self.idle:
+            _, engine = self.idle.pop(0)
+            if await self.is_usable(engine):
+                engine.leave_pool()
+                self.stats["warm"] += 1
+                self.refill()
+                return engine, True
+            self.discard(engine)
+
+        self.stats["cold"] += 1
+        self.refill()
+        return self.factory(), False
+
+    def refill(self):
+        if not self.running:
+            return
+        while len(self.idle) + self.warming < self.size:
+            self.warming += 1
+            self.spawn(self.warm_one())
+
+    async def warm_one(self):
+        engine = self.factory()
+        try:
+            await asyncio.wait_for(engine.warm_up(), self.warm_timeout_s)
+        except Exception as e:
+            self.stats["warm_failures"] += 1
+            logger.warning("Warm-up failed: %s", e)
+            self.discard(engine)
+            # Back off so a provider outage doesn't turn into a reconnect storm;
+            # refill() runs again from maintain()
+            return
+        finally:
+            self.warming -= 1
+
+        if self.running:
+            self.idle.append((time.monotonic(), engine))
+        else:
+            self.discard(engine)
+
+    async def is_usable(self, engine: ConversationEngine) -> bool:
+        if self.is_stale and self.is_stale(engine):
+            self.stats["stale"] += 1
+            return False
+        try:
+            healthy = await engine.is_healthy()
+        except Exception:
+            healthy = False
+        if not healthy:
+            self.stats["unhealthy"] += 1
+        return healthy
+
+    async def maintain(self):
+        while self.running:
+            await asyncio.sleep(self.health_interval_s)
+            now = time.monotonic()
+            dropped = []
+            for entry in list(self.idle):
+                warmed_at, engine = entry
+                if now - warmed_at > self.max_idle_s:
+                    self.stats["recycled"] += 1
+                    dropped.append(entry)
+                elif not await self.is_usable(engine):
+                    dropped.append(entry)
+            # Sessions may have taken engines while we were checking
+            for entry in dropped:
+                if entry in self.idle:
+                    self.idle.remove(entry)
+                    self.discard(entry[1])
+            self.refill()
+
+    def discard(self, engine: ConversationEngine):
+        self.spawn(self.close_engine(engine))
+
+    async def close_engine(self, engine: ConversationEngine):
+        try:
+            await engine.end_session()
+        except Exception as e:
+            logger.warning("Error closing engine: %s", e)
+
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def close(self):
+        self.running = False
+        if self.maintenance_task:
+            self.maintenance_task.cancel()
+        idle, self.idle = self.idle, []
+        await asyncio.gather(*(self.close_engine(engine) for _, engine in idle))
+        if self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
+        logger.info("Closed: %s", self.stats)
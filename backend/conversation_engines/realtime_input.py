@@ -0,0 +1,169 @@
+import base64
+from typing import Optional
+
+SAMPLE_RATE = 16000
+BYTES_PER_MS = SAMPLE_RATE * 2 // 1000
+
+AUDIO_STREAM_END = '{"realtimeInput": {"audioStreamEnd": true}}'
+
+
+class PCMRingBuffer:
+    """
+    Fixed-capacity byte ring for outgoing PCM. Nothing is reallocated after
+    construction; when full, the oldest audio is overwritten (and counted).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.view = memoryview(bytearray(capacity))
+        self.start = 0
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        """
+        Append data; returns how many old bytes were overwritten to make room.
+        """
+        data = memoryview(data)[-self.capacity:]
+        overwritten = max(0, self.size + len(data) - self.capacity)
+        if overwritten:
+            self.discard(overwritten)
+        end = (self.start + self.size) % self.capacity
+        first = min(len(data), self.capacity - end)
+        self.view[end:end + first] = data[:first]
+        self.view[:len(data) - first] = data[first:]
+        self.size += len(data)
+        return overwritten
+
+    def discard(self, n: int):
+        n = min(n, self.size)
+        self.start = (self.start + n) % self.capacity
+        self.size -= n
+
+    def move_to(self, other: "PCMRingBuffer") -> int:
+        """
+        Append everything held here to other and empty this ring; returns other's overwritten bytes.
+        """
+        first = min(self.size, self.capacity - self.start)
+        overwritten = other.write(self.view[self.start:self.start + first])
+        overwritten += other.write(self.view[:self.size - first])
+        self.start = self.size = 0
+        return overwritten
+
+    def read_into(self, out: memoryview, n: int) -> memoryview:
+        """
+        Move the oldest n bytes into out (a preallocated scratch buffer) and return that slice.
+        """
+        n = min(n, self.size)
+        first = min(n, self.capacity - self.start)
+        out[:first] = self.view[self.start:self.start + first]
+        out[first:n] = self.view[:n - first]
+        self.discard(n)
+        return out[:n]
+
+
+class RealtimeInputChunker:
+    """
+    Decides when and how much microphone audio to send as Live API realtimeInput.
+
+    - Chunking aims for a send interval rather than a byte count: audio is sent
+      once interval_ms of it is pending. The interval starts at target_interval_ms
+      and stretches (up to max_interval_ms) when sends take long, so a slow link
+      gets fewer, larger messages instead of a growing backlog.
+    - While a send is still in flight the engine doesn't start another; audio
+      keeps accumulating here and goes out coalesced in the next message.
+    - Pending audio lives in a preallocated ring (capacity_ms); if the link
+      stalls past that, the oldest audio is dropped.
+    - With skip_silence, once the local VAD has reported no speech for
+      trailing_ms, sending pauses and audioStreamEnd is sent so the server can
+      close the turn. Only the last preroll_ms of silence is kept, and it is
+      sent ahead of the next speech so the onset isn't clipped.
+    """
+
+    def __init__(self, target_interval_ms: float = 100, max_interval_ms: float = 400,
+                 capacity_ms: float = 3000, preroll_ms: float = 300, trailing_ms: float = 200,
+                 skip_silence: bool = False, mime_type: str = f"audio/pcm;rate={SAMPLE_RATE}"):
+        self.target_interval_ms = target_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.interval_ms = target_interval_ms
+        self.trailing_ms = trailing_ms
+        self.skip_silence = skip_silence
+        self.ring = PCMRingBuffer(int(capacity_ms * BYTES_PER_MS))
+        # Silence held back while paused; only its last preroll_ms survive
+        self.preroll = PCMRingBuffer(max(2, int(preroll_ms * BYTES_PER_MS)))
+        max_chunk = int(max_interval_ms * BYTES_PER_MS)
+        self.max_chunk_bytes = max_chunk - max_chunk % 2
+        self.scratch = memoryview(bytearray(self.max_chunk_bytes))
+        self.message_prefix = '{"realtimeInput": {"mediaChunks": [{"mimeType": "' + mime_type + '", "data": "'
+        self.paused = False
+        self.silence_ms = 0.0
+        # Bytes at the head of the ring to send regardless of the interval
+        self.flush_bytes = 0
+        self.stream_end_pending = False
+        self.send_ms_avg = None
+        self.stats = {"messages": 0, "bytes_sent": 0, "silence_skipped_bytes": 0,
+                      "dropped_bytes": 0, "coalesced_frames": 0, "stream_ends": 0}
+
+    @property
+    def pending_ms(self) -> float:
+        return self.ring.size / BYTES_PER_MS
+
+    def push(self, pcm: bytes, speech: bool):
+        """
+        Queue one inbound frame; speech is the local VAD's state after it.
+        """
+        if speech:
+            if self.paused:
+                # Resume with the held-back silence so the onset isn't clipped
+                self.stats["dropped_bytes"] += self.preroll.move_to(self.ring)
+                self.paused = False
+                self.stream_end_pending = False
+            self.silence_ms = 0.0
+            self.stats["dropped_bytes"] += self.ring.write(pcm)
+            return
+        self.silence_ms += len(pcm) / BYTES_PER_MS
+        if self.paused:
+            self.stats["silence_skipped_bytes"] += self.preroll.write(pcm)
+            return
+        self.stats["dropped_bytes"] += self.ring.write(pcm)
+        if self.skip_silence and self.silence_ms >= self.trailing_ms:
+            # Send what is pending now, then tell the server the stream is paused
+            self.paused = True
+            self.flush()
+            self.stream_end_pending = True
+
+    def flush(self):
+        """
+        Send pending audio at the next opportunity regardless of the interval (end of speech).
+        """
+        self.flush_bytes = self.ring.size
+
+    def next_message(self) -> Optional[str]:
+        """
+        The next realtimeInput message to send, or None if nothing is due yet.
+        """
+        if self.ring.size and (self.flush_bytes or (not self.paused and self.pending_ms >= self.interval_ms)):
+            chunk = self.ring.read_into(self.scratch, self.max_chunk_bytes)
+            # Clamped in case the ring overwrote part of what was being flushed
+            self.flush_bytes = min(max(0, self.flush_bytes - len(chunk)), self.ring.size)
+            self.stats["messages"] += 1
+            self.stats["bytes_sent"] += len(chunk)
+            # base64 never needs JSON escaping, so the message is assembled directly
+            return self.message_prefix + base64.b64encode(chunk).decode("ascii") + '"}]}}'
+        if self.paused and self.stream_end_pending:
+            self.stream_end_pending = False
+            self.stats["stream_ends"] += 1
+            return AUDIO_STREAM_END
+        return None
+
+    def on_sent(self, send_s: float):
+        """
+        Record how long a send took and adapt the interval: keep it at least a
+        few send times long, so sending never becomes the bottleneck.
+        """
+        send_ms = send_s * 1000
+        self.send_ms_avg = send_ms if self.send_ms_avg is None else 0.8 * self.send_ms_avg + 0.2 * send_ms
+        self.interval_ms = min(self.max_interval_ms, max(self.target_interval_ms, 3 * self.send_ms_avg))
+
+    def on_coalesced(self):
+        self.stats["coalesced_frames"] += 1
+
@@ -0,0 +1,136 @@
+import re
+from typing import List, Optional
+
+# A candidate break: sentence-ending punctuation or a clause mark, optionally
+# closed by quotes/brackets, and followed by whitespace. Requiring the
+# whitespace keeps "3.5", "1,000" and "e.g.," in one piece, and leaves a
+# trailing "." undecided until the next token shows what follows it.
+BOUNDARY = re.compile(r'(?:(?P<end>[.!?…]+)|[,;:])["\'”’)\]]*(?=\s)')
+
+# Words ending in "." that don't end a sentence (lowercase, inner dots kept)
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "ft", "vs", "etc", "e.g", "i.e", "approx",
+    "no", "vol", "fig", "inc", "ltd", "co", "corp", "dept", "est", "min", "max", "a.m", "p.m", "u.s", "u.k",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+})
+
+# A word followed by whitespace: counted per pushed token for the word limits
+WORD_END = re.compile(r"\S\s")
+
+# Characters re-scanned after a failed search: a break may start before the
+# end of the text seen so far (e.g. '."' waiting for its space)
+RESCAN_CHARS = 4
+
+
+class SentenceChunker:
+    """
+    Splits streamed LLM text into chunks for TTS, as the tokens arrive.
+
+    Each push() scans only the text not seen before (plus a few characters of
+    overlap), so a response costs O(length) however it is tokenized.
+
+    - The first chunk goes out early: at the first sentence end, at a clause
+      mark (, ; :) once it has first_min_words, or at a word boundary once it
+      reaches first_max_words without either.
+    - Later chunks only break at sentence ends, and only once they have the
+      chunk's minimum size: min_words, growing by `growth` per chunk up to
+      max_words. Short sentences are merged, so later TTS requests are fewer
+      and longer while the earlier audio plays. A clause mark still breaks a
+      chunk that has reached max_words.
+    - "." after an abbreviation ("Dr.", "e.g.") or a single-letter initial is
+      not a sentence end; neither is "." inside a number.
+    """
+
+    def __init__(self, first_min_words: int = 4, first_max_words: int = 12, min_words: int = 8,
+                 growth: float = 2.0, max_words: int = 40):
+        self.first_min_words = first_min_words
+        self.first_max_words = max(first_max_words, first_min_words)
+        self.min_words = min_words
+        self.growth = growth
+        self.max_words = max(max_words, min_words)
+        self.pending = ""
+        # Next offset in pending to search for a break
+        self.scan_pos = 0
+        # Words in pending that are followed by whitespace
+        self.words = 0
+        self.chunks = 0
+
+    def push(self, text: str) -> List[str]:
+        """
+        Add streamed text; returns the chunks it completed, in order.
+        """
+        self.words += len(WORD_END.findall(self.pending[-1:] + text))
+        self.pending += text
+        out = []
+        while True:
+            match = BOUNDARY.search(self.pending, self.scan_pos)
+            if match is None:
+                self.scan_pos = max(self.scan_pos, len(self.pending) - RESCAN_CHARS)
+                break
+            end = match.end()
+            self.scan_pos = end
+            if match.group("end") == "." and self._is_abbreviation(match.start()):
+                continue
+            words = self._words_before(end)
+            if words > self._word_limit():
+                # Arrived in one piece past the limit: cut there first, then rescan the rest
+                out.append(self._cap())
+            elif self._should_break(match.group("end") is not None, words):
+                out.append(self._take(end))
+        while self.words >= self._word_limit():
+            out.append(self._cap())
+        return out
+
+    def flush(self) -> Optional[str]:
+        """
+        End of the response: whatever is left, if anything.
+        """
+        rest = self.pending.strip()
+        self.pending = ""
+        self.scan_pos = self.words = 0
+        if rest:
+            self.chunks += 1
+            return rest
+        return None
+
+    def target_words(self) -> float:
+        if self.chunks == 0:
+            return self.first_min_words
+        return min(self.max_words, self.min_words * self.growth ** (self.chunks - 1))
+
+    def _should_break(self, sentence_end: bool, words: int) -> bool:
+        if self.chunks == 0:
+            return sentence_end or words >= self.first_min_words
+        if sentence_end:
+            return words >= self.target_words()
+        return words >= self.max_words
+
+    def _word_limit(self) -> int:
+        # Hard cap without a break: first_max_words for the first chunk, twice max_words later
+        return self.first_max_words if self.chunks == 0 else 2 * self.max_words
+
+    def _cap(self) -> str:
+        limit = self._word_limit()
+        match = None
+        for match, _ in zip(WORD_END.finditer(self.pending), range(limit)):
+            pass
+        return self._take(match.start() + 1)
+
+    def _words_before(self, end: int) -> int:
+        # pending[end - 1] is the break's last mark, so the word it ends counts
+        return self.words - len(WORD_END.findall(self.pending, end - 1)) + 1
+
+    def _is_abbreviation(self, dot: int) -> bool:
+        start = max(self.pending.rfind(" ", 0, dot), self.pending.rfind("\n", 0, dot)) + 1
+        word = self.pending[start:dot].lstrip("\"'(“‘[").lower()
+        if len(word) == 1 and word.isalpha():
+            return True
+        return word in ABBREVIATIONS
+
+    def _take(self, end: int) -> str:
+        chunk = self.pending[:end].strip()
+        self.pending = self.pending[end:]
+        self.scan_pos = 0
+        self.words = len(WORD_END.findall(self.pending))
+        self.chunks += 1
+        return chunk
@@ -0,0 +1,94 @@
+import re
+import time
+import asyncio
+from audio_providers.llm.base import LLMProvider
+from telemetry.metrics import REGISTRY, Counter
+
+_NON_WORD = re.compile(r"[^\w\s']+")
+
+SPECULATION_RESULTS = REGISTRY.register(Counter(
+    "donna_speculation_results",
+    "Speculative LLM responses resolved against the confirmed turn (hit, miss)",
+    ("result",)
+))
+SPECULATION_LATENCY_SAVED = REGISTRY.register(Counter(
+    "donna_speculation_latency_saved_seconds",
+    "Time to first token saved by speculative responses that were used"
+))
+
+
+def normalize_transcript(text: str) -> str:
+    """
+    Compare transcripts by words only: smart_format punctuation/casing
+    differences between interim and final results should still match.
+    """
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+class SpeculativeResponse:
+    """
+    An LLM response started before the turn is confirmed.
+
+    The stream is drained into a buffer in the background (nothing reaches TTS)
+    and does not touch the provider's conversation history. If the confirmed
+    turn text matches, stream() replays the buffer and continues live; the
+    caller then records the exchange with llm.record_user()/record_reply().
+    """
+
+    def __init__(self, llm: LLMProvider, text: str):
+        self.llm = llm
+        self.text = text
+        self.normalized = normalize_transcript(text)
+        self.chunks = []
+        self.done = False
+        self.started_at = time.monotonic()
+        self.first_token_at = None
+        self.committed_at = None
+        self._updated = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            async for chunk in self.llm.generate_response(self.text, record_history=False):
+                if self.first_token_at is None:
+                    self.first_token_at = time.monotonic()
+                self.chunks.append(chunk)
+                self._updated.set()
+        finally:
+            self.done = True
+            self._updated.set()
+
+    def matches(self, text: str) -> bool:
+        return normalize_transcript(text) == self.normalized
+
+    def commit(self):
+        self.committed_at = time.monotonic()
+
+    def latency_saved(self):
+        """
+        Time-to-first-token saved versus starting at commit time, in seconds:
+        min(TTFT, commit - start). None until the first token has arrived.
+        """
+        if self.committed_at is None or self.first_token_at is None:
+            return None
+        ttft = self.first_token_at - self.started_at
+        return max(0.0, min(ttft, self.committed_at - self.started_at))
+
+    async def stream(self):
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                return
+            self._updated.clear()
+            await self._updated.wait()
+
+    @property
+    def response_text(self) -> str:
+        return "".join(self.chunks)
+
+    def cancel(self):
+        if not self.task.done():
+            self.task.cancel()
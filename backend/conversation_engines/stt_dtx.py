@@ -0,0 +1,62 @@
+import time
+from audio_providers.stt.base import STTProvider
+from .realtime_input import PCMRingBuffer, BYTES_PER_MS
+
+
+class UpstreamDTX:
+    """
+    Discontinuous transmission on the STT upstream, driven by the local VAD.
+
+    Frames are forwarded while the VAD reports speech and for trailing_ms of
+    silence after it, so the STT still sees the utterance end. Then
+    transmission stops: the STT is asked to finalize what it has, and while
+    suppressed a keepalive goes out whenever nothing was sent for keepalive_s
+    (Deepgram closes idle streams after 10 s). Suppressed audio goes through a
+    preroll_ms ring; when speech resumes its contents are sent first, so the
+    onset the VAD needed time to confirm isn't lost.
+    """
+
+    def __init__(self, stt: STTProvider, trailing_ms: float = 300, preroll_ms: float = 400,
+                 keepalive_s: float = 8.0):
+        self.stt = stt
+        self.trailing_ms = trailing_ms
+        self.keepalive_s = keepalive_s
+        self.preroll = PCMRingBuffer(max(2, int(preroll_ms * BYTES_PER_MS)))
+        self.scratch = memoryview(bytearray(self.preroll.capacity))
+        self.transmitting = True
+        self.silence_ms = 0.0
+        self.last_sent_at = time.monotonic()
+        self.stats = {"bytes_sent": 0, "bytes_suppressed": 0, "pauses": 0, "keepalives": 0}
+
+    async def send(self, pcm: bytes, speech: bool):
+        """
+        Forward (or hold back) one inbound frame; speech is the local VAD's state after it.
+        """
+        now = time.monotonic()
+        if speech:
+            self.silence_ms = 0.0
+            if not self.transmitting:
+                self.transmitting = True
+                if self.preroll.size:
+                    await self._forward(bytes(self.preroll.read_into(self.scratch, self.preroll.size)), now)
+        else:
+            self.silence_ms += len(pcm) / BYTES_PER_MS
+            if self.transmitting and self.silence_ms > self.trailing_ms:
+                self.transmitting = False
+                self.stats["pauses"] += 1
+                # No more audio is coming for this utterance: get its final transcript now
+                await self.stt.finalize()
+
+        if self.transmitting:
+            await self._forward(pcm, now)
+            return
+        self.stats["bytes_suppressed"] += self.preroll.write(pcm)
+        if now - self.last_sent_at >= self.keepalive_s:
+            await self.stt.send_keepalive()
+            self.last_sent_at = now
+            self.stats["keepalives"] += 1
+
+    async def _forward(self, pcm: bytes, now: float):
+        await self.stt.send_audio(pcm)
+        self.stats["bytes_sent"] += len(pcm)
+        self.last_sent_at = now
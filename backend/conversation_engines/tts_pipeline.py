@@ -0,0 +1,90 @@
+import asyncio
+from audio_providers.tts.base import TTSProvider
+from telemetry.logs import get_logger
+
+logger = get_logger("tts")
+
+
+class SentenceSynthesis:
+    """
+    TTS for one sentence, started immediately and buffered until it is played.
+    """
+
+    def __init__(self, tts: TTSProvider, sentence: str):
+        self.sentence = sentence
+        self.tts = tts
+        self.chunks = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        logger.debug("Synthesizing: '%s'", self.sentence)
+        try:
+            async for chunk in self.tts.stream_audio(self.sentence):
+                if chunk:
+                    self.chunks.put_nowait(chunk)
+        except Exception as e:
+            logger.error("TTS error: %s", e)
+        finally:
+            self.chunks.put_nowait(None)
+
+    async def audio(self):
+        while True:
+            chunk = await self.chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    def cancel(self):
+        if not self.task.done():
+            self.task.cancel()
+
+
+class TTSPrefetchPipeline:
+    """
+    Bounded producer/consumer pipeline between the sentence splitter and the client.
+
+    submit() starts synthesis right away, as long as no more than `lookahead`
+    sentences are queued behind the one currently being emitted; otherwise it
+    waits for a slot, which back-pressures the LLM loop. A single consumer task
+    emits sentences strictly in submission order through emit_sentence(sentence,
+    audio_iterator). lookahead=0 reproduces the old fully serial behaviour.
+    """
+
+    def __init__(self, tts: TTSProvider, emit_sentence, lookahead: int = 2):
+        self.tts = tts
+        self.emit_sentence = emit_sentence
+        self.lookahead = lookahead
+        self.slots = asyncio.Semaphore(lookahead + 1)
+        self.queue = asyncio.Queue()
+        self.in_flight = []
+        self.consumer_task = asyncio.create_task(self._consume())
+
+    async def submit(self, sentence: str):
+        await self.slots.acquire()
+        synthesis = SentenceSynthesis(self.tts, sentence)
+        self.in_flight.append(synthesis)
+        self.queue.put_nowait(synthesis)
+
+    async def _consume(self):
+        while True:
+            synthesis = await self.queue.get()
+            if synthesis is None:
+                return
+            try:
+                await self.emit_sentence(synthesis.sentence, synthesis.audio())
+            finally:
+                self.in_flight.remove(synthesis)
+                self.slots.release()
+
+    async def finish(self):
+        """
+        Wait until every submitted sentence has been emitted.
+        """
+        self.queue.put_nowait(None)
+        await self.consumer_task
+
+    def cancel(self):
+        self.consumer_task.cancel()
+        for synthesis in self.in_flight:
+            synthesis.cancel()
+        self.in_flight = []
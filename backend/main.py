@@ -1,36 +1,99 @@
 import os
-import struct
-import math
+import json
 import time
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from conversation_engines.factory import EngineFactory
+from conversation_engines.pool import EnginePool
+from audio_providers.clients import close_shared_clients
+from system_prompt import PromptStore
+from admission import AdmissionController
+from telemetry.metrics import REGISTRY
+from telemetry.logs import configure_logging, get_logger
+from audio_dsp.frame import analyze_frame
+from audio_dsp.executor import DSPExecutor
+from audio_dsp.resample import StreamingResampler, negotiate_rate
+from conversation_engines.base import ConversationEngine
+from transport.output_channel import OutputChannel
+from transport.codecs import CODEC_PCM16, create_decoder, negotiate_codec
 
 load_dotenv()
 
+# Log records are formatted and written to stdout on a background thread, gated per subsystem
+configure_logging()
+logger = get_logger("session")
+
 # --- Configuration ---
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 if not GOOGLE_API_KEY:
-    print("ERROR: GOOGLE_API_KEY missing in .env")
+    logger.error("GOOGLE_API_KEY missing in .env")
 
-# --- Load System Prompt ---
-def load_system_prompt():
-    try:
-        with open("../SOUL.md", "r") as f:
-            soul = f.read()
-        with open("../RULES.md", "r") as f:
-            rules = f.read()
-        return f"{soul}\n\n{rules}"
-    except Exception as e:
-        print(f"Error loading system prompt: {e}")
-        return "You are DONNA, a helpful AI assistant."
+# --- System Prompt ---
+# Hot-reloaded: edits to SOUL.md / RULES.md apply to sessions started afterwards
+PROMPTS = PromptStore(
+    ["../SOUL.md", "../RULES.md"],
+    fallback="You are DONNA, a helpful AI assistant.",
+    check_interval_s=float(os.getenv("PROMPT_RELOAD_INTERVAL_S", "2"))
+)
+PROMPTS.current()
+
+# --- Admission Control ---
+# Per worker process (serve.py runs several); 0 = unlimited
+MAX_SESSIONS_PER_WORKER = int(os.getenv("MAX_SESSIONS_PER_WORKER", "0"))
+admission = AdmissionController(MAX_SESSIONS_PER_WORKER or None)
+
+# --- DSP Executor ---
+# Frame analysis + VAD on worker threads, batched across sessions (DSP_THREADS=0 runs them inline)
+DSP_THREADS = int(os.getenv("DSP_THREADS", "1"))
+dsp_executor = None
+
+# --- Audio Codecs ---
+# Codecs offered to clients for /ws audio, in order of preference (pcm16 = uncompressed)
+AUDIO_CODECS = [c.strip() for c in os.getenv("AUDIO_CODECS", "pcm16").split(",") if c.strip()]
+OPUS_BITRATE = int(os.getenv("OPUS_BITRATE", "24000"))
+
+# --- Engine Pool ---
+# ENGINE_POOL_SIZE > 0 keeps that many engines pre-connected to their providers
+ENGINE_POOL_SIZE = int(os.getenv("ENGINE_POOL_SIZE", "0"))
+engine_pool = None
 
-SYSTEM_PROMPT = load_system_prompt()
 
-app = FastAPI()
+def create_engine():
+    return EngineFactory.create_engine(system_prompt=PROMPTS.current().text)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global engine_pool, dsp_executor
+    if DSP_THREADS > 0:
+        dsp_executor = DSPExecutor(threads=DSP_THREADS)
+    if ENGINE_POOL_SIZE > 0:
+        engine_pool = EnginePool(
+            create_engine,
+            size=ENGINE_POOL_SIZE,
+            max_idle_s=float(os.getenv("ENGINE_POOL_MAX_IDLE_S", "240")),
+            health_interval_s=float(os.getenv("ENGINE_POOL_HEALTH_INTERVAL_S", "15")),
+            is_stale=lambda engine: engine.system_prompt != PROMPTS.current().text
+        )
+        await engine_pool.start()
+    yield
+    if engine_pool:
+        await engine_pool.close()
+        engine_pool = None
+    # Provider HTTP clients are shared by all sessions and closed once, here
+    await close_shared_clients()
+    if dsp_executor:
+        dsp_executor.shutdown()
+        dsp_executor = None
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,59 +107,164 @@ app.add_middleware(
 class DonnaSession:
     def __init__(self, websocket: WebSocket):
         self.client_ws = websocket
-        # Initialize the engine via Factory
-        self.engine = EngineFactory.create_engine(
-            system_prompt=SYSTEM_PROMPT
+        # Outbound channel: JSON control messages + audio in the negotiated transport
+        self.output = OutputChannel(
+            websocket,
+            target_buffer_ms=float(os.getenv("PLAYBACK_TARGET_BUFFER_MS", "300")),
+            max_queued_ms=float(os.getenv("OUTPUT_QUEUE_MAX_MS", "5000")),
+            high_water_ms=float(os.getenv("OUTPUT_QUEUE_HIGH_WATER_MS", "2000")),
+            slow_client_timeout_s=float(os.getenv("SLOW_CLIENT_TIMEOUT_S", "10"))
         )
+        self.engine = None
+        # Set when the client streams at its native rate instead of the engines' 16 kHz
+        self.input_resampler = None
+        # Negotiated in hello, used from the client's "input_applied" on: audio
+        # sent before the client applied hello_ack is still in the defaults
+        self.pending_resampler = None
+        self.pending_decoder = None
+        # Set when the client uploads compressed audio (negotiated codec)
+        self.input_decoder = None
+
+    async def acquire_engine(self):
+        # Take a pre-connected engine from the pool if there is one, else build via Factory
+        if engine_pool:
+            return await engine_pool.acquire()
+        return create_engine(), False
 
     async def run(self):
         await self.client_ws.accept()
-        print("Client Connected.")
+        logger.info("Client connected")
 
         try:
             # Start the engine
-            await self.engine.start_session(output_handler=self.client_ws.send_text)
+            start = time.perf_counter()
+            self.engine, warm = await self.acquire_engine()
+            await self.engine.start_session(output_handler=self.output)
+            logger.info("Engine ready in %.0f ms (%s)", (time.perf_counter() - start) * 1000, "warm" if warm else "cold")
             
             # Loop to handle messages from the client (React App)
             while True:
                 message = await self.client_ws.receive()
-                
+                if message["type"] == "websocket.disconnect" or self.output.closed:
+                    # Client left, or was dropped for not keeping up with its output
+                    break
+
                 if "bytes" in message:
-                    # Audio chunk from client
-                    audio_data = message["bytes"]
-                    
-                    # --- Debugging (RMS) ---
-                    try:
-                        count = len(audio_data) // 2
-                        shorts = struct.unpack(f'<{count}h', audio_data)
-                        sum_squares = sum(s**2 for s in shorts)
-                        rms = math.sqrt(sum_squares / count)
-                        if int(time.time() * 20) % 50 == 0:
-                             print(f"DEBUG: RMS: {rms:.0f}")
-                    except Exception:
-                         pass
-                    
+                    pcm = message["bytes"]
+                    if self.input_decoder:
+                        pcm = self.input_decoder.decode(pcm)
+                    if self.input_resampler:
+                        pcm = self.input_resampler.process(pcm)
+                        if not pcm:
+                            continue
+                    # Audio chunk from client - decoded and analyzed once, shared with the engine
+                    if dsp_executor:
+                        # Analysis + VAD off the event loop, batched with other sessions' frames
+                        frame, vad_events = await dsp_executor.process(pcm, self.engine.vad)
+                    else:
+                        frame, vad_events = analyze_frame(pcm), None
+
+                    # --- Debugging (RMS) --- level check first, so nothing runs per frame at INFO
+                    if logger.isEnabledFor(logging.DEBUG) and int(time.time() * 20) % 50 == 0:
+                        logger.debug("RMS: %.0f", frame.stats.rms)
+
                     # Pass audio to engine
-                    await self.engine.process_audio_input(audio_data)
+                    await self.engine.process_audio_input(frame, vad_events)
 
                 elif "text" in message:
-                    # Pass text to engine (if applicable)
-                    # await self.engine.process_text_input(message["text"])
-                    pass
+                    await self.handle_control_message(message["text"])
 
         except WebSocketDisconnect:
-            print("Client disconnected")
+            logger.info("Client disconnected")
         except Exception as e:
-            print(f"Session Error: {e}")
+            logger.error("Session error: %s", e)
         finally:
-            await self.engine.end_session()
+            if self.engine:
+                await self.engine.end_session()
+            await self.output.close()
+
+    async def handle_control_message(self, text: str):
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(msg, dict):
+            return
+
+        if msg.get("type") == "hello":
+            # Capability negotiation; clients that never send hello keep JSON audio
+            ack = self.output.negotiate(msg)
+            ack["input_sample_rate"] = self.negotiate_input(msg)
+            ack["audio_codec"] = self.negotiate_codec(msg, ack["input_sample_rate"])
+            logger.info("Client negotiated audio transport: %s, codec %s, input %d Hz, output %s Hz",
+                        ack["audio_transport"], ack["audio_codec"], ack["input_sample_rate"],
+                        ack["output_sample_rate"] or ConversationEngine.OUTPUT_SAMPLE_RATE)
+            await self.output(json.dumps(ack))
+
+        elif msg.get("type") == "input_applied":
+            # Marks the point in the upload stream where the negotiated input format starts
+            self.input_resampler = self.pending_resampler
+            self.input_decoder = self.pending_decoder
+
+        elif msg.get("type") == "playback_status":
+            # Client playback buffer report, drives server-side pacing and the slow-client check
+            self.output.on_client_report(
+                float(msg.get("buffered_ms", 0)),
+                float(msg.get("received_ms", 0))
+            )
+
+        # Pass text to engine (if applicable)
+        # elif msg.get("type") == "text":
+        #     await self.engine.process_text_input(msg["content"])
+
+    def negotiate_input(self, hello: dict) -> int:
+        """
+        Accept the client's capture rate (hello "input_sample_rate") if supported;
+        the ack tells it which rate to send, starting after its "input_applied".
+        Old clients keep sending 16 kHz.
+        """
+        engine_rate = ConversationEngine.INPUT_SAMPLE_RATE
+        rate = negotiate_rate(hello.get("input_sample_rate"), engine_rate)
+        self.pending_resampler = StreamingResampler(rate, engine_rate) if rate != engine_rate else None
+        return rate
+
+    def negotiate_codec(self, hello: dict, input_rate: int) -> str:
+        """
+        Pick the audio codec for both directions from the client's hello
+        "audio_codecs" and AUDIO_CODECS. Output audio uses it from the ack on,
+        uploads once the client sends "input_applied". Old clients keep PCM16.
+        """
+        output_rate = self.output.output_sample_rate or ConversationEngine.OUTPUT_SAMPLE_RATE
+        codec = negotiate_codec(hello.get("audio_codecs"), AUDIO_CODECS, (input_rate, output_rate))
+        self.pending_decoder = create_decoder(codec, input_rate) if codec != CODEC_PCM16 else None
+        self.output.set_codec(codec, OPUS_BITRATE)
+        return codec
 
 
 @app.get("/")
 async def root():
     return {"message": "DONNA Brain is Online (Google Live API)"}
 
+@app.get("/capacity")
+async def capacity():
+    # The answering worker only (see serve.py); 503 while that worker is full
+    snapshot = admission.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["accepting"] else 503)
+
+@app.get("/metrics")
+async def metrics():
+    # Per-turn latency histograms of the answering worker (Prometheus text format)
+    return Response(REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    session = DonnaSession(websocket)
-    await session.run()
\ No newline at end of file
+    if not admission.try_admit():
+        await websocket.accept()
+        await websocket.close(code=1013, reason="Server at capacity, try again later")
+        logger.warning("Admission rejected session: %d/%d active", admission.active, admission.max_sessions)
+        return
+    try:
+        session = DonnaSession(websocket)
+        await session.run()
+    finally:
+        admission.release()
\ No newline at end of file
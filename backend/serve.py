@@ -0,0 +1,105 @@
+"""
+Multi-worker entry point.
+
+Each voice session lives entirely inside one worker process for the lifetime
+of its websocket (DonnaSession, engine, provider connections), so workers
+share nothing and no sticky routing is needed: the kernel hands each new
+connection to one worker and it stays there. A reconnect is a new session.
+
+On Linux/macOS every worker binds its own listening socket with SO_REUSEPORT
+and the kernel spreads accepts across them. Elsewhere this falls back to
+uvicorn's pre-fork workers sharing one socket.
+
+Run from backend/:
+    python serve.py [--workers N] [--host 0.0.0.0] [--port 8000]
+Settings come from the environment or backend/.env, like main.py.
+
+Combine with MAX_SESSIONS_PER_WORKER for per-worker admission control.
+Nothing is shared between workers: a full worker refuses a new websocket
+(1013) even when its siblings have free slots, and GET /capacity and
+GET /metrics describe only whichever worker answers. The client's retry is
+a new connection, which the kernel may hand to another worker; scrape
+/metrics per worker (or sum the series) for the whole server.
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import multiprocessing
+
+import uvicorn
+from dotenv import load_dotenv
+
+REUSEPORT_AVAILABLE = hasattr(socket, "SO_REUSEPORT")
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(host: str, port: int, log_level: str):
+    sock = bind_socket(host, port)
+    config = uvicorn.Config("main:app", log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main():
+    # Before WEB_WORKERS/HOST/PORT are read; spawned workers inherit the environment
+    load_dotenv()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if not REUSEPORT_AVAILABLE:
+        print(f"SO_REUSEPORT unavailable; starting {args.workers} uvicorn workers on a shared socket")
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+        return
+
+    print(f"Starting {args.workers} workers on {args.host}:{args.port} (SO_REUSEPORT)")
+    context = multiprocessing.get_context("spawn")
+    workers = {}
+    stopping = False
+
+    def start_worker(slot: int):
+        process = context.Process(target=run_worker, args=(args.host, args.port, args.log_level), daemon=False)
+        process.start()
+        workers[slot] = process
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(args.workers):
+        start_worker(slot)
+
+    # Supervise: replace workers that die (their sessions are lost, new ones go to the replacement)
+    while not stopping:
+        time.sleep(0.5)
+        for slot, process in list(workers.items()):
+            if not process.is_alive() and not stopping:
+                print(f"Worker {process.pid} exited with {process.exitcode}; restarting")
+                start_worker(slot)
+
+    for process in workers.values():
+        process.terminate()
+    for process in workers.values():
+        process.join(timeout=10)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import time
+import hashlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+from telemetry.logs import get_logger
+
+logger = get_logger("prompt")
+
+
+@dataclass(frozen=True)
+class PromptVersion:
+    text: str
+    version: int
+    digest: str  # sha256 of text, first 12 hex chars
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Canonical form of the prompt: the system prompt is the cacheable prefix of
+    every LLM request, so editor noise (CRLF, trailing whitespace) must not
+    produce a different byte sequence.
+    """
+    lines = text.replace("\r\n", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+class PromptStore:
+    """
+    System prompt assembled from prompt files (SOUL.md + RULES.md), hot-reloaded.
+
+    current() returns the same PromptVersion object (same text, byte for byte)
+    until one of the files changes on disk; it then reloads and bumps the
+    version. Files are stat()ed at most every `check_interval_s`. Sessions take
+    the version current when they start and keep it for their lifetime, so a
+    conversation never changes persona mid-way and its prefix stays cacheable.
+    """
+
+    def __init__(self, paths: List[str], fallback: str, check_interval_s: float = 2.0):
+        self.paths = paths
+        self.fallback = fallback
+        self.check_interval_s = check_interval_s
+        self.mtimes: Optional[tuple] = None
+        self.checked_at = 0.0
+        self.prompt: Optional[PromptVersion] = None
+
+    def current(self) -> PromptVersion:
+        now = time.monotonic()
+        if self.prompt is None or now - self.checked_at >= self.check_interval_s:
+            self.checked_at = now
+            mtimes = self._mtimes()
+            if self.prompt is None or mtimes != self.mtimes:
+                self.mtimes = mtimes
+                self._load()
+        return self.prompt
+
+    def _mtimes(self) -> tuple:
+        mtimes = []
+        for path in self.paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _load(self):
+        try:
+            parts = []
+            for path in self.paths:
+                with open(path, "r") as f:
+                    parts.append(normalize_prompt(f.read()))
+            text = "\n\n".join(parts)
+        except Exception as e:
+            logger.error("Error loading system prompt: %s", e)
+            if self.prompt is not None:
+                return  # keep serving the last good version
+            text = self.fallback
+
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        if self.prompt is not None and digest == self.prompt.digest:
+            return  # touched but unchanged
+        version = self.prompt.version + 1 if self.prompt else 1
+        self.prompt = PromptVersion(text=text, version=version, digest=digest)
+        logger.info("Loaded system prompt v%d (%s, %d chars)", version, digest, len(text))
@@ -0,0 +1,104 @@
+import os
+import sys
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+ROOT_LOGGER = "donna"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+# Argument types whose value can't change before the listener thread merges them
+IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+_listener: Optional[QueueListener] = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """
+    Logger for one subsystem (stt, llm, tts, pipeline, gemini_live, session, ...).
+    Levels can be set per subsystem with LOG_LEVELS.
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread unformatted.
+
+    The stock QueueHandler merges msg % args on the calling thread; here that
+    (and writing to stdout) happens on the listener thread, so the event loop
+    only pays for building the LogRecord. Only records whose args are all
+    immutable (str/int/float/...) are deferred: anything else, e.g. a stats
+    dict that keeps changing, is merged up front like the stock handler does.
+    When the queue is full (stdout stalled) records are dropped and counted
+    rather than blocking.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, IMMUTABLE_ARGS) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(spec: str) -> dict:
+    """
+    "stt=DEBUG,tts=WARNING" -> {"donna.stt": "DEBUG", "donna.tts": "WARNING"}
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[f"{ROOT_LOGGER}.{name.strip()}"] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: Optional[str] = None, levels: Optional[str] = None,
+                      queue_size: Optional[int] = None):
+    """
+    Route the "donna.*" loggers through a queue to a stdout writer thread.
+    Idempotent; reads LOG_LEVEL (default INFO), LOG_LEVELS and LOG_QUEUE_SIZE.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    levels = parse_levels(levels if levels is not None else os.getenv("LOG_LEVELS", ""))
+    queue_size = queue_size if queue_size is not None else int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.Queue(maxsize=queue_size)
+    _listener = QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [DeferredQueueHandler(log_queue)]
+    root.setLevel(level)
+    root.propagate = False
+    for name, subsystem_level in levels.items():
+        logging.getLogger(name).setLevel(subsystem_level)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    Flush everything still queued and stop the writer thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
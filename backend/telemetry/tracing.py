@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import asyncio
+import itertools
+from typing import Dict, List, Optional, Sequence
+
+from .metrics import REGISTRY, Counter, Histogram
+from .logs import get_logger
+
+logger = get_logger("trace")
+
+# Turn events in the order they happen, per engine
+PIPELINE_EVENTS = (
+    "speech_end",        # local VAD saw the user stop
+    "stt_final",         # last final transcript of the turn
+    "turn_start",        # turn committed, LLM request issued
+    "llm_first_token",
+    "first_sentence",    # first sentence boundary, handed to TTS
+    "tts_first_byte",
+    "first_audio_sent",  # first audio frame written to the client
+)
+GEMINI_LIVE_EVENTS = (
+    "speech_end",
+    "first_response",    # first modelTurn message from the Live API
+    "first_audio_sent",
+)
+
+TURN_LATENCY = REGISTRY.register(Histogram(
+    "donna_turn_latency_seconds",
+    "Time from the start of a turn (end of user speech when seen) to each turn event",
+    ("engine", "event")
+))
+TURN_SPAN = REGISTRY.register(Histogram(
+    "donna_turn_span_seconds",
+    "Time between consecutive turn events",
+    ("engine", "span")
+))
+TURNS = REGISTRY.register(Counter(
+    "donna_turns",
+    "Finished turns by outcome",
+    ("engine", "outcome")
+))
+
+_session_ids = itertools.count(1)
+
+
+class TurnTrace:
+    """
+    Timestamps (perf_counter) of one turn's events; the first mark of an event wins.
+    """
+
+    __slots__ = ("number", "marks", "outcome")
+
+    def __init__(self, number: int, marks: Dict[str, float]):
+        self.number = number
+        self.marks = marks
+        self.outcome = None
+
+    def mark(self, event: str):
+        if event not in self.marks:
+            self.marks[event] = time.perf_counter()
+
+
+class SessionTracer:
+    """
+    Per-session turn spans, exported as histograms on /metrics and optionally
+    dumped as JSON (one file per session in dump_dir, TRACE_DIR).
+
+    Marking only takes a timestamp; durations are computed and observed once per
+    turn in finish_turn(), off the audio path. Events seen before a turn is
+    committed (end of speech, final transcript) are held by note() and folded
+    into the next begin_turn(); a new speech onset discards them.
+    """
+
+    def __init__(self, engine: str, events: Sequence[str], dump_dir: Optional[str] = None):
+        self.engine = engine
+        self.events = tuple(events)
+        self.dump_dir = dump_dir
+        self.session_id = f"{os.getpid()}-{next(_session_ids)}"
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.turn: Optional[TurnTrace] = None
+        self.pending: Dict[str, float] = {}
+        self.turns_started = 0
+        self.finished: List[dict] = []
+
+    def note(self, event: str):
+        """
+        Record a pre-turn event; the latest occurrence wins.
+        """
+        self.pending[event] = time.perf_counter()
+
+    def reset_pending(self):
+        self.pending.clear()
+
+    def begin_turn(self, event: Optional[str] = None) -> TurnTrace:
+        if self.turn:
+            self.finish_turn("interrupted")
+        self.turns_started += 1
+        marks, self.pending = self.pending, {}
+        self.turn = TurnTrace(self.turns_started, marks)
+        if event:
+            self.turn.mark(event)
+        return self.turn
+
+    def mark(self, event: str):
+        if self.turn:
+            self.turn.mark(event)
+
+    def finish_turn(self, outcome: str = "complete"):
+        turn, self.turn = self.turn, None
+        if not turn or not turn.marks:
+            return
+        turn.outcome = outcome
+        TURNS.inc(self.engine, outcome)
+        ordered = [(event, turn.marks[event]) for event in self.events if event in turn.marks]
+        start = ordered[0][1] if ordered else min(turn.marks.values())
+        previous = None
+        for event, at in ordered:
+            TURN_LATENCY.observe(at - start, self.engine, event)
+            if previous:
+                TURN_SPAN.observe(max(0.0, at - previous[1]), self.engine, f"{previous[0]}..{event}")
+            previous = (event, at)
+        if self.dump_dir:
+            self.finished.append({
+                "turn": turn.number,
+                "outcome": outcome,
+                "started_ms": round((start - self.origin) * 1000, 3),
+                "events_ms": {event: round((at - start) * 1000, 3)
+                              for event, at in sorted(turn.marks.items(), key=lambda item: item[1])}
+            })
+
+    async def close(self):
+        """
+        Finish any open turn and write the session's trace file (if enabled).
+        """
+        if self.turn:
+            self.finish_turn("abandoned")
+        if not self.dump_dir or not self.finished:
+            return
+        trace = {
+            "session": self.session_id,
+            "engine": self.engine,
+            "started_at": self.started_at,
+            "turns": self.finished
+        }
+        path = os.path.join(self.dump_dir, f"{self.engine}-{self.session_id}-{int(self.started_at)}.json")
+        try:
+            await asyncio.to_thread(self._write, path, trace)
+            logger.info("Wrote %d turns to %s", len(self.finished), path)
+        except OSError as e:
+            logger.warning("Could not write %s: %s", path, e)
+
+    @staticmethod
+    def _write(path: str, trace: dict):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(trace, f, indent=1)
@@ -0,0 +1,53 @@
+import struct
+from dataclasses import dataclass
+
+# Binary audio frame sent over /ws when the client negotiates "binary" audio:
+#
+#   offset  size  field
+#   0       1     kind         (FRAME_KIND_AUDIO)
+#   1       1     flags        (FLAG_* bits)
+#   2       2     generation   (uint16, wraps; see below)
+#   4       4     sequence     (uint32, per connection, wraps)
+#   8       4     sample_rate  (uint32, Hz)
+#   12      ...   payload      (16-bit little-endian mono PCM, or the negotiated
+#                              codec's encoding of it, see codecs.py)
+#
+# generation is the audio generation the chunk belongs to. Each interruption
+# bumps it and the {"type": "stop_audio", "generation": N} message carries the
+# new value, so a client drops any chunk older than the last stop it saw
+# (compare mod 2^16) instead of tearing its playback down.
+#
+# Little-endian throughout. The 12-byte header keeps the payload 2-byte
+# aligned so the browser can view PCM as an Int16Array without copying.
+HEADER = struct.Struct("<BBHII")
+HEADER_SIZE = HEADER.size
+
+FRAME_KIND_AUDIO = 1
+
+FLAG_END_OF_STREAM = 0x01
+
+
+@dataclass(frozen=True)
+class AudioFrameHeader:
+    generation: int
+    sequence: int
+    sample_rate: int
+    flags: int = 0
+    kind: int = FRAME_KIND_AUDIO
+
+
+def encode_audio_frame(pcm: bytes, generation: int, sequence: int, sample_rate: int, flags: int = 0) -> bytes:
+    return HEADER.pack(FRAME_KIND_AUDIO, flags, generation & 0xFFFF, sequence & 0xFFFFFFFF, sample_rate) + pcm
+
+
+def decode_audio_frame(frame: bytes):
+    """
+    Returns (AudioFrameHeader, payload memoryview).
+    """
+    if len(frame) < HEADER_SIZE:
+        raise ValueError(f"Audio frame too short: {len(frame)} bytes")
+    kind, flags, generation, sequence, sample_rate = HEADER.unpack_from(frame)
+    if kind != FRAME_KIND_AUDIO:
+        raise ValueError(f"Unknown frame kind: {kind}")
+    header = AudioFrameHeader(generation=generation, sequence=sequence, sample_rate=sample_rate, flags=flags, kind=kind)
+    return header, memoryview(frame)[HEADER_SIZE:]
@@ -0,0 +1,175 @@
+import struct
+import numpy as np
+
+try:
+    import opuslib
+    OPUS_AVAILABLE = True
+except Exception:  # ImportError, or OSError when the binding can't find libopus
+    opuslib = None
+    OPUS_AVAILABLE = False
+
+# Audio codecs a client may negotiate for /ws (hello "audio_codecs"). The same
+# codec is used both ways: binary upload messages and the payload of downlink
+# audio (binary frame payload, or the base64 "data" of JSON audio messages).
+CODEC_PCM16 = "pcm16"  # 16-bit little-endian mono PCM, as before negotiation
+CODEC_MULAW = "mulaw"  # G.711 mu-law, 8 bits per sample
+CODEC_OPUS = "opus"    # Opus packets, each prefixed with its uint16 LE length
+
+# Opus only runs at these rates; other negotiated rates fall back to the next codec
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_PACKET_LENGTH = struct.Struct("<H")
+
+
+def available_codecs():
+    return [CODEC_PCM16, CODEC_MULAW] + ([CODEC_OPUS] if OPUS_AVAILABLE else [])
+
+
+def _mulaw_tables():
+    # G.711 mu-law with the usual bias/clip, built once for all 2^16 inputs and 2^8 codes
+    x = np.arange(-32768, 32768, dtype=np.int32)
+    sign = np.where(x < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(x), 32635) + 0x84
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    codes = (~(sign | (exponent << 4) | mantissa)) & 0xFF
+    # Indexed by the sample's bit pattern read as uint16
+    encode = np.empty(65536, dtype=np.uint8)
+    encode[x.astype(np.uint16)] = codes
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    decoded = (((u & 0x0F) << 3) + 0x84 << ((u >> 4) & 0x07)) - 0x84
+    decode = np.where(u & 0x80, -decoded, decoded).astype("<i2")
+    return encode, decode
+
+
+MULAW_ENCODE, MULAW_DECODE = _mulaw_tables()
+
+
+class PCM16Codec:
+    """
+    No-op codec: the payload is the PCM itself.
+    """
+
+    def encode(self, pcm: bytes) -> bytes:
+        return pcm
+
+    def decode(self, data: bytes) -> bytes:
+        return data
+
+    def reset(self):
+        pass
+
+
+class MuLawCodec:
+    """
+    G.711 mu-law by table lookup: half the bytes of PCM16, no state and no delay.
+    """
+
+    def __init__(self):
+        # Odd trailing byte of the last block (stream chunks may split a sample)
+        self.carry = b""
+
+    def encode(self, pcm: bytes) -> bytes:
+        if self.carry:
+            pcm = self.carry + pcm
+        usable = len(pcm) - len(pcm) % 2
+        self.carry = pcm[usable:]
+        return MULAW_ENCODE[np.frombuffer(pcm, dtype="<u2", count=usable // 2)].tobytes()
+
+    def decode(self, data: bytes) -> bytes:
+        return MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+    def reset(self):
+        self.carry = b""
+
+
+class OpusEncoder:
+    """
+    Streaming Opus encoder (libopus via opuslib) for one rate.
+
+    Each block is encoded right away as 20 ms packets, with the remainder in
+    10/5/2.5 ms packets, so nothing waits for the next block except less than
+    2.5 ms of samples. Output is the packets, each prefixed with its length.
+    """
+
+    def __init__(self, sample_rate: int, bitrate: int = 24000):
+        self.encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self.encoder.bitrate = bitrate
+        self.frame_sizes = [sample_rate // 50, sample_rate // 100, sample_rate // 200, sample_rate // 400]
+        self.pending = b""
+
+    def encode(self, pcm: bytes) -> bytes:
+        if self.pending:
+            pcm = self.pending + pcm
+        out = bytearray()
+        offset = 0
+        samples = len(pcm) // 2
+        for size in self.frame_sizes:
+            while samples - offset >= size:
+                packet = self.encoder.encode(pcm[offset * 2:(offset + size) * 2], size)
+                out += OPUS_PACKET_LENGTH.pack(len(packet))
+                out += packet
+                offset += size
+        self.pending = pcm[offset * 2:]
+        return bytes(out)
+
+    def reset(self):
+        self.pending = b""
+        self.encoder.reset_state()
+
+
+class OpusDecoder:
+    """
+    Decoder for OpusEncoder's length-prefixed packet stream, at one rate.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.decoder = opuslib.Decoder(sample_rate, 1)
+        # Largest packet Opus produces: 120 ms
+        self.max_frame_size = sample_rate * 120 // 1000
+
+    def decode(self, data: bytes) -> bytes:
+        out = bytearray()
+        offset = 0
+        while offset + OPUS_PACKET_LENGTH.size <= len(data):
+            (length,) = OPUS_PACKET_LENGTH.unpack_from(data, offset)
+            offset += OPUS_PACKET_LENGTH.size
+            out += self.decoder.decode(bytes(data[offset:offset + length]), self.max_frame_size)
+            offset += length
+        return bytes(out)
+
+    def reset(self):
+        self.decoder.reset_state()
+
+
+def create_encoder(codec: str, sample_rate: int, opus_bitrate: int = 24000):
+    if codec == CODEC_OPUS:
+        return OpusEncoder(sample_rate, opus_bitrate)
+    if codec == CODEC_MULAW:
+        return MuLawCodec()
+    return PCM16Codec()
+
+
+def create_decoder(codec: str, sample_rate: int):
+    if codec == CODEC_OPUS:
+        return OpusDecoder(sample_rate)
+    if codec == CODEC_MULAW:
+        return MuLawCodec()
+    return PCM16Codec()
+
+
+def negotiate_codec(requested, preference, sample_rates=()) -> str:
+    """
+    The first codec in the server's preference (AUDIO_CODECS) that the client
+    listed and that can run at all of sample_rates; pcm16 otherwise.
+    """
+    if isinstance(requested, str):
+        requested = [requested]
+    if not isinstance(requested, list):
+        return CODEC_PCM16
+    for codec in preference:
+        if codec not in requested or codec not in available_codecs():
+            continue
+        if codec == CODEC_OPUS and any(rate not in OPUS_RATES for rate in sample_rates):
+            continue
+        return codec
+    return CODEC_PCM16
@@ -0,0 +1,98 @@
+import time
+import asyncio
+
+
+class PlaybackFlowController:
+    """
+    Tracks how much audio the client has queued for playback and paces output
+    to stay `target_buffer_ms` ahead of the playhead.
+
+    Counters are monotonic for the whole connection, which avoids reset races:
+      - the server counts every ms of audio it sends (sent_ms), less audio it
+        dropped before writing it (on_audio_discarded), which the client never gets;
+      - the client reports {"type": "playback_status", "buffered_ms", "received_ms"},
+        i.e. how much it still has scheduled and how much it has received in total.
+    Client buffer estimate = buffered_ms + audio still in flight (sent - received),
+    decaying in real time between reports. Clients that never report are modelled
+    purely from the clock: audio plays out in real time from when it was sent.
+    """
+
+    def __init__(self, target_buffer_ms: float = 300):
+        self.target_buffer_ms = target_buffer_ms
+        self.sent_ms = 0.0
+        # received_ms of the last client report; None until the client reports
+        self.received_ms = None
+        self._buffer_ms = 0.0
+        self._buffer_at = time.monotonic()
+        self._reported = asyncio.Event()
+
+    def estimated_buffer_ms(self) -> float:
+        elapsed_ms = (time.monotonic() - self._buffer_at) * 1000
+        return max(0.0, self._buffer_ms - elapsed_ms)
+
+    def _set_buffer(self, buffer_ms: float):
+        self._buffer_ms = max(0.0, buffer_ms)
+        self._buffer_at = time.monotonic()
+
+    def on_audio_sent(self, duration_ms: float):
+        self.sent_ms += duration_ms
+        self._set_buffer(self.estimated_buffer_ms() + duration_ms)
+
+    def on_audio_discarded(self, duration_ms: float):
+        """
+        Audio counted by on_audio_sent was dropped before it reached the client.
+        """
+        self.sent_ms -= duration_ms
+        self._set_buffer(self.estimated_buffer_ms() - duration_ms)
+
+    def on_client_report(self, buffered_ms: float, received_ms: float):
+        self.received_ms = received_ms
+        in_flight_ms = max(0.0, self.sent_ms - received_ms)
+        self._set_buffer(buffered_ms + in_flight_ms)
+        self._reported.set()
+
+    def unacknowledged_ms(self):
+        """
+        Audio sent that the client hasn't reported receiving (queued here, in
+        socket buffers or on the wire); None for clients that never report.
+        """
+        if self.received_ms is None:
+            return None
+        return max(0.0, self.sent_ms - self.received_ms)
+
+    def on_playback_stopped(self) -> float:
+        """
+        Client was told to drop its queue. Returns the unplayed ms discarded.
+        """
+        discarded = self.estimated_buffer_ms()
+        self._set_buffer(0.0)
+        return discarded
+
+    async def _wait(self, timeout_s: float):
+        self._reported.clear()
+        try:
+            await asyncio.wait_for(self._reported.wait(), timeout_s)
+        except asyncio.TimeoutError:
+            pass
+
+    async def wait_for_credit(self):
+        """
+        Wait until the client buffer is at or below the target, so the next
+        chunk keeps it topped up without racing ahead of playback.
+        """
+        while True:
+            excess_ms = self.estimated_buffer_ms() - self.target_buffer_ms
+            if excess_ms <= 0:
+                return
+            await self._wait(excess_ms / 1000)
+
+    async def wait_until_drained(self, max_wait_s: float = 30.0):
+        """
+        Wait until the client has (by our estimate) played everything sent.
+        """
+        deadline = time.monotonic() + max_wait_s
+        while True:
+            remaining_ms = self.estimated_buffer_ms()
+            if remaining_ms <= 0 or time.monotonic() >= deadline:
+                return
+            await self._wait(min(remaining_ms / 1000, deadline - time.monotonic()))
@@ -0,0 +1,416 @@
+import json
+import time
+import base64
+import asyncio
+from collections import deque
+from .audio_frames import encode_audio_frame
+from .flow_control import PlaybackFlowController
+from .codecs import CODEC_PCM16, create_encoder
+from audio_dsp.resample import StreamingResampler, negotiate_rate
+from telemetry.logs import get_logger
+from telemetry.metrics import REGISTRY, Counter, Histogram
+
+logger = get_logger("transport")
+
+AUDIO_TRANSPORT_JSON = "json"
+AUDIO_TRANSPORT_BINARY = "binary"
+
+# Control messages that describe the audio stream, so they stay in order with it
+ORDERED_MESSAGE_TYPES = ("state", "turn_complete")
+# Control messages allowed to pile up unsent before the client counts as stuck
+MAX_CONTROL_MESSAGES = 1000
+
+_TYPE_PREFIX = '{"type": "'
+
+OUTPUT_QUEUE_PEAK = REGISTRY.register(Histogram(
+    "donna_output_queue_peak_ms",
+    "Most audio queued for one client's socket at any time during a session",
+    buckets=(10, 25, 50, 100, 250, 500, 1000, 2000, 5000, 10000)
+))
+OUTPUT_AUDIO_DROPPED = REGISTRY.register(Counter(
+    "donna_output_audio_dropped_ms",
+    "Queued audio dropped before it was written to the client",
+    ("reason",)
+))
+SLOW_CLIENT_DISCONNECTS = REGISTRY.register(Counter(
+    "donna_slow_client_disconnects",
+    "Sessions closed because the client could not keep up with its output"
+))
+
+
+class SlowClientError(Exception):
+    pass
+
+
+def base64_decoded_size(data: str) -> int:
+    """
+    Size of the payload a base64 string decodes to, without decoding it.
+    """
+    return len(data) * 3 // 4 - data[-2:].count("=")
+
+
+def message_type(message: str) -> str:
+    """
+    "type" of a JSON message as json.dumps writes it (type first), without parsing it.
+    """
+    if message.startswith(_TYPE_PREFIX):
+        end = message.find('"', len(_TYPE_PREFIX))
+        if end > 0:
+            return message[len(_TYPE_PREFIX):end]
+    return ""
+
+
+class OutputChannel:
+    """
+    Outbound side of a client WebSocket.
+
+    Callable with a JSON string, so it can be passed anywhere an
+    output_handler is expected. Audio goes through send_audio, which uses the
+    transport the client negotiated: raw PCM in binary frames, or the legacy
+    base64 {"type": "audio"} JSON message for clients that never said hello.
+    If the client asked for a playback rate, audio is resampled to it here,
+    with one streaming resampler per source rate, and then encoded with the
+    negotiated codec (set_codec; PCM16 by default).
+
+    Nothing is written inline: messages are queued and a writer task (started
+    on first use) sends them, so a slow client never blocks an engine loop.
+    Control messages go out ahead of queued audio, except "state" and
+    "turn_complete", which keep their place after the audio before them.
+
+    Audio is tagged with its generation (frame header / JSON "generation").
+    stop_audio starts a new one: audio of older generations still queued, or
+    sent after the interruption, is dropped here, and the client drops any
+    that was already on its way. Audio producers wait while
+    max_queued_ms is queued; a client whose backlog (queued audio, or for
+    clients that report playback_status, audio sent but not yet received)
+    stays above high_water_ms for slow_client_timeout_s, or whose socket
+    accepts nothing for that long, is disconnected.
+    """
+
+    def __init__(self, websocket, target_buffer_ms: float = 300, max_queued_ms: float = 5000,
+                 high_water_ms: float = 2000, slow_client_timeout_s: float = 10.0):
+        self.websocket = websocket
+        self.audio_transport = AUDIO_TRANSPORT_JSON
+        self.sequence = 0
+        self.flow = PlaybackFlowController(target_buffer_ms)
+        # None: send audio at the rate the engine produced it
+        self.output_sample_rate = None
+        self.resamplers = {}
+        self.audio_codec = CODEC_PCM16
+        self.opus_bitrate = 24000
+        self.encoders = {}
+
+        self.max_queued_ms = max_queued_ms
+        self.high_water_ms = high_water_ms
+        self.slow_client_timeout_s = slow_client_timeout_s
+        self.control = deque()
+        # Audio, and the ordered control messages: (payload, audio ms, generation; 0 ms for messages)
+        self.stream = deque()
+        self.generation = 0
+        self.queued_ms = 0.0
+        self.above_high_water_since = None
+        self.closed = False
+        self.writer_task = None
+        self.ready = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.space = asyncio.Event()
+        self.space.set()
+        self.stats = {"peak_queued_ms": 0.0, "peak_control": 0, "stale_dropped_ms": 0.0, "slow_client": False}
+
+    async def __call__(self, message: str):
+        if message_type(message) in ORDERED_MESSAGE_TYPES:
+            self._push_stream(message, 0.0, self.generation)
+        else:
+            self._push_control(message)
+
+    def negotiate(self, hello: dict) -> dict:
+        """
+        Apply a client hello ({"type": "hello", "audio_transport": ["binary", "json"],
+        "output_sample_rates": [48000, 24000]}) and return the ack to send back.
+        Unknown transports fall back to JSON; without a supported output rate the
+        engine's own rate is kept (ack output_sample_rate null).
+        """
+        requested = hello.get("audio_transport", [])
+        if isinstance(requested, str):
+            requested = [requested]
+        if AUDIO_TRANSPORT_BINARY in requested:
+            self.audio_transport = AUDIO_TRANSPORT_BINARY
+        else:
+            self.audio_transport = AUDIO_TRANSPORT_JSON
+        self.output_sample_rate = negotiate_rate(hello.get("output_sample_rates"))
+        return {"type": "hello_ack", "audio_transport": self.audio_transport,
+                "output_sample_rate": self.output_sample_rate}
+
+    def resample(self, pcm: bytes, sample_rate: int):
+        """
+        (pcm, rate) as the client should receive it.
+        """
+        if not self.output_sample_rate or sample_rate == self.output_sample_rate:
+            return pcm, sample_rate
+        resampler = self.resamplers.get(sample_rate)
+        if resampler is None:
+            resampler = self.resamplers[sample_rate] = StreamingResampler(sample_rate, self.output_sample_rate)
+        return resampler.process(pcm), self.output_sample_rate
+
+    def set_codec(self, codec: str, opus_bitrate: int = 24000):
+        self.audio_codec = codec
+        self.opus_bitrate = opus_bitrate
+        self.encoders = {}
+
+    def encode(self, pcm: bytes, sample_rate: int) -> bytes:
+        if self.audio_codec == CODEC_PCM16:
+            return pcm
+        encoder = self.encoders.get(sample_rate)
+        if encoder is None:
+            encoder = self.encoders[sample_rate] = create_encoder(self.audio_codec, sample_rate, self.opus_bitrate)
+        return encoder.encode(pcm)
+
+    async def send_audio(self, pcm: bytes, sample_rate: int, generation: int = None, flags: int = 0):
+        """
+        Queue a chunk of audio produced for `generation` (default: the current
+        one); audio of an interrupted generation is dropped.
+        """
+        duration_ms = len(pcm) / 2 / sample_rate * 1000
+        if generation is None:
+            generation = self.generation
+        if not await self._wait_for_space():
+            return
+        if generation != self.generation:
+            self._drop_stale(duration_ms)
+            return
+        self.flow.on_audio_sent(duration_ms)
+        pcm, sample_rate = self.resample(pcm, sample_rate)
+        pcm = self.encode(pcm, sample_rate)
+        if not pcm:
+            # Opus holds back the last few ms until it has a whole packet
+            return
+        if self.audio_transport == AUDIO_TRANSPORT_BINARY:
+            frame = encode_audio_frame(pcm, generation, self.sequence, sample_rate, flags)
+            self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+            self._push_stream(frame, duration_ms, generation)
+        else:
+            self._push_stream(json.dumps({
+                "type": "audio",
+                "data": base64.b64encode(pcm).decode("utf-8"),
+                "generation": generation
+            }), duration_ms, generation)
+
+    async def send_audio_base64(self, data: str, sample_rate: int, generation: int = None, flags: int = 0):
+        """
+        Forward audio that is already base64 encoded (e.g. Gemini inlineData).
+        JSON PCM16 clients playing at the source rate get it as-is with no
+        decode/re-encode round trip.
+        """
+        if self.audio_transport == AUDIO_TRANSPORT_BINARY or self.audio_codec != CODEC_PCM16 or (
+                self.output_sample_rate and sample_rate != self.output_sample_rate):
+            await self.send_audio(base64.b64decode(data), sample_rate, generation, flags)
+            return
+        duration_ms = base64_decoded_size(data) / 2 / sample_rate * 1000
+        if generation is None:
+            generation = self.generation
+        if not await self._wait_for_space():
+            return
+        if generation != self.generation:
+            self._drop_stale(duration_ms)
+            return
+        self.flow.on_audio_sent(duration_ms)
+        # The base64 alphabet never needs JSON escaping, so skip json.dumps
+        self._push_stream('{"type": "audio", "data": "' + data + '", "generation": ' + str(generation) + '}',
+                          duration_ms, generation)
+
+    async def stop_audio(self, generation: int = None):
+        """
+        Barge-in: start audio generation `generation` (default: the next one),
+        drop the audio still queued and tell the client to drop what it has
+        buffered. Resampler/codec history of the cut-off reply is cleared too.
+        """
+        self.generation = self.generation + 1 if generation is None else generation
+        # Anything the writer already has in hand still goes out (the client drops it by
+        # its generation); the rest is dropped here
+        dropped_ms = sum(item[1] for item in self.stream)
+        self.stream = deque(item for item in self.stream if not item[1])
+        self.queued_ms = max(0.0, self.queued_ms - dropped_ms)
+        if self.queued_ms < self.max_queued_ms:
+            self.space.set()
+        if dropped_ms:
+            self.flow.on_audio_discarded(dropped_ms)
+            self.stats["stale_dropped_ms"] += dropped_ms
+            OUTPUT_AUDIO_DROPPED.inc("interrupted", amount=dropped_ms)
+            logger.debug("Dropped %.0f ms of queued audio on interruption", dropped_ms)
+        for resampler in self.resamplers.values():
+            resampler.reset()
+        for encoder in self.encoders.values():
+            encoder.reset()
+        self._push_control(json.dumps({"type": "stop_audio", "generation": self.generation}))
+
+    def on_client_report(self, buffered_ms: float, received_ms: float):
+        """
+        Client playback_status: feeds pacing, and catches clients falling
+        behind once their audio has left the queue for the socket buffers.
+        """
+        self.flow.on_client_report(buffered_ms, received_ms)
+        if self.closed:
+            return
+        try:
+            self._check_high_water()
+        except SlowClientError as e:
+            if self.writer_task:
+                self.writer_task.cancel()
+            asyncio.create_task(self._disconnect_slow_client(str(e)))
+
+    def backlog_ms(self) -> float:
+        unacknowledged_ms = self.flow.unacknowledged_ms()
+        if unacknowledged_ms is None:
+            return self.queued_ms
+        return max(self.queued_ms, unacknowledged_ms)
+
+    async def flush(self):
+        """
+        Wait until everything queued so far has been written (or the channel closed).
+        """
+        while not self.closed and (self.control or self.stream or not self.idle.is_set()):
+            self.idle.clear()
+            self._ensure_writer()
+            await self.idle.wait()
+
+    async def close(self):
+        """
+        Stop the writer and drop whatever is still queued (the session is over).
+        """
+        if self.writer_task and not self.writer_task.done():
+            self.writer_task.cancel()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+        self._shut("disconnected")
+
+    def _ensure_writer(self):
+        if self.writer_task is None and not self.closed:
+            self.writer_task = asyncio.create_task(self._write_loop())
+
+    def _push_control(self, message: str):
+        if self.closed:
+            return
+        self.control.append(message)
+        self.stats["peak_control"] = max(self.stats["peak_control"], len(self.control))
+        self.idle.clear()
+        self.ready.set()
+        self._ensure_writer()
+        if len(self.control) > MAX_CONTROL_MESSAGES and self.writer_task:
+            self.writer_task.cancel()
+            asyncio.create_task(self._disconnect_slow_client(f"{len(self.control)} control messages unsent"))
+
+    def _push_stream(self, payload, duration_ms: float, generation: int):
+        if self.closed:
+            return
+        self.stream.append((payload, duration_ms, generation))
+        self.queued_ms += duration_ms
+        if self.queued_ms > self.stats["peak_queued_ms"]:
+            self.stats["peak_queued_ms"] = self.queued_ms
+        if self.queued_ms >= self.max_queued_ms:
+            self.space.clear()
+        self.idle.clear()
+        self.ready.set()
+        self._ensure_writer()
+
+    def _drop_stale(self, duration_ms: float):
+        self.stats["stale_dropped_ms"] += duration_ms
+        OUTPUT_AUDIO_DROPPED.inc("stale", amount=duration_ms)
+
+    async def _wait_for_space(self) -> bool:
+        """
+        Backpressure for audio producers; False once the channel is closed.
+        """
+        while not self.closed and self.queued_ms >= self.max_queued_ms:
+            self.space.clear()
+            await self.space.wait()
+        return not self.closed
+
+    async def _write_loop(self):
+        try:
+            while True:
+                if self.control:
+                    payload, duration_ms = self.control.popleft(), 0.0
+                elif self.stream:
+                    payload, duration_ms, generation = self.stream.popleft()
+                    if duration_ms and generation != self.generation:
+                        # Interrupted after it was queued
+                        self.queued_ms = max(0.0, self.queued_ms - duration_ms)
+                        if self.queued_ms < self.max_queued_ms:
+                            self.space.set()
+                        self.flow.on_audio_discarded(duration_ms)
+                        self._drop_stale(duration_ms)
+                        continue
+                else:
+                    self.idle.set()
+                    self.ready.clear()
+                    await self.ready.wait()
+                    continue
+                try:
+                    await asyncio.wait_for(self._write(payload), self.slow_client_timeout_s)
+                except asyncio.TimeoutError:
+                    raise SlowClientError(f"socket accepted nothing for {self.slow_client_timeout_s:.0f} s")
+                if duration_ms:
+                    self.queued_ms = max(0.0, self.queued_ms - duration_ms)
+                    if self.queued_ms < self.max_queued_ms:
+                        self.space.set()
+                self._check_high_water()
+        except SlowClientError as e:
+            await self._disconnect_slow_client(str(e))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Client went away mid-write; the session's receive loop sees the disconnect
+            logger.debug("Output writer stopped: %s", e)
+            self._shut("disconnected")
+
+    async def _write(self, payload):
+        if isinstance(payload, bytes):
+            await self.websocket.send_bytes(payload)
+        else:
+            await self.websocket.send_text(payload)
+
+    def _check_high_water(self):
+        if self.backlog_ms() <= self.high_water_ms:
+            self.above_high_water_since = None
+            return
+        now = time.monotonic()
+        if self.above_high_water_since is None:
+            self.above_high_water_since = now
+        elif now - self.above_high_water_since > self.slow_client_timeout_s:
+            raise SlowClientError(f"over {self.high_water_ms:.0f} ms of audio behind for "
+                                  f"{self.slow_client_timeout_s:.0f} s")
+
+    async def _disconnect_slow_client(self, reason: str):
+        if self.closed:
+            return
+        logger.warning("Disconnecting slow client: %s (%.0f ms audio behind, %d messages queued)",
+                       reason, self.backlog_ms(), len(self.control) + len(self.stream))
+        self.stats["slow_client"] = True
+        SLOW_CLIENT_DISCONNECTS.inc()
+        self._shut("slow_client")
+        try:
+            # The close frame may never get through a stuck socket; don't wait on it for long
+            await asyncio.wait_for(self.websocket.close(code=1008, reason="Client too slow"), 1.0)
+        except Exception:
+            pass
+
+    def _shut(self, reason: str):
+        if self.closed:
+            return
+        self.closed = True
+        if self.queued_ms:
+            OUTPUT_AUDIO_DROPPED.inc(reason, amount=self.queued_ms)
+        OUTPUT_QUEUE_PEAK.observe(self.stats["peak_queued_ms"])
+        logger.debug("Output closed (%s): peak %.0f ms audio / %d control messages queued, "
+                     "%.0f ms stale audio dropped", reason, self.stats["peak_queued_ms"],
+                     self.stats["peak_control"], self.stats["stale_dropped_ms"])
+        self.control.clear()
+        self.stream.clear()
+        self.queued_ms = 0.0
+        # Wake anyone waiting to queue or flush
+        self.space.set()
+        self.idle.set()
+        self.ready.set()
@@ -7,17 +7,51 @@ import { ChatPanel } from './components/ChatPanel';
 import { AudioDebugPanel } from './components/AudioDebugPanel';
 import { DeviceSelector } from './components/DeviceSelector';
 import type { Message } from './types';
-import { useAudio } from './hooks/useAudio';
+import { useAudio, getNativeSampleRate } from './hooks/useAudio';
 import { useWebSocket } from './hooks/useWebSocket';
+import { SUPPORTED_AUDIO_CODECS } from './audioCodec';
+import type { AudioFrame, HelloAck } from './hooks/useWebSocket';
 
 function App() {
   const [appState, setAppState] = useState<'idle' | 'listening' | 'processing' | 'speaking'>('idle');
   const [messages, setMessages] = useState<Message[]>([]);
   const [selectedDeviceId, setSelectedDeviceId] = useState<string>();
   
-  const { isListening, audioLevel, pcmRms, analyser, startListening, stopListening, playAudioChunk, resetAudioPlayback, playAccumulatedAudio, getPlaybackRemainingTime, stopAudioPlayback } = useAudio();
-  const { isConnected, sendMessage, lastMessage } = useWebSocket('ws://localhost:8000/ws');
+  const { isListening, audioLevel, pcmRms, analyser, startListening, stopListening, playAudioChunk, playPcmChunk, resetAudioPlayback, playAccumulatedAudio, getPlaybackRemainingTime, getPlaybackStatus, stopAudioPlayback, setNegotiatedRates } = useAudio();
+
+  // Binary audio frames go straight to the player, without a React state round-trip
+  const handleAudioFrame = useCallback((frame: AudioFrame) => {
+    playPcmChunk(frame.pcm, frame.sampleRate);
+    Promise.resolve().then(() => setAppState('speaking'));
+  }, [playPcmChunk]);
+
+  // Send mic audio at the native rate and ask for playback at it; the server resamples both ways.
+  // The server picks the codec (AUDIO_CODECS) from the ones listed here.
+  const [helloOptions] = useState(() => {
+    const nativeRate = getNativeSampleRate();
+    return { input_sample_rate: nativeRate, output_sample_rates: [nativeRate], audio_codecs: SUPPORTED_AUDIO_CODECS };
+  });
+  // Applied as the ack arrives (not via lastMessage), so no mic chunk goes out in the old format after it
+  const handleHelloAck = useCallback((ack: HelloAck | null) => {
+    setNegotiatedRates(ack?.input_sample_rate, ack?.output_sample_rate, ack?.audio_codec);
+  }, [setNegotiatedRates]);
+  const { isConnected, sendMessage, lastMessage, isStaleAudio } = useWebSocket('ws://localhost:8000/ws', handleAudioFrame, helloOptions, stopAudioPlayback, handleHelloAck);
   
+  // Report playback buffer level so the server can pace audio instead of guessing.
+  // Sent every 100ms while audio is queued, plus once more when it runs dry.
+  const lastReportedBufferRef = useRef(0);
+  useEffect(() => {
+    if (!isConnected) return;
+    const interval = setInterval(() => {
+      const { bufferedMs, receivedMs } = getPlaybackStatus();
+      if (bufferedMs > 0 || lastReportedBufferRef.current > 0) {
+        sendMessage(JSON.stringify({ type: 'playback_status', buffered_ms: Math.round(bufferedMs), received_ms: Math.round(receivedMs) }));
+      }
+      lastReportedBufferRef.current = bufferedMs;
+    }, 100);
+    return () => clearInterval(interval);
+  }, [isConnected, getPlaybackStatus, sendMessage]);
+
   // Ref to access current state/level in callbacks without dependency issues (Stale Closure Fix)
   const audioLevelRef = useRef(0);
   const appStateRef = useRef(appState);
@@ -79,11 +113,13 @@ function App() {
                 }
             } 
             else if (data.type === 'audio') {
-                playAudioChunk(data.data);
-                Promise.resolve().then(() => setAppState('speaking'));
+                if (!isStaleAudio(data.generation)) {
+                    playAudioChunk(data.data);
+                    Promise.resolve().then(() => setAppState('speaking'));
+                }
             }
             else if (data.type === 'stop_audio') {
-                stopAudioPlayback();
+                // Playback was already stopped by useWebSocket when the message arrived
                 Promise.resolve().then(() => setAppState('listening'));
             }
             else if (data.type === 'turn_complete') {
@@ -188,7 +224,7 @@ function App() {
              console.log("Non-JSON message:", lastMessage);
         }
     }
-  }, [lastMessage, handleAudioData, playAudioChunk, playAccumulatedAudio, resetAudioPlayback, selectedDeviceId, sendMessage, startListening, stopListening]);
+  }, [lastMessage, handleAudioData, playAudioChunk, playAccumulatedAudio, resetAudioPlayback, selectedDeviceId, sendMessage, startListening, stopListening, isStaleAudio]);
 
 
   return (
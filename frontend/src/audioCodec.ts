@@ -0,0 +1,36 @@
+// /ws audio codecs (see backend/transport/codecs.py). The server picks one from the hello's
+// audio_codecs and reports it in hello_ack audio_codec; it applies to downlink audio payloads
+// (binary frames and JSON base64 alike) and to mic uploads sent after the client's input_applied.
+export type AudioCodec = 'pcm16' | 'mulaw';
+
+// Codecs this client can encode and decode, most preferred first
+export const SUPPORTED_AUDIO_CODECS: AudioCodec[] = ['mulaw', 'pcm16'];
+
+// G.711 mu-law code -> 16-bit sample
+const MULAW_DECODE = new Int16Array(256);
+for (let i = 0; i < 256; i++) {
+  const u = ~i & 0xFF;
+  const magnitude = ((((u & 0x0F) << 3) + 0x84) << ((u >> 4) & 0x07)) - 0x84;
+  MULAW_DECODE[i] = u & 0x80 ? -magnitude : magnitude;
+}
+
+export const mulawEncode = (pcm: Int16Array): Uint8Array => {
+  const out = new Uint8Array(pcm.length);
+  for (let i = 0; i < pcm.length; i++) {
+    const sample = pcm[i];
+    const sign = sample < 0 ? 0x80 : 0;
+    const magnitude = Math.min(Math.abs(sample), 32635) + 0x84;
+    const exponent = 31 - Math.clz32(magnitude) - 7;
+    const mantissa = (magnitude >> (exponent + 3)) & 0x0F;
+    out[i] = ~(sign | (exponent << 4) | mantissa) & 0xFF;
+  }
+  return out;
+};
+
+export const mulawDecode = (codes: Uint8Array): Int16Array => {
+  const out = new Int16Array(codes.length);
+  for (let i = 0; i < codes.length; i++) {
+    out[i] = MULAW_DECODE[codes[i]];
+  }
+  return out;
+};
@@ -1,11 +1,25 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
+import { mulawEncode, mulawDecode } from '../audioCodec';
+import type { AudioCodec } from '../audioCodec';
+
+// Rate the browser runs audio at. Mic audio is sent at this rate and playback asked for at it
+// (hello input_sample_rate / output_sample_rates); the server resamples (backend/audio_dsp/resample.py)
+let nativeSampleRate: number | null = null;
+export const getNativeSampleRate = (): number => {
+  if (nativeSampleRate === null) {
+    const probe = new (window.AudioContext || (window as unknown as { webkitAudioContext: typeof AudioContext }).webkitAudioContext)();
+    nativeSampleRate = probe.sampleRate;
+    probe.close().catch(() => {});
+  }
+  return nativeSampleRate;
+};
 
 export const useAudio = () => {
   const [isListening, setIsListening] = useState(false);
   const [audioLevel, setAudioLevel] = useState(0);
   const [pcmRms, setPcmRms] = useState(0);
   const [analyser, setAnalyser] = useState<AnalyserNode | null>(null);
-  const audioContextRef = useRef<AudioContext | null>(null);  // For mic input (16kHz)
+  const audioContextRef = useRef<AudioContext | null>(null);  // For mic input (native rate)
   const playbackContextRef = useRef<AudioContext | null>(null);  // For TTS playback (native rate)
   const streamRef = useRef<MediaStream | null>(null);
   const analyserRef = useRef<AnalyserNode | null>(null);
@@ -15,6 +29,10 @@ export const useAudio = () => {
   const nextStartTimeRef = useRef<number>(0);
   const outputDestRef = useRef<MediaStreamAudioDestinationNode | null>(null);
   const audioOutputRef = useRef<HTMLAudioElement | null>(null);
+  // Rate the server accepts mic audio at (hello_ack input_sample_rate); 16kHz until it says otherwise
+  const inputSampleRateRef = useRef<number>(16000);
+  // Codec for mic uploads and JSON audio (hello_ack audio_codec)
+  const audioCodecRef = useRef<AudioCodec>('pcm16');
 
   const startListening = useCallback(async (onAudioData: (data: ArrayBuffer) => void, deviceId?: string) => {
     try {
@@ -22,7 +40,6 @@ export const useAudio = () => {
         audio: {
             deviceId: deviceId ? { exact: deviceId } : undefined,
             channelCount: 1,
-            sampleRate: 16000,
             echoCancellation: true,  // Enable to prevent agent hearing itself
             noiseSuppression: false,
             autoGainControl: false
@@ -32,7 +49,7 @@ export const useAudio = () => {
       streamRef.current = stream;
       
       const audioContext = new (window.AudioContext || (window as unknown as { webkitAudioContext: typeof AudioContext }).webkitAudioContext)({
-          sampleRate: 16000,
+          sampleRate: getNativeSampleRate(),
       });
       console.log("DEBUG: AudioContext Sample Rate:", audioContext.sampleRate);
       audioContextRef.current = audioContext;
@@ -45,13 +62,13 @@ export const useAudio = () => {
       analyserRef.current = analyser;
       setAnalyser(analyser);
 
-      const processor = audioContext.createScriptProcessor(2048, 1, 1);
+      const processor = audioContext.createScriptProcessor(4096, 1, 1);
       processorRef.current = processor;
 
       processor.onaudioprocess = (e) => {
         const inputData = e.inputBuffer.getChannelData(0);
         const inputSampleRate = audioContext.sampleRate;
-        const targetSampleRate = 16000;
+        const targetSampleRate = inputSampleRateRef.current;
 
         // Log sample rate mismatch (only once)
         if (!(processorRef.current as AudioNode & { hasLoggedRate?: boolean }).hasLoggedRate) {
@@ -61,7 +78,7 @@ export const useAudio = () => {
 
         let finalData = inputData;
 
-        // Downsample (Box Filter)
+        // Downsample (Box Filter) - only for servers that don't resample native-rate audio themselves
         if (inputSampleRate > targetSampleRate) {
             const ratio = inputSampleRate / targetSampleRate;
             const newLength = Math.floor(inputData.length / ratio);
@@ -93,7 +110,7 @@ export const useAudio = () => {
         const currentPcmRms = Math.sqrt(pcmSumSq / pcmData.length);
         setPcmRms(currentPcmRms);
 
-        onAudioData(pcmData.buffer);
+        onAudioData(audioCodecRef.current === 'mulaw' ? mulawEncode(pcmData).buffer : pcmData.buffer);
       };
 
       source.connect(analyser);
@@ -201,7 +218,21 @@ export const useAudio = () => {
 
   // Kokoro TTS sample rate
   const TTS_SAMPLE_RATE = 24000;
+  // Rate of legacy JSON audio: the negotiated output rate (hello_ack output_sample_rate) if any
+  const jsonAudioSampleRateRef = useRef<number>(TTS_SAMPLE_RATE);
+
+  // Apply the rates and codec the server acknowledged in hello_ack
+  const setNegotiatedRates = useCallback((inputSampleRate?: number | null, outputSampleRate?: number | null, audioCodec?: AudioCodec | null) => {
+      inputSampleRateRef.current = inputSampleRate || 16000;
+      jsonAudioSampleRateRef.current = outputSampleRate || TTS_SAMPLE_RATE;
+      audioCodecRef.current = audioCodec || 'pcm16';
+      console.log(`[Audio] Negotiated input ${inputSampleRateRef.current}Hz, output ${outputSampleRate || 'native'}, codec ${audioCodecRef.current}`);
+  }, []);
   const nextPlayTimeRef = useRef<number>(0);
+  // Chunks scheduled and not yet finished, so a stop can cut them without closing the context
+  const scheduledSourcesRef = useRef<Set<AudioBufferSourceNode>>(new Set());
+  // Total audio received this connection (ms), reported to the server for flow control
+  const receivedMsRef = useRef<number>(0);
 
   // Get or create playback context (separate from mic context)
   const getPlaybackContext = useCallback(() => {
@@ -231,39 +262,37 @@ export const useAudio = () => {
   const stopAudioPlayback = useCallback(() => {
       const ctx = playbackContextRef.current;
       if (ctx) {
-          // We can't easily "cancel" already scheduled AudioBufferSourceNodes 
-          // without keeping track of them all, but we can suspend/resume the context
-          // or just close and recreate it for a "hard stop".
-          // Re-creating the context is the most reliable way to kill all pending audio.
-          playbackContextRef.current.close().catch(() => {});
-          playbackContextRef.current = null;
-          nextPlayTimeRef.current = 0;
-          console.log('[Audio] Playback stopped and context cleared');
+          // Cut everything scheduled; the context stays up for the next reply
+          // (stale chunks still in flight are dropped by generation, see useWebSocket)
+          for (const source of scheduledSourcesRef.current) {
+              source.onended = null;
+              try {
+                  source.stop();
+              } catch {
+                  // Already stopped
+              }
+              source.disconnect();
+          }
+          scheduledSourcesRef.current.clear();
+          nextPlayTimeRef.current = ctx.currentTime;
+          console.log('[Audio] Playback stopped');
       }
   }, []);
 
   // No-op for compatibility
   const playAccumulatedAudio = useCallback(() => {}, []);
 
-  const playAudioChunk = useCallback((base64Data: string) => {
+  // Schedule a chunk of 16-bit PCM right after whatever is already queued
+  const playPcmChunk = useCallback((int16Data: Int16Array, sampleRate: number = TTS_SAMPLE_RATE) => {
       try {
         const ctx = getPlaybackContext();
 
-        const binaryString = window.atob(base64Data);
-        const len = binaryString.length;
-        const bytes = new Uint8Array(len);
-        for (let i = 0; i < len; i++) {
-            bytes[i] = binaryString.charCodeAt(i);
-        }
-        const int16Data = new Int16Array(bytes.buffer);
         const float32Data = new Float32Array(int16Data.length);
-        
         for (let i = 0; i < int16Data.length; i++) {
-            const sample = int16Data[i] / 32768.0;
-            float32Data[i] = sample;
+            float32Data[i] = int16Data[i] / 32768.0;
         }
-        // Create buffer at TTS sample rate
-        const buffer = ctx.createBuffer(1, float32Data.length, TTS_SAMPLE_RATE);
+        // Create buffer at the sample rate the server declared
+        const buffer = ctx.createBuffer(1, float32Data.length, sampleRate);
         buffer.copyToChannel(float32Data, 0);
 
         const source = ctx.createBufferSource();
@@ -281,14 +310,29 @@ export const useAudio = () => {
         }
 
         source.start(nextPlayTimeRef.current);
+        scheduledSourcesRef.current.add(source);
+        source.onended = () => scheduledSourcesRef.current.delete(source);
         nextPlayTimeRef.current += buffer.duration;
+        receivedMsRef.current += buffer.duration * 1000;
 
-        console.log(`[Audio] Playing ${int16Data.length} samples (${(int16Data.length/TTS_SAMPLE_RATE).toFixed(2)}s), ${len} bytes`);
+        console.log(`[Audio] Playing ${int16Data.length} samples (${(int16Data.length/sampleRate).toFixed(2)}s), ${int16Data.byteLength} bytes`);
       } catch (e) {
           console.error("Error playing audio chunk", e);
       }
   }, [getPlaybackContext]);
 
+  // Legacy JSON transport: base64 audio (PCM16 or the negotiated codec) at the negotiated output rate (TTS_SAMPLE_RATE by default)
+  const playAudioChunk = useCallback((base64Data: string) => {
+      const binaryString = window.atob(base64Data);
+      const len = binaryString.length;
+      const bytes = new Uint8Array(len);
+      for (let i = 0; i < len; i++) {
+          bytes[i] = binaryString.charCodeAt(i);
+      }
+      const pcm = audioCodecRef.current === 'mulaw' ? mulawDecode(bytes) : new Int16Array(bytes.buffer);
+      playPcmChunk(pcm, jsonAudioSampleRateRef.current);
+  }, [playPcmChunk]);
+
   useEffect(() => {
     return () => {
       stopListening();
@@ -301,5 +345,14 @@ export const useAudio = () => {
     return Math.max(0, remaining);
   }, []);
 
-  return { isListening, audioLevel, pcmRms, analyser, startListening, stopListening, playAudioChunk, resetAudioPlayback, playAccumulatedAudio, getPlaybackRemainingTime, stopAudioPlayback };
+  // Playback buffer level for server-side pacing (see backend/transport/flow_control.py)
+  const getPlaybackStatus = useCallback(() => {
+    let bufferedMs = 0;
+    if (playbackContextRef.current) {
+      bufferedMs = Math.max(0, nextPlayTimeRef.current - playbackContextRef.current.currentTime) * 1000;
+    }
+    return { bufferedMs, receivedMs: receivedMsRef.current };
+  }, []);
+
+  return { isListening, audioLevel, pcmRms, analyser, startListening, stopListening, playAudioChunk, playPcmChunk, resetAudioPlayback, playAccumulatedAudio, getPlaybackRemainingTime, getPlaybackStatus, stopAudioPlayback, setNegotiatedRates };
 };
\ No newline at end of file
@@ -1,16 +1,95 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
+import { mulawDecode } from '../audioCodec';
+import type { AudioCodec } from '../audioCodec';
 
-export const useWebSocket = (url: string) => {
+// Binary audio frame header (see backend/transport/audio_frames.py):
+// kind u8 | flags u8 | generation u16 | sequence u32 | sample_rate u32 | payload (PCM16, or the negotiated codec)
+export const AUDIO_FRAME_HEADER_SIZE = 12;
+const FRAME_KIND_AUDIO = 1;
+
+// Audio of a generation older than the last stop_audio's belongs to an interrupted reply (mod 2^16)
+export const isStaleGeneration = (generation: number, current: number): boolean => {
+  const behind = (current - generation) & 0xFFFF;
+  return behind !== 0 && behind < 0x8000;
+};
+
+export interface AudioFrame {
+  generation: number;
+  sequence: number;
+  sampleRate: number;
+  flags: number;
+  pcm: Int16Array;
+}
+
+export const parseAudioFrame = (buffer: ArrayBuffer, codec: AudioCodec = 'pcm16'): AudioFrame | null => {
+  if (buffer.byteLength < AUDIO_FRAME_HEADER_SIZE) return null;
+  const view = new DataView(buffer);
+  if (view.getUint8(0) !== FRAME_KIND_AUDIO) return null;
+  return {
+    flags: view.getUint8(1),
+    generation: view.getUint16(2, true),
+    sequence: view.getUint32(4, true),
+    sampleRate: view.getUint32(8, true),
+    // Header is 12 bytes, so a PCM payload stays 2-byte aligned: no copy needed
+    pcm: codec === 'mulaw'
+      ? mulawDecode(new Uint8Array(buffer, AUDIO_FRAME_HEADER_SIZE))
+      : new Int16Array(buffer, AUDIO_FRAME_HEADER_SIZE, (buffer.byteLength - AUDIO_FRAME_HEADER_SIZE) >> 1),
+  };
+};
+
+// Extra capabilities sent in the hello, e.g. { input_sample_rate: 48000, output_sample_rates: [48000] }
+export type HelloOptions = Record<string, unknown>;
+
+// The server's answer to the hello (backend/main.py)
+export interface HelloAck {
+  audio_transport?: string;
+  audio_codec?: AudioCodec | null;
+  input_sample_rate?: number | null;
+  output_sample_rate?: number | null;
+}
+
+// onHelloAck gets null on every (re)connect: the defaults apply until the new hello_ack
+export const useWebSocket = (url: string, onAudioFrame?: (frame: AudioFrame) => void, helloOptions?: HelloOptions,
+                             onStopAudio?: () => void, onHelloAck?: (ack: HelloAck | null) => void) => {
   const [isConnected, setIsConnected] = useState(false);
   const [lastMessage, setLastMessage] = useState<string | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
+  // Audio frames bypass React state: one setState per chunk would re-render constantly
+  const onAudioFrameRef = useRef(onAudioFrame);
+  const helloOptionsRef = useRef(helloOptions);
+  // Payload codec of binary audio frames (hello_ack audio_codec)
+  const audioCodecRef = useRef<AudioCodec>('pcm16');
+  // Audio generation of the last stop_audio; older audio is dropped on arrival
+  const audioGenerationRef = useRef(0);
+  const onStopAudioRef = useRef(onStopAudio);
+  const onHelloAckRef = useRef(onHelloAck);
+
+  useEffect(() => {
+    onAudioFrameRef.current = onAudioFrame;
+  }, [onAudioFrame]);
+
+  useEffect(() => {
+    onStopAudioRef.current = onStopAudio;
+  }, [onStopAudio]);
+
+  useEffect(() => {
+    onHelloAckRef.current = onHelloAck;
+  }, [onHelloAck]);
 
   useEffect(() => {
     const ws = new WebSocket(url);
+    ws.binaryType = 'arraybuffer';
     wsRef.current = ws;
 
     ws.onopen = () => {
       console.log("WebSocket Connected");
+      // Generations count from 0 again for every session
+      audioGenerationRef.current = 0;
+      // Mic audio goes out in the defaults (16 kHz PCM16) until this session's hello_ack
+      audioCodecRef.current = 'pcm16';
+      onHelloAckRef.current?.(null);
+      // Ask for raw binary audio frames; servers without support keep sending JSON audio
+      ws.send(JSON.stringify({ ...helloOptionsRef.current, type: 'hello', audio_transport: ['binary', 'json'] }));
       setIsConnected(true);
     };
 
@@ -20,6 +99,29 @@ export const useWebSocket = (url: string) => {
     };
 
     ws.onmessage = (event) => {
+      if (event.data instanceof ArrayBuffer) {
+        const frame = parseAudioFrame(event.data, audioCodecRef.current);
+        if (frame && onAudioFrameRef.current && !isStaleGeneration(frame.generation, audioGenerationRef.current)) {
+          onAudioFrameRef.current(frame);
+        }
+        return;
+      }
+      // Handled here rather than via lastMessage, so no frame that arrives after it
+      // is played (or cut) before React gets to it
+      if (event.data.startsWith('{"type": "hello_ack"')) {
+        const ack: HelloAck = JSON.parse(event.data);
+        audioCodecRef.current = ack.audio_codec || 'pcm16';
+        onHelloAckRef.current?.(ack);
+        // Mic audio sent after this is in the negotiated format; the server switches here too
+        ws.send(JSON.stringify({ type: 'input_applied' }));
+      }
+      if (event.data.startsWith('{"type": "stop_audio"')) {
+        const { generation } = JSON.parse(event.data);
+        if (typeof generation === 'number') {
+          audioGenerationRef.current = generation & 0xFFFF;
+        }
+        onStopAudioRef.current?.();
+      }
       setLastMessage(event.data);
     };
 
@@ -34,5 +136,10 @@ export const useWebSocket = (url: string) => {
     }
   }, []);
 
-  return { isConnected, lastMessage, sendMessage };
+  // For legacy JSON audio, which is played via lastMessage
+  const isStaleAudio = useCallback((generation?: number) => {
+    return typeof generation === 'number' && isStaleGeneration(generation & 0xFFFF, audioGenerationRef.current);
+  }, []);
+
+  return { isConnected, lastMessage, sendMessage, isStaleAudio };
 };